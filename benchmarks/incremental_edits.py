@@ -0,0 +1,56 @@
+"""
+Re-parsing a Document after small edits against lexing and parsing the
+edited text from scratch.
+
+    python -m benchmarks.incremental_edits
+    python -m benchmarks.incremental_edits --items 600 --edits 50
+"""
+
+import argparse
+import random
+import re
+import time
+
+from benchmarks.serialize_load import make_source, parse, same
+from stanza.incremental import Document
+
+
+def edits(text, count, seed=0):
+    """Numbers in `text` replaced by others of the same length, so offsets stay put."""
+    numbers = list(re.finditer(r"\d+", text))
+    rng = random.Random(seed)
+    for match in rng.sample(numbers, min(count, len(numbers))):
+        digits = "".join(rng.choice("123456789") for _ in match.group())
+        yield match.start(), len(digits), digits
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--items", type=int, default=100)
+    arg_parser.add_argument("--terms", type=int, default=40)
+    arg_parser.add_argument("--edits", type=int, default=20)
+    args = arg_parser.parse_args(argv)
+
+    text = make_source(args.items, args.terms)
+    start = time.perf_counter()
+    document = Document(text, "<bench>")
+    print(f"source {len(text)} chars, parsed in {time.perf_counter() - start:.3f}s")
+
+    slowest = 0.0
+    for edit in edits(text, args.edits):
+        start = time.perf_counter()
+        node, error = document.reparse(edit)
+        slowest = max(slowest, time.perf_counter() - start)
+        if error:
+            raise RuntimeError(error.as_string())
+    same(parse(document.text), node)
+
+    start = time.perf_counter()
+    parse(document.text)
+    full = time.perf_counter() - start
+    print(f"{'lex + parse':>12}: {full:8.4f}s")
+    print(f"{'reparse':>12}: {slowest:8.4f}s  (slowest of {args.edits})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Lexing a large file through a read-only mmap against reading it into a str.
+
+    python -m benchmarks.mmap_lexing
+    python -m benchmarks.mmap_lexing --size 200MB --kind numbers
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.scaling import GENERATORS, parse_size
+from stanza.lexer import ByteLexer, Lexer
+from stanza.source import open_source
+
+
+def lex_str(path):
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    return Lexer(path, text).make_tokens()
+
+
+def lex_mmap(path):
+    return ByteLexer(path, open_source(path)).make_tokens()
+
+
+def check_same_tokens(path):
+    """Both lexers agree on every token type, value and position."""
+    expected, expected_error = lex_str(path)
+    actual, actual_error = lex_mmap(path)
+    assert expected_error is None and actual_error is None
+    for a, b in zip(expected, actual, strict=True):
+        assert (a.type, a.value) == (b.type, b.value)
+        for attr in ("pos_start", "pos_end"):
+            x, y = getattr(a, attr), getattr(b, attr)
+            assert (x.idx, x.ln, x.col) == (y.idx, y.ln, y.col)
+
+
+def measure(func, path):
+    """
+    Seconds for one run, then peak traced memory for another (tracing slows
+    the run down). The mapping itself is not a Python allocation, so only the
+    tokens and, for lex_str, the decoded text show up in the peak.
+    """
+    start = time.perf_counter()
+    tokens, error = func(path)
+    elapsed = time.perf_counter() - start
+    if error:
+        raise RuntimeError(error.as_string())
+    count = len(tokens)
+    del tokens
+
+    tracemalloc.start()
+    try:
+        func(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, count
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=parse_size, default=parse_size("4MB"))
+    arg_parser.add_argument("--kind", choices=sorted(GENERATORS), default="strings")
+    args = arg_parser.parse_args(argv)
+
+    generate = GENERATORS[args.kind]
+    with tempfile.TemporaryDirectory() as tmp:
+        small = os.path.join(tmp, "small.stanza")
+        with open(small, "w", encoding="utf-8") as file:
+            file.write(generate(64 * 1024))
+        check_same_tokens(small)
+
+        path = os.path.join(tmp, "input.stanza")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(generate(args.size))
+        size = os.path.getsize(path)
+        print(f"{args.kind}: {size / 1e6:.1f} MB")
+        for name, func in (("str", lex_str), ("mmap", lex_mmap)):
+            elapsed, peak, count = measure(func, path)
+            print(
+                f"{name:>5}: {elapsed:8.3f}s  {count} tokens"
+                f"  peak {peak / 1e6:8.1f} MB ({peak / size:5.2f}x the file)"
+            )
+
+
+if __name__ == "__main__":
+    main()
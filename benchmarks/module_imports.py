@@ -0,0 +1,80 @@
+"""
+Importing a large helper library against inlining it into every script.
+
+    python -m benchmarks.module_imports
+    python -m benchmarks.module_imports --helpers 2000 --scripts 200
+"""
+
+import argparse
+import os
+import string
+import tempfile
+import time
+
+from stanza.output import NullSink
+from stanza.session import InterpreterSession
+
+LETTERS = string.ascii_lowercase
+
+
+def name(n):
+    """Identifiers cannot hold digits, so `n` is spelled in letters."""
+    letters = ""
+    while True:
+        n, digit = divmod(n, 26)
+        letters = LETTERS[digit] + letters
+        if not n:
+            return f"helper_{letters}"
+
+
+def make_library(helpers):
+    return [
+        f"fn {name(i)}(x, y) -> if x > {i} then x * y + {i} "
+        f'elif y < {i} then [x, y, "helper {i}"] else {name(i)}(x + 1, y - 1)'
+        for i in range(helpers)
+    ]
+
+
+def run_all(base, scripts):
+    for script in scripts:
+        value, error = base.fork().run(script, "<script>")
+        if error:
+            raise RuntimeError(error.as_string())
+    return value
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--helpers", type=int, default=1000)
+    arg_parser.add_argument("--scripts", type=int, default=100)
+    args = arg_parser.parse_args(argv)
+
+    library = make_library(args.helpers)
+    call = f"{name(args.helpers // 2)}(3, 4)"
+    inlined = [f"[{', '.join(library)}, {call}]"] * args.scripts
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "helpers.stz")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(library) + "\n")
+        imported = [f'[import "{path}", {call}]'] * args.scripts
+
+        base = InterpreterSession(output=NullSink())
+        timings = []
+        for label, scripts in (("inlined", inlined), ("imported", imported)):
+            start = time.perf_counter()
+            value = run_all(base, scripts)
+            timings.append((label, time.perf_counter() - start, value))
+
+    (_, inline_time, expected), (_, import_time, value) = timings
+    assert repr(value.elements[-1]) == repr(expected.elements[-1])
+    print(f"{args.helpers} helpers, {args.scripts} scripts using one of them")
+    print(f"{'inlined':>9}: {inline_time * 1e3 / args.scripts:8.3f} ms/script")
+    print(
+        f"{'imported':>9}: {import_time * 1e3 / args.scripts:8.3f} ms/script  "
+        f"speedup {inline_time / import_time:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
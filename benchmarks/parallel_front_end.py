@@ -0,0 +1,79 @@
+"""
+The parallel front end (stanza.frontend.parse) against Lexer and Parser run
+in sequence, as worker processes are added.
+
+    python -m benchmarks.parallel_front_end
+    python -m benchmarks.parallel_front_end --items 1000 --max-workers 16
+"""
+
+import argparse
+import os
+import time
+
+import stanza.frontend
+from benchmarks.serialize_load import make_source, same
+from stanza.lexer import Lexer
+from stanza.parser import Parser
+
+
+def serial(text):
+    tokens, error = Lexer("<bench>", text).make_tokens()
+    if error:
+        return None, error
+    ast = Parser(tokens).parse()
+    return ast.node, ast.error
+
+
+def parallel(text):
+    ast = stanza.frontend.parse("<bench>", text)
+    return ast.node, ast.error
+
+
+def check_same(text):
+    """Same tree, or the same first error, from both front ends."""
+    expected, expected_error = serial(text)
+    actual, actual_error = parallel(text)
+    if expected_error or actual_error:
+        assert expected_error.as_string() == actual_error.as_string()
+    else:
+        same(expected, actual)
+
+
+def timed(func, text):
+    start = time.perf_counter()
+    node, error = func(text)
+    if error:
+        raise RuntimeError(error.as_string())
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--items", type=int, default=300)
+    arg_parser.add_argument("--terms", type=int, default=40)
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = arg_parser.parse_args(argv)
+
+    text = make_source(args.items, args.terms)
+    broken = text[: len(text) * 3 // 4] + " $" + text[len(text) * 3 // 4 :]
+    print(f"source {len(text)} chars")
+    elapsed = timed(serial, text)
+    print(f"{'serial':>12}: {elapsed:8.3f}s")
+
+    workers = 2
+    while workers <= max(args.max_workers, 2):
+        stanza.frontend.shutdown()
+        stanza.frontend.WORKERS = workers
+        check_same(text)
+        check_same(broken)
+        parallel_time = timed(parallel, text)
+        print(
+            f"{'x' + str(workers):>12}: {parallel_time:8.3f}s  "
+            f"speedup {elapsed / parallel_time:5.2f}x"
+        )
+        workers *= 2
+    stanza.frontend.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Speedup of `pfor` over a plain `for` as worker processes are added.
+
+    python -m benchmarks.parallel_scaling
+    python -m benchmarks.parallel_scaling --iterations 4000 --max-workers 16
+"""
+
+import argparse
+import os
+import time
+
+import stanza.parallel
+from stanza import InterpreterSession
+
+WORK = "fn fib(n) -> if n < 2 then n else fib(n - 1) + fib(n - 2)"
+
+
+def bench(session, source):
+    start = time.perf_counter()
+    value, error = session.run(source)
+    if error:
+        raise RuntimeError(error.as_string())
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=2000)
+    arg_parser.add_argument("--depth", type=int, default=12)
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = arg_parser.parse_args(argv)
+
+    session = InterpreterSession()
+    session.run(WORK)
+    loop = f"0 to {args.iterations} do fib({args.depth})"
+
+    serial = bench(session, f"for i in {loop}")
+    print(f"{'for':>12}: {serial:8.3f}s")
+    workers = 1
+    while workers <= args.max_workers:
+        stanza.parallel.shutdown()
+        stanza.parallel.WORKERS = workers
+        bench(session, f"pfor i in 0 to {workers * 64} do 0")  # warm the pool
+        elapsed = bench(session, f"pfor i in {loop}")
+        print(
+            f"{'pfor x' + str(workers):>12}: {elapsed:8.3f}s  "
+            f"speedup {serial / elapsed:5.2f}x"
+        )
+        workers *= 2
+    stanza.parallel.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Per-record overhead of a compiled Program against shell-style evaluation.
+
+    python -m benchmarks.program_overhead
+    python -m benchmarks.program_overhead --records 50000
+"""
+
+import argparse
+import time
+
+from stanza import InterpreterSession
+from stanza.program import compile
+
+FORMULA = "if x > 10 then x * rate + bonus else x - rate"
+
+
+def bench_session(base, records):
+    """What a host does without Program: fork, bind, lex, parse, evaluate."""
+    start = time.perf_counter()
+    for x in records:
+        session = base.fork()
+        session.define("x", x)
+        value, error = session.run(FORMULA)
+        if error:
+            raise RuntimeError(error.as_string())
+    return time.perf_counter() - start
+
+
+def bench_program(base, records):
+    program, error = compile(FORMULA, inputs=("x",), session=base)
+    if error:
+        raise RuntimeError(error.as_string())
+    start = time.perf_counter()
+    for x in records:
+        value, error = program.run({"x": x})
+        if error:
+            raise RuntimeError(error.as_string())
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--records", type=int, default=20000)
+    args = arg_parser.parse_args(argv)
+
+    base = InterpreterSession()
+    base.define("rate", 3).define("bonus", 0.5)
+    records = [i % 40 for i in range(args.records)]
+
+    session_time = bench_session(base, records)
+    program_time = bench_program(base, records)
+    timings = (("session.run", session_time), ("Program.run", program_time))
+    for label, elapsed in timings:
+        print(
+            f"{label:>12}: {elapsed / len(records) * 1e6:8.2f} us/record "
+            f"({elapsed:.3f}s for {len(records)} records)"
+        )
+    print(f"{'speedup':>12}: {session_time / program_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
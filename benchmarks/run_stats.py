@@ -0,0 +1,61 @@
+"""
+What collecting RunStats costs a run.
+
+    python -m benchmarks.run_stats
+    python -m benchmarks.run_stats --n 22 --repeat 3
+"""
+
+import argparse
+import time
+
+from stanza.output import NullSink
+from stanza.session import InterpreterSession
+from stanza.stats import RunStats
+
+DEFINITION = "fn fib(n) -> if n < 2 then n else fib(n - 1) + fib(n - 2)"
+LOOP = "for i in 0 to {n} do [i * 2, str(i), i / 3, 1 to i]"
+
+
+def timed(session, text, stats):
+    start = time.perf_counter()
+    value, error = session.fork().run(text, stats=stats)
+    elapsed = time.perf_counter() - start
+    if error:
+        raise RuntimeError(error.as_string())
+    return elapsed
+
+
+def compare(repeat, session, text):
+    """Best plain and counted times; runs alternate so noise hits both alike."""
+    plain = counted = float("inf")
+    for _ in range(repeat):
+        plain = min(plain, timed(session, text, None))
+        stats = RunStats()
+        counted = min(counted, timed(session, text, stats))
+    return plain, counted, stats
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=7)
+    args = arg_parser.parse_args(argv)
+
+    session = InterpreterSession(output=NullSink())
+    session.run(DEFINITION)
+    programs = (
+        ("calls", f"fib({args.n})"),
+        ("loop", LOOP.format(n=10 ** (args.n // 4))),
+    )
+    for label, text in programs:
+        plain, counted, stats = compare(args.repeat, session, text)
+        print(
+            f"{label:>6}: {plain:7.3f}s plain, {counted:7.3f}s with stats "
+            f"({(counted / plain - 1) * 100:+5.1f}%), "
+            f"{stats.nodes_visited} nodes visited"
+        )
+    print(stats.to_json())
+
+
+if __name__ == "__main__":
+    main()
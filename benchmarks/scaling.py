@@ -0,0 +1,262 @@
+"""
+Front end scaling harness.
+
+Generates synthetic Stanza sources of increasing size, runs the Lexer and the
+Parser over each one and fails when time or peak memory grows faster than
+linearly with the input size.
+
+    python -m benchmarks.scaling                     # 1 KB .. 4 MB
+    python -m benchmarks.scaling --max-size 100MB    # the full range
+    python -m benchmarks.scaling --kind strings --kind elif_chain
+"""
+
+import argparse
+import gc
+import math
+import sys
+import time
+import tracemalloc
+
+from stanza import Lexer, Parser
+
+KB = 1024
+MB = 1024 * KB
+
+# Nested parentheses cost roughly a dozen Python frames per level in the
+# recursive descent parser, so nesting is generated as many shallow groups
+# rather than one arbitrarily deep one.
+NESTING_DEPTH = 40
+
+
+"""----------generators----------"""
+
+
+def _identifier(n):
+    """
+    Letters-only name for n (identifiers cannot contain digits). The 'v'
+    prefix keeps generated names clear of keywords like 'do' or 'fn'.
+    """
+    name = ""
+    n += 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        name = chr(ord("a") + rem) + name
+    return "v" + name
+
+
+def _repeat(make_piece, separator, size, prefix="", suffix=""):
+    parts = [prefix]
+    length = len(prefix) + len(suffix)
+    i = 0
+    while length < size:
+        piece = make_piece(i)
+        if i:
+            piece = separator + piece
+        parts.append(piece)
+        length += len(piece)
+        i += 1
+    parts.append(suffix)
+    return "".join(parts)
+
+
+def gen_identifiers(size):
+    """fn f(va, vb, vc, ...) -> va"""
+    return _repeat(_identifier, ", ", size, prefix="fn f(", suffix=") -> va")
+
+
+def gen_identifier_chain(size):
+    """va + vb + vc + ..."""
+    return _repeat(_identifier, " + ", size)
+
+
+def gen_numbers(size):
+    """Sum of long integer literals and floats, all below MAX_INT_DIGITS."""
+
+    def piece(i):
+        if i % 2:
+            return "1234567890" * 100
+        return f"3.14159{i}"
+
+    return _repeat(piece, " + ", size)
+
+
+def gen_strings(size):
+    """One long string literal full of escapes."""
+    body = _repeat(lambda i: 'ab\\n\\t\\"cd\\\\', "", size - 2)
+    return f'"{body}"'
+
+
+def gen_nesting(size):
+    """((((va)))) + ((((vb)))) + ... each group NESTING_DEPTH deep"""
+    open_, close = "(" * NESTING_DEPTH, ")" * NESTING_DEPTH
+    return _repeat(lambda i: open_ + _identifier(i) + close, " + ", size)
+
+
+def gen_elif_chain(size):
+    """if x == 0 then 0 elif x == 1 then 1 elif ... else -1"""
+    return _repeat(
+        lambda i: f"x == {i} then {i}",
+        " elif ",
+        size,
+        prefix="if ",
+        suffix=" else -1",
+    )
+
+
+GENERATORS = {
+    "identifiers": gen_identifiers,
+    "identifier_chain": gen_identifier_chain,
+    "numbers": gen_numbers,
+    "strings": gen_strings,
+    "nesting": gen_nesting,
+    "elif_chain": gen_elif_chain,
+}
+
+
+"""----------measurement----------"""
+
+
+def _front_end(text):
+    start = time.perf_counter()
+    tokens, error = Lexer("<scaling>", text).make_tokens()
+    lexed = time.perf_counter()
+    if error:
+        raise RuntimeError(error.as_string())
+    result = Parser(tokens).parse()
+    parsed = time.perf_counter()
+    if result.error:
+        raise RuntimeError(result.error.as_string())
+    return lexed - start, parsed - lexed
+
+
+def measure(text, repeat=3):
+    """
+    Best-of-`repeat` lex/parse seconds, then peak traced memory in bytes.
+    Like timeit, the cyclic GC is paused while timing so that its full
+    collections do not show up as growth in the front end itself.
+    """
+    lex_time = parse_time = math.inf
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            lex, parse = _front_end(text)
+            lex_time = min(lex_time, lex)
+            parse_time = min(parse_time, parse)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        _front_end(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return lex_time, parse_time, peak
+
+
+def growth_exponent(sizes, values):
+    """Least squares slope of log(value) against log(size); 1.0 is linear."""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(v, 1e-9)) for v in values]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    num = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    den = sum((x - mean_x) ** 2 for x in xs)
+    return num / den if den else 0.0
+
+
+def sizes_between(min_size, max_size, factor=4):
+    sizes = []
+    size = min_size
+    while size <= max_size:
+        sizes.append(size)
+        size *= factor
+    return sizes
+
+
+def check_kind(kind, sizes, tolerance, fit_from, out=sys.stdout):
+    """
+    Measures one generator across `sizes` and returns a list of failure
+    messages (empty when lexing, parsing and memory all scale linearly).
+    Sizes below `fit_from` are reported but left out of the fit, since fixed
+    costs dominate there.
+    """
+    generate = GENERATORS[kind]
+    rows = []
+    for size in sizes:
+        text = generate(size)
+        lex_time, parse_time, peak = measure(text, repeat=3 if size < MB else 1)
+        rows.append((len(text), lex_time, parse_time, peak))
+        print(
+            f"{kind:>16} {len(text):>12,d} B  lex {lex_time * 1e3:10.2f} ms  "
+            f"parse {parse_time * 1e3:10.2f} ms  peak {peak / MB:9.2f} MB",
+            file=out,
+        )
+
+    fitted = [row for row in rows if row[0] >= fit_from] or rows
+    if len(fitted) < 2:
+        return []
+
+    failures = []
+    lengths = [row[0] for row in fitted]
+    for label, column in (("lex time", 1), ("parse time", 2), ("peak memory", 3)):
+        exponent = growth_exponent(lengths, [row[column] for row in fitted])
+        print(f"{kind:>16} {label} grows as n^{exponent:.2f}", file=out)
+        if exponent > tolerance:
+            failures.append(
+                f"{kind}: {label} grows as n^{exponent:.2f} (limit n^{tolerance})"
+            )
+    return failures
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    for suffix, scale in (("MB", MB), ("KB", KB), ("B", 1)):
+        if text.endswith(suffix):
+            return int(float(text[: -len(suffix)]) * scale)
+    return int(text)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--min-size", type=parse_size, default=KB)
+    arg_parser.add_argument("--max-size", type=parse_size, default=4 * MB)
+    arg_parser.add_argument(
+        "--fit-from",
+        type=parse_size,
+        default=64 * KB,
+        help="smallest size included in the growth fit",
+    )
+    arg_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="largest accepted growth exponent",
+    )
+    arg_parser.add_argument(
+        "--kind", action="append", choices=sorted(GENERATORS), dest="kinds"
+    )
+    args = arg_parser.parse_args(argv)
+
+    # Deeply nested sources recurse in the parser; keep the limit comfortably
+    # above NESTING_DEPTH frames.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * NESTING_DEPTH))
+
+    sizes = sizes_between(args.min_size, args.max_size)
+    failures = []
+    for kind in args.kinds or GENERATORS:
+        failures += check_kind(kind, sizes, args.tolerance, args.fit_from)
+
+    if failures:
+        print("\nSuper-linear growth detected:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+    print("\nAll front end stages scale linearly.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Loading a serialized program against lexing and parsing its source again.
+
+    python -m benchmarks.serialize_load
+    python -m benchmarks.serialize_load --items 200 --terms 60
+"""
+
+import argparse
+import string
+import time
+
+from stanza.analysis import walk
+from stanza.arena import KINDS
+from stanza.errors import Position
+from stanza.lexer import Lexer, Token
+from stanza.parser import Parser
+from stanza.serialize import dumps, loads, loads_arena
+
+LETTERS = string.ascii_lowercase
+
+# One program holding every node kind in arena.KINDS.
+EVERY_KIND = (
+    "[let total = 0, total = total + 1, -total, not fact, 2 ^ 10, "
+    'if total > 1 then "big" elif total < 0 then "neg" else "small", '
+    "for i in 0 to 10 step 2 do i, pfor i in 0 to 4 do i * i, "
+    "while total < 3 do total = total + 1, "
+    "fn gen(n, m) -> for i in 0 to n do yield i * m, fn (x) -> x, gen(3, 2), "
+    '[1, 2.5, "s"][0], "text"[1:3], [1, 2][:1], 1 to 5, import "lib.stz"]'
+)
+
+
+def make_source(items, terms):
+    body = " + ".join(
+        f'fn_{LETTERS[i % 26]}(value_{LETTERS[i % 7]} * {i}, "label {i}")'
+        for i in range(terms)
+    )
+    cases = (
+        f"if score_{LETTERS[i % 26]} > limit then {body} else [{i}, {i}.5]"
+        for i in range(items)
+    )
+    return "[" + ", ".join(cases) + "]"
+
+
+def parse(text):
+    tokens, error = Lexer("<bench>", text).make_tokens()
+    if error:
+        raise RuntimeError(error.as_string())
+    ast = Parser(tokens).parse()
+    if ast.error:
+        raise RuntimeError(ast.error.as_string())
+    return ast.node
+
+
+def same(original, copy, path="root"):
+    """
+    Compares two trees field by field: node types, positions, token types
+    and values, names and flags. Tokens inside a node are rebuilt with the
+    node's span (see arena.Arena), so their positions are not compared.
+    """
+    if type(original) is not type(copy):
+        raise AssertionError(f"{path}: {original!r} became {copy!r}")
+    if isinstance(original, Position):
+        a, b = original, copy
+        if (a.idx, a.ln, a.col, a.fn) != (b.idx, b.ln, b.col, b.fn):
+            raise AssertionError(f"{path}: offset {a.idx} became {b.idx}")
+    elif isinstance(original, Token):
+        if (original.type, original.value) != (copy.type, copy.value):
+            raise AssertionError(f"{path}: {original!r} became {copy!r}")
+    elif isinstance(original, (list, tuple)):
+        if len(original) != len(copy):
+            raise AssertionError(f"{path}: {len(original)} became {len(copy)} items")
+        for i, (a, b) in enumerate(zip(original, copy)):
+            same(a, b, f"{path}[{i}]")
+    elif type(original) in KINDS:
+        if vars(original).keys() != vars(copy).keys():
+            raise AssertionError(f"{path}: fields {sorted(vars(copy))}")
+        for name, value in vars(original).items():
+            same(value, getattr(copy, name), f"{path}.{name}")
+    elif original != copy:
+        raise AssertionError(f"{path}: {original!r} became {copy!r}")
+
+
+def check_every_kind():
+    node = parse(EVERY_KIND)
+    missing = set(KINDS) - {type(sub) for sub in walk(node)}
+    assert not missing, f"EVERY_KIND lacks {sorted(k.__name__ for k in missing)}"
+    same(node, loads(dumps(node)))
+
+
+def best_of(repeat, func, *args):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--items", type=int, default=60)
+    arg_parser.add_argument("--terms", type=int, default=40)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    check_every_kind()
+    print(f"round trip of all {len(KINDS)} node kinds: ok")
+
+    text = make_source(args.items, args.terms)
+    node = parse(text)
+    data = dumps(node)
+    same(node, loads(data))
+    print(f"source {len(text)} chars, serialized {len(data)} bytes")
+
+    parsing = best_of(args.repeat, parse, text)
+    print(f"{'lex + parse':>12}: {parsing:8.4f}s")
+    for name, func in (("loads", loads), ("loads_arena", loads_arena)):
+        elapsed = best_of(args.repeat, func, data)
+        print(f"{name:>12}: {elapsed:8.4f}s  speedup {parsing / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
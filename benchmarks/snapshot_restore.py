@@ -0,0 +1,87 @@
+"""
+Restoring a session snapshot against evaluating its prelude again.
+
+    python -m benchmarks.snapshot_restore
+    python -m benchmarks.snapshot_restore --functions 200 --constants 400
+"""
+
+import argparse
+import string
+import time
+
+from stanza.output import NullSink
+from stanza.session import InterpreterSession
+from stanza.snapshot import dumps, loads
+
+
+LETTERS = string.ascii_lowercase
+
+
+def name(prefix, n):
+    """Identifiers cannot hold digits, so `n` is spelled in letters."""
+    letters = ""
+    while True:
+        n, digit = divmod(n, 26)
+        letters = LETTERS[digit] + letters
+        if not n:
+            return f"{prefix}_{letters}"
+
+
+def make_prelude(functions, constants):
+    prelude = []
+    for i in range(functions):
+        rule = name("rule", i)
+        prelude.append(
+            f"fn {rule}(x, y) -> if x > {i} then x * y + {i} "
+            f'elif y < {i} then [x, y, "rule {i}"] else {rule}(x + 1, y - 1)'
+        )
+    for i in range(constants):
+        prelude.append(
+            f"let {name('const', i)} = "
+            f'[{i}, {i}.5, "constant {i}", {name("rule", i % functions)}]'
+        )
+    return prelude
+
+
+def build(prelude):
+    session = InterpreterSession(output=NullSink())
+    for text in prelude:
+        value, error = session.run(text, "<prelude>")
+        if error:
+            raise RuntimeError(error.as_string())
+    return session
+
+
+def best_of(repeat, func, *args):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--functions", type=int, default=100)
+    arg_parser.add_argument("--constants", type=int, default=200)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    prelude = make_prelude(args.functions, args.constants)
+    session = build(prelude)
+    data = dumps(session)
+    restored = loads(data, output=NullSink())
+    last = name("rule", args.functions - 1)
+    probe = f"[rule_a(3, 4), {last}(1, 2), const_b]"
+    assert repr(session.fork().run(probe)[0]) == repr(restored.fork().run(probe)[0])
+    print(f"prelude {sum(map(len, prelude))} chars, snapshot {len(data)} bytes")
+
+    evaluating = best_of(args.repeat, build, prelude)
+    restoring = best_of(args.repeat, loads, data)
+    print(f"{'evaluate':>8}: {evaluating:8.4f}s")
+    print(f"{'restore':>8}: {restoring:8.4f}s  speedup {evaluating / restoring:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
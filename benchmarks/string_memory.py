@@ -0,0 +1,69 @@
+"""
+Memory accounting for strings built up in a loop under a Budget.
+
+Fails when appending to a string charges the budget more than linearly in
+the final length: every intermediate rope stays reachable from the result,
+so charging each step at its full length would add up quadratically.
+
+    python -m benchmarks.string_memory
+    python -m benchmarks.string_memory --appends 50000 --chunk 8000
+"""
+
+import argparse
+
+from stanza.budget import Budget
+from stanza.output import NullSink
+from stanza.session import InterpreterSession
+
+MAX_MEMORY = 10_000_000
+
+
+def check(text, expected_length, max_memory):
+    budget = Budget(max_memory=max_memory)
+    session = InterpreterSession(output=NullSink())
+    value, error = session.run(text, budget=budget)
+    if error:
+        raise SystemExit(f"{text}\n{error.as_string()}")
+    if value.elements[-1].value != expected_length:
+        raise SystemExit(f"{text}\nlength {value.elements[-1]}, not {expected_length}")
+    if budget.peak_memory > expected_length:
+        raise SystemExit(
+            f"{text}\npeak_memory {budget.peak_memory} is more than the "
+            f"{expected_length} bytes the string holds"
+        )
+    return budget.peak_memory
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--appends", type=int, default=20000)
+    arg_parser.add_argument("--chunk", type=int, default=5000)
+    args = arg_parser.parse_args(argv)
+
+    small = f'[let s = "", for i in 0 to {args.appends} do s = s + "x", len(s)]'
+    peak = check(small, args.appends, MAX_MEMORY)
+    print(f"{args.appends} one-character appends: peak_memory {peak}")
+
+    # Large chunks are charged one by one, so the peak follows the length.
+    chunks = MAX_MEMORY // args.chunk - 1
+    large = (
+        f'[let s = "", let c = "x" * {args.chunk}, '
+        f"for i in 0 to {chunks} do s = s + c, len(s)]"
+    )
+    peak = check(large, chunks * args.chunk, MAX_MEMORY)
+    print(f"{chunks} appends of {args.chunk} characters: peak_memory {peak}")
+
+    # Builtins that build strings are charged before they run, like operators.
+    over_half = MAX_MEMORY // 2 + 1
+    for call in ("upper(s)", 'replace(s, "x", "xx")', "str(s)", "substr(s, 1)"):
+        text = f'[let s = "x" * {over_half}, {call}]'
+        budget = Budget(max_memory=MAX_MEMORY)
+        session = InterpreterSession(output=NullSink())
+        _, error = session.run(text, budget=budget)
+        if error is None or "Memory limit" not in error.details:
+            raise SystemExit(f"{text}\nwas not stopped by max_memory")
+    print("string builtins over max_memory: stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 # stanza/__init__.py
 
-from .interpreter import Interpreter, SymbolTable
+from .budget import Budget, CancellationToken
+from .interpreter import Buffer, Interpreter, SymbolTable
 from .lexer import Lexer
+from .output import CaptureSink, NullSink, StdoutSink
 from .parser import Parser
+from .session import InterpreterSession
+from .stats import RunStats
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+from .budget import Budget, CancellationToken
+from .session import InterpreterSession
+
+"""Slicing"""
+
+
+class _Slicer:
+    """
+    Hands control back and forth between the event loop and the thread that
+    evaluates the program. The evaluator only runs while the loop has granted
+    it a slice; at the end of a slice it parks itself in Budget.on_tick, which
+    makes it resumable from exactly where it stopped.
+    """
+
+    def __init__(self, loop, slice_steps, slice_time) -> None:
+        self.loop = loop
+        self.slice_steps = slice_steps
+        self.slice_time = slice_time
+        self.resume = threading.Event()
+        # Guards resume against a cancel arriving while the evaluator parks.
+        self.lock = threading.Lock()
+        self.cancelled = False
+        self.waiter = None
+        self.steps_left = slice_steps
+        self.slice_end = 0.0
+
+    def grant(self):
+        """Loop side: lets the evaluator run one slice and returns its waiter."""
+        self.waiter = self.loop.create_future()
+        self.steps_left = self.slice_steps
+        self.slice_end = time.monotonic() + self.slice_time
+        self.resume.set()
+        return self.waiter
+
+    def _notify(self, result):
+        def settle(waiter=self.waiter):
+            if not waiter.done():
+                waiter.set_result(result)
+
+        try:
+            self.loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            pass  # the loop is gone; nobody is waiting any more
+
+    def __call__(self):
+        """Evaluator side, called on every budget step."""
+        self.steps_left -= 1
+        if self.steps_left > 0 and time.monotonic() < self.slice_end:
+            return
+        with self.lock:
+            if self.cancelled:
+                # Run on to the budget's token check instead of parking with
+                # nobody left to resume us.
+                return
+            self.resume.clear()
+        self._notify(None)
+        self.resume.wait()
+
+    def cancel(self):
+        """Loop side: wakes the evaluator for good, wherever it is."""
+        with self.lock:
+            self.cancelled = True
+            self.resume.set()
+
+    def finish(self, result):
+        self._notify(result)
+
+
+"""Async API"""
+
+
+async def run_async(
+    text,
+    filename="<program>",
+    session=None,
+    budget=None,
+    slice_steps=1000,
+    slice_time=0.002,
+):
+    """
+    Evaluates `text` without blocking the running event loop.
+
+    The program runs on a helper thread but only while this coroutine lets it:
+    after `slice_steps` steps or `slice_time` seconds, whichever comes first,
+    it pauses and the coroutine yields to the loop. Cancelling the coroutine
+    (including through asyncio.timeout/wait_for) cancels the budget's token,
+    so the program stops at its next step with an RTError. Returns
+    (value, error) like InterpreterSession.run.
+    """
+    if session is None:
+        session = InterpreterSession()
+    if budget is None:
+        budget = Budget()
+    if budget.token is None:
+        budget.token = CancellationToken()
+
+    slicer = _Slicer(asyncio.get_running_loop(), slice_steps, slice_time)
+    budget.on_tick = slicer
+
+    def evaluate():
+        slicer.resume.wait()
+        try:
+            result = session.run(text, filename, budget)
+        except BaseException as exc:
+            result = exc
+        slicer.finish(result)
+
+    thread = threading.Thread(target=evaluate, name="stanza-run-async", daemon=True)
+    thread.start()
+    try:
+        while True:
+            result = await slicer.grant()
+            if result is not None:
+                break
+            await asyncio.sleep(0)
+    except asyncio.CancelledError:
+        budget.token.cancel()
+        slicer.cancel()
+        raise
+    finally:
+        budget.on_tick = None
+
+    if isinstance(result, BaseException):
+        raise result
+    return result
@@ -0,0 +1,136 @@
+from .nodes import (
+    BinOpNode,
+    CallNode,
+    ForNode,
+    FuncDefNode,
+    IfNode,
+    ImportNode,
+    IndexNode,
+    ListNode,
+    NumberNode,
+    PForNode,
+    PowerOpNode,
+    RangeNode,
+    SliceNode,
+    StringNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignmentNode,
+    VarReassignmentNode,
+    WhileNode,
+    YieldNode,
+)
+
+"""Children"""
+
+
+def _if_children(node):
+    for condition, expr in node.cases:
+        yield condition
+        yield expr
+    if node.else_expr:
+        yield node.else_expr
+
+
+def _range_children(node):
+    yield node.start_node
+    yield node.end_node
+    if node.step_node:
+        yield node.step_node
+
+
+def _slice_children(node):
+    yield node.node
+    if node.start_node:
+        yield node.start_node
+    if node.end_node:
+        yield node.end_node
+
+
+_CHILDREN = {
+    NumberNode: lambda node: (),
+    StringNode: lambda node: (),
+    VarAccessNode: lambda node: (),
+    BinOpNode: lambda node: (node.left_node, node.right_node),
+    UnaryOpNode: lambda node: (node.node,),
+    PowerOpNode: lambda node: (node.base, node.exponent),
+    VarAssignmentNode: lambda node: (node.value,),
+    VarReassignmentNode: lambda node: (node.value,),
+    IfNode: _if_children,
+    ForNode: lambda node: (node.iterable_node, node.body),
+    PForNode: lambda node: (node.iterable_node, node.body),
+    RangeNode: _range_children,
+    WhileNode: lambda node: (node.condition_node, node.body),
+    FuncDefNode: lambda node: (node.body_node,),
+    CallNode: lambda node: (node.node_to_call, *node.arg_nodes),
+    IndexNode: lambda node: (node.node, node.index_node),
+    SliceNode: _slice_children,
+    ListNode: lambda node: node.element_nodes,
+    YieldNode: lambda node: (node.value_node,),
+    ImportNode: lambda node: (),
+}
+
+
+def iter_children(node):
+    """Direct child nodes of `node`, in evaluation order."""
+    return _CHILDREN[type(node)](node)
+
+
+def walk(node):
+    """
+    Yields `node` and all of its descendants, parents first. Uses an explicit
+    stack, so long operator chains do not hit the recursion limit.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(tuple(iter_children(node))))
+
+
+"""Names"""
+
+
+def bound_names(node, reassignments=True):
+    """
+    Every name the program binds: let, reassignment (unless `reassignments`
+    is false), fn, parameters, for.
+    """
+    names = set()
+    for sub in walk(node):
+        if isinstance(sub, VarReassignmentNode) and not reassignments:
+            continue
+        if isinstance(sub, VarAssignmentNode):
+            names.add(sub.var_name)
+        elif isinstance(sub, FuncDefNode):
+            if sub.func_name_tok:
+                names.add(sub.func_name_tok.value)
+            names.update(tok.value for tok in sub.arg_name_toks)
+        elif isinstance(sub, (ForNode, PForNode)):
+            names.add(sub.var_name_tok.value)
+    return names
+
+
+def free_names(node):
+    """Names the program reads but never binds itself, in first-use order."""
+    bound = bound_names(node)
+    free = {}
+    for sub in walk(node):
+        if isinstance(sub, VarAccessNode):
+            name = sub.var_access_tok.value
+            if name not in bound:
+                free.setdefault(name, sub)
+    return free
+
+
+def outer_reassignments(node, local=()):
+    """
+    Reassignments in `node` of names it does not bind itself (nor lists in
+    `local`), i.e. writes that would reach an enclosing scope.
+    """
+    bound = bound_names(node, reassignments=False) | set(local)
+    return [
+        sub
+        for sub in walk(node)
+        if isinstance(sub, VarReassignmentNode) and sub.var_name not in bound
+    ]
@@ -0,0 +1,411 @@
+from array import array
+from bisect import bisect_right
+
+from .constants import TT
+from .errors import Position
+from .lexer import Token
+from .nodes import (
+    BinOpNode,
+    CallNode,
+    ForNode,
+    FuncDefNode,
+    IfNode,
+    ImportNode,
+    IndexNode,
+    ListNode,
+    NumberNode,
+    PForNode,
+    PowerOpNode,
+    RangeNode,
+    SliceNode,
+    StringNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignmentNode,
+    VarReassignmentNode,
+    WhileNode,
+    YieldNode,
+)
+
+# Node kinds, by code. The codes are part of the arena (and of anything built
+# on it, like cached or serialized programs): only ever append to this tuple.
+KINDS = (
+    NumberNode,
+    StringNode,
+    VarAccessNode,
+    VarAssignmentNode,
+    VarReassignmentNode,
+    BinOpNode,
+    UnaryOpNode,
+    PowerOpNode,
+    IfNode,
+    ForNode,
+    PForNode,
+    RangeNode,
+    WhileNode,
+    FuncDefNode,
+    CallNode,
+    IndexNode,
+    SliceNode,
+    ListNode,
+    YieldNode,
+    ImportNode,
+)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# Operator token types, by code, for BinOpNode and UnaryOpNode; a unary `not`
+# is stored as KEYWORD.
+OPS = tuple(TT)
+OP_CODES = {tt: code for code, tt in enumerate(OPS)}
+
+NONE = -1
+
+"""Arena"""
+
+
+class Arena:
+    """
+    A struct-of-arrays AST. A node is an integer handle into parallel columns:
+
+    - `kinds`: the node's code in KINDS.
+    - `starts`/`ends`: source offsets of pos_start/pos_end.
+    - `ops`: the operator code (see OPS) or an index into `values`, the
+      interned token values (numbers, strings and names).
+    - `a`, `b`, `c`: child handles, or, for nodes with a variable number of
+      children, an offset and a count into `extra`.
+
+    Unused fields hold NONE. Per node the layout is:
+
+    ========================  =====  ==========  ==========  ===========
+    kind                      ops    a           b           c
+    ========================  =====  ==========  ==========  ===========
+    Number, String            value
+    VarAccess                 name
+    VarAssignment, -Reassign  name   value
+    BinOp                     op     left        right
+    UnaryOp                   op     operand
+    PowerOp                          base        exponent
+    If                               extra at    case count  else
+    For, PFor                 name   iterable    body
+    Range                            start       end         step
+    While                            condition   body
+    FuncDef                          extra at    param count body
+    Call                             callee      extra at    arg count
+    Index                            base        index
+    Slice                            base        start       end
+    List                             extra at    count
+    Yield                            value
+    Import                    path
+    ========================  =====  ==========  ==========  ===========
+
+    If cases sit in `extra` as condition, expression pairs. A FuncDef's entry
+    in `extra` is its name (or NONE), its is_generator flag and then its
+    parameters, all names as indices into `values`.
+
+    The source text is kept once and positions are rebuilt from offsets on
+    demand, so an arena pickles as a handful of flat buffers.
+    """
+
+    def __init__(self, text="", filename="<program>") -> None:
+        self.text = text
+        self.filename = filename
+        self.kinds = array("B")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.ops = array("i")
+        self.a = array("i")
+        self.b = array("i")
+        self.c = array("i")
+        self.extra = array("i")
+        self.values = []
+        self._value_index = {}
+        self._line_starts = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_value_index"], state["_line_starts"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._value_index = None
+        self._line_starts = None
+
+    @property
+    def nbytes(self):
+        """Bytes held by the columns (not counting `values` and the text)."""
+        columns = (self.kinds, self.starts, self.ends, self.ops)
+        columns += (self.a, self.b, self.c, self.extra)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def intern(self, value):
+        """The index of `value` in `values`, adding it if it is new."""
+        if self._value_index is None:
+            self._value_index = {(type(v), v): i for i, v in enumerate(self.values)}
+        key = (type(value), value)
+        index = self._value_index.get(key)
+        if index is None:
+            index = self._value_index[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def add(self, kind, start, end, op=NONE, a=NONE, b=NONE, c=NONE):
+        handle = len(self.kinds)
+        self.kinds.append(KIND_CODES[kind])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.ops.append(op)
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        return handle
+
+    """Reading"""
+
+    def kind(self, handle):
+        return KINDS[self.kinds[handle]]
+
+    def value(self, handle):
+        """The token value (number, string or name) stored in `ops`."""
+        index = self.ops[handle]
+        return None if index == NONE else self.values[index]
+
+    def op(self, handle):
+        return OPS[self.ops[handle]]
+
+    def children(self, handle):
+        """Child handles of `handle`, in evaluation order, like iter_children."""
+        kind = KINDS[self.kinds[handle]]
+        if kind in (IfNode, ListNode):
+            count = self.b[handle] * (2 if kind is IfNode else 1)
+            offset = self.a[handle]
+            children = list(self.extra[offset : offset + count])
+            if kind is IfNode and self.c[handle] != NONE:
+                children.append(self.c[handle])
+            return children
+        if kind is CallNode:
+            offset = self.b[handle]
+            return [self.a[handle], *self.extra[offset : offset + self.c[handle]]]
+        if kind is FuncDefNode:
+            return [self.c[handle]]
+        return [
+            child
+            for child in (self.a[handle], self.b[handle], self.c[handle])
+            if child != NONE
+        ]
+
+    def walk(self, handle):
+        """Yields `handle` and its descendants, parents first (like walk)."""
+        stack = [handle]
+        while stack:
+            handle = stack.pop()
+            yield handle
+            stack.extend(reversed(self.children(handle)))
+
+    def params(self, handle):
+        """A FuncDefNode's (name, is_generator, parameter names)."""
+        offset = self.a[handle]
+        name = self.extra[offset]
+        names = self.extra[offset + 2 : offset + 2 + self.b[handle]]
+        return (
+            None if name == NONE else self.values[name],
+            bool(self.extra[offset + 1]),
+            [self.values[index] for index in names],
+        )
+
+    def position(self, offset):
+        """A Position for a source offset; the line is found by bisection."""
+        if self._line_starts is None:
+            starts = array("q", [0])
+            index = self.text.find("\n")
+            while index != -1:
+                starts.append(index + 1)
+                index = self.text.find("\n", index + 1)
+            self._line_starts = starts
+        line = bisect_right(self._line_starts, offset) - 1
+        col = offset - self._line_starts[line]
+        return Position(offset, line, col, self.filename, self.text)
+
+    """Materializing"""
+
+    def to_node(self, handle):
+        """Rebuilds the object tree rooted at `handle`, for the interpreter."""
+        # The subtree is the handles from `handle` to its last descendant (see
+        # from_node); building them backwards sees children before parents.
+        last = handle
+        children = self.children(last)
+        while children:
+            last = children[-1]
+            children = self.children(last)
+        built = {}
+        for sub in range(last, handle - 1, -1):
+            built[sub] = self._build(sub, built)
+        return built[handle]
+
+    def _build(self, handle, built):
+        kind = KINDS[self.kinds[handle]]
+        a, b, c = self.a[handle], self.b[handle], self.c[handle]
+        child = built.get
+        pos_start = self.position(self.starts[handle])
+        pos_end = self.position(self.ends[handle])
+        # Rebuilt tokens share their node's span.
+        span = (pos_start, pos_end)
+        if kind in (NumberNode, StringNode, VarAccessNode):
+            value = self.value(handle)
+            if kind is StringNode:
+                tok_type = TT.STRING
+            elif kind is VarAccessNode:
+                tok_type = TT.IDENTIFIER
+            else:
+                tok_type = TT.INT if isinstance(value, int) else TT.FLOAT
+            node = kind(Token(tok_type, value, *span))
+        elif kind in (VarAssignmentNode, VarReassignmentNode):
+            node = kind(self.value(handle), built[a], None, None)
+        elif kind is BinOpNode:
+            op_tok = Token(self.op(handle), None, *span)
+            node = kind(built[a], op_tok, built[b])
+        elif kind is UnaryOpNode:
+            op = self.op(handle)
+            value = "not" if op == TT.KEYWORD else None
+            node = kind(Token(op, value, *span), built[a])
+        elif kind is PowerOpNode:
+            node = kind(built[a], built[b])
+        elif kind is IfNode:
+            flat = [built[sub] for sub in self.extra[a : a + 2 * b]]
+            node = kind(list(zip(flat[::2], flat[1::2])), child(c))
+        elif kind in (ForNode, PForNode):
+            var_tok = Token(TT.IDENTIFIER, self.value(handle), *span)
+            node = kind(var_tok, built[a], built[b])
+        elif kind is RangeNode:
+            node = kind(built[a], built[b], child(c))
+        elif kind is WhileNode:
+            node = kind(built[a], built[b])
+        elif kind is FuncDefNode:
+            name, is_generator, params = self.params(handle)
+            name_tok = Token(TT.IDENTIFIER, name, *span) if name else None
+            arg_toks = [Token(TT.IDENTIFIER, p, *span) for p in params]
+            node = kind(name_tok, arg_toks, built[c], is_generator)
+        elif kind is CallNode:
+            node = kind(built[a], [built[sub] for sub in self.extra[b : b + c]])
+        elif kind is IndexNode:
+            node = kind(built[a], built[b], None)
+        elif kind is SliceNode:
+            node = kind(built[a], child(b), child(c), None)
+        elif kind is ListNode:
+            node = kind([built[sub] for sub in self.extra[a : a + b]], None, None)
+        elif kind is ImportNode:
+            node = kind(Token(TT.STRING, self.value(handle), *span), pos_start)
+        else:
+            node = kind(built[a], None)
+        node.pos_start = pos_start
+        node.pos_end = pos_end
+        return node
+
+
+"""Building"""
+
+
+def _fields(arena, node):
+    """
+    (ops, [(field, child node)], [extra entries]) for one node, where `field`
+    names the column ("a", "b", "c") or is an int offset into `extra`.
+    """
+    kind = type(node)
+    if kind in (NumberNode, StringNode):
+        return arena.intern(node.token.value), [], None
+    if kind is VarAccessNode:
+        return arena.intern(node.var_access_tok.value), [], None
+    if kind is ImportNode:
+        return arena.intern(node.path_tok.value), [], None
+    if kind in (VarAssignmentNode, VarReassignmentNode):
+        return arena.intern(node.var_name), [("a", node.value)], None
+    if kind is BinOpNode:
+        children = [("a", node.left_node), ("b", node.right_node)]
+        return OP_CODES[node.op.type], children, None
+    if kind is UnaryOpNode:
+        return OP_CODES[node.op.type], [("a", node.node)], None
+    if kind is PowerOpNode:
+        return NONE, [("a", node.base), ("b", node.exponent)], None
+    if kind in (ForNode, PForNode):
+        children = [("a", node.iterable_node), ("b", node.body)]
+        return arena.intern(node.var_name_tok.value), children, None
+    if kind is RangeNode:
+        children = [("a", node.start_node), ("b", node.end_node)]
+        if node.step_node:
+            children.append(("c", node.step_node))
+        return NONE, children, None
+    if kind is WhileNode:
+        return NONE, [("a", node.condition_node), ("b", node.body)], None
+    if kind is IndexNode:
+        return NONE, [("a", node.node), ("b", node.index_node)], None
+    if kind is SliceNode:
+        children = [("a", node.node)]
+        if node.start_node:
+            children.append(("b", node.start_node))
+        if node.end_node:
+            children.append(("c", node.end_node))
+        return NONE, children, None
+    if kind is YieldNode:
+        return NONE, [("a", node.value_node)], None
+    if kind is IfNode:
+        flat = [sub for case in node.cases for sub in case]
+        children = [("c", node.else_expr)] if node.else_expr else []
+        return NONE, children, flat
+    if kind is ListNode:
+        return NONE, [], list(node.element_nodes)
+    if kind is CallNode:
+        return NONE, [("a", node.node_to_call)], list(node.arg_nodes)
+    if kind is FuncDefNode:
+        name = node.func_name_tok
+        header = [
+            arena.intern(name.value) if name else NONE,
+            int(node.is_generator),
+            *(arena.intern(tok.value) for tok in node.arg_name_toks),
+        ]
+        return NONE, [("c", node.body_node)], header
+    raise TypeError(f"{kind.__name__} cannot be stored in an arena")
+
+
+def from_node(node, arena=None):
+    """
+    Copies the object tree `node` into `arena` (a new Arena over the node's
+    source when None) and returns (arena, root handle). Nodes are added in
+    walk order, with an explicit stack so deep trees are fine; every subtree
+    therefore occupies consecutive handles, starting at its root.
+    """
+    if arena is None:
+        arena = Arena(node.pos_start.ftxt, node.pos_start.fn)
+    columns = {"a": arena.a, "b": arena.b, "c": arena.c}
+    root = None
+    pending = [(node, None, None)]
+    while pending:
+        node, column, slot = pending.pop()
+        kind = type(node)
+        op, children, extra = _fields(arena, node)
+        handle = arena.add(kind, node.pos_start.idx, node.pos_end.idx, op)
+        if column is None:
+            root = handle
+        else:
+            column[slot] = handle
+
+        slots = [(child, columns[field], handle) for field, child in children]
+        if extra is not None:
+            offset = len(arena.extra)
+            arena.extra.extend(extra if kind is FuncDefNode else [NONE] * len(extra))
+            if kind is FuncDefNode:
+                arena.a[handle] = offset
+                arena.b[handle] = len(extra) - 2
+            else:
+                count = len(extra) // 2 if kind is IfNode else len(extra)
+                if kind is CallNode:
+                    arena.b[handle], arena.c[handle] = offset, count
+                else:
+                    arena.a[handle], arena.b[handle] = offset, count
+                listed = [(sub, arena.extra, offset + i) for i, sub in enumerate(extra)]
+                # In children() order: an If's else comes after its cases.
+                slots = listed + slots if kind is IfNode else slots + listed
+        pending.extend(reversed(slots))
+    return arena, root
@@ -0,0 +1,117 @@
+import threading
+import time
+import weakref
+
+"""CANCELLATION"""
+
+
+class CancellationToken:
+    """Lets a host thread ask a running program to stop."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+
+"""BUDGET"""
+
+
+class Budget:
+    """
+    Per-run execution limits.
+
+    A step is one loop iteration or one function call, so the checks happen at
+    loop back-edges and function entry only and straight-line code pays
+    nothing. Every limit is optional; a Budget with no limits only counts.
+
+    Memory is accounted for values whose payload is at least TRACK_THRESHOLD
+    bytes (long strings, big integers). Their size is estimated before the
+    operation runs, charged while the value is alive and released when it is
+    garbage collected; peak_memory is the high-water mark of the run.
+    """
+
+    TRACK_THRESHOLD = 4096
+
+    def __init__(
+        self, max_steps=None, max_depth=None, timeout=None, token=None, max_memory=None
+    ):
+        self.max_steps = max_steps
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self.token = token
+        self.max_memory = max_memory
+
+        # Called on every step when set; run_async uses it to pause the
+        # evaluator between time slices.
+        self.on_tick = None
+
+        self.steps = 0
+        self.depth = 0
+        self.deadline = None
+        self.memory = 0
+        self.peak_memory = 0
+
+    def start(self):
+        """Resets the counters and starts the wall-clock deadline."""
+        self.steps = 0
+        self.depth = 0
+        # Values kept alive from an earlier run still count against the budget.
+        self.peak_memory = self.memory
+        if self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+        return self
+
+    def tick(self):
+        """Counts one step. Returns an error message once a limit is hit."""
+        self.steps += 1
+        if self.on_tick is not None:
+            self.on_tick()
+        if self.max_steps is not None and self.steps > self.max_steps:
+            return f"Step limit of {self.max_steps} exceeded"
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return f"Time limit of {self.timeout}s exceeded"
+        if self.token is not None and self.token.is_cancelled():
+            return "Execution cancelled"
+        return None
+
+    def enter(self):
+        """Counts a function call; pair every successful enter() with leave()."""
+        self.depth += 1
+        if self.max_depth is not None and self.depth > self.max_depth:
+            self.depth -= 1
+            return f"Call depth limit of {self.max_depth} exceeded"
+        message = self.tick()
+        if message:
+            self.depth -= 1
+        return message
+
+    def leave(self):
+        self.depth -= 1
+
+    def reserve(self, size):
+        """
+        Charges `size` bytes ahead of an allocation. Returns an error message,
+        without charging, when that would go over max_memory.
+        """
+        if self.max_memory is not None and self.memory + size > self.max_memory:
+            return (
+                f"Memory limit of {self.max_memory} bytes exceeded "
+                f"(needed {size} more, {self.memory} in use)"
+            )
+        self.memory += size
+        if self.memory > self.peak_memory:
+            self.peak_memory = self.memory
+        return None
+
+    def release(self, size):
+        self.memory -= size
+
+    def track(self, value, size):
+        """Keeps a reserved `size` charged until `value` is garbage collected."""
+        weakref.finalize(value, self.release, size)
+        return value
@@ -0,0 +1,323 @@
+import math
+import sys
+
+from .constants import BOOLEANS
+from .parallel import parallel_map
+from .interpreter import (
+    Boolean,
+    Buffer,
+    BuiltinFunction,
+    Function,
+    Generator,
+    List,
+    Number,
+    Range,
+    String,
+    SymbolTable,
+    iteration_error,
+    str_bytes,
+)
+
+"""Registry"""
+
+BUILTINS = {}
+
+
+def builtin(name, arity=None, calls_functions=False, result_size=None):
+    """
+    Registers the decorated function as a builtin in every global table made
+    after this point. The function receives argument values and returns
+    (value, error_message); see BuiltinFunction for `arity`,
+    `calls_functions` and `result_size`.
+    """
+
+    def register(func):
+        BUILTINS[name] = BuiltinFunction(
+            name, func, arity, calls_functions, result_size
+        )
+        return func
+
+    return register
+
+
+def install(symbol_table):
+    for name, func in BUILTINS.items():
+        symbol_table.set(name, func)
+    return symbol_table
+
+
+def new_global_table():
+    """A fresh global scope holding the names every program starts with."""
+    table = SymbolTable()
+    table.set("null", Number(0))
+    for name in BOOLEANS:
+        table.set(name, Boolean(name == "fact"))
+    return install(table)
+
+
+def _type_error(name, expected, value):
+    return None, f"{name}() expects {expected}, got {value}"
+
+
+def _types(args):
+    return ", ".join(type(arg).__name__ for arg in args)
+
+
+"""Numbers"""
+
+
+def _not_integral(name, x):
+    """The error for rounding inf or nan to an integer, which has no result."""
+    if isinstance(x.value, float) and not math.isfinite(x.value):
+        return f"{name}() of {x} has no integer value"
+    return None
+
+
+@builtin("abs", 1)
+def _abs(x):
+    if not isinstance(x, Number):
+        return _type_error("abs", "a number", x)
+    return Number(abs(x.value)), None
+
+
+def _extreme(name, pick):
+    def choose(*args):
+        kind = type(args[0])
+        if kind not in (Number, String) or any(type(arg) is not kind for arg in args):
+            return _type_error(name, "only numbers or only strings", _types(args))
+        best = args[0]
+        for arg in args[1:]:
+            if pick(arg.value, best.value):
+                best = arg
+        return kind(best.value), None
+
+    return choose
+
+
+builtin("min", (1, None))(_extreme("min", lambda a, b: a < b))
+builtin("max", (1, None))(_extreme("max", lambda a, b: a > b))
+
+
+@builtin("sqrt", 1)
+def _sqrt(x):
+    if not isinstance(x, Number):
+        return _type_error("sqrt", "a number", x)
+    if x.value < 0:
+        return None, "sqrt() of a negative number"
+    return Number(math.sqrt(x.value)), None
+
+
+@builtin("floor", 1)
+def _floor(x):
+    if not isinstance(x, Number):
+        return _type_error("floor", "a number", x)
+    message = _not_integral("floor", x)
+    if message:
+        return None, message
+    return Number(math.floor(x.value)), None
+
+
+@builtin("ceil", 1)
+def _ceil(x):
+    if not isinstance(x, Number):
+        return _type_error("ceil", "a number", x)
+    message = _not_integral("ceil", x)
+    if message:
+        return None, message
+    return Number(math.ceil(x.value)), None
+
+
+@builtin("round", (1, 2))
+def _round(x, digits=None):
+    if not isinstance(x, Number):
+        return _type_error("round", "a number", x)
+    if digits is None:
+        message = _not_integral("round", x)
+        if message:
+            return None, message
+        return Number(round(x.value)), None
+    if not isinstance(digits, Number) or not isinstance(digits.value, int):
+        return _type_error("round", "an integer number of digits", digits)
+    return Number(round(x.value, digits.value)), None
+
+
+@builtin("int", 1)
+def _int(x):
+    if isinstance(x, Number):
+        message = _not_integral("int", x)
+        if message:
+            return None, message
+        return Number(int(x.value)), None
+    if isinstance(x, String):
+        try:
+            return Number(int(x.value.strip())), None
+        except ValueError:
+            return None, f"int() cannot parse {x}"
+    return _type_error("int", "a number or a string", x)
+
+
+@builtin("float", 1)
+def _float(x):
+    if isinstance(x, Number):
+        return Number(float(x.value)), None
+    if isinstance(x, String):
+        try:
+            return Number(float(x.value.strip())), None
+        except ValueError:
+            return None, f"float() cannot parse {x}"
+    return _type_error("float", "a number or a string", x)
+
+
+"""Strings"""
+
+
+def _str_size(x):
+    if isinstance(x, String):
+        return str_bytes(x.length, x)
+    if isinstance(x, Number) and isinstance(x.value, int):
+        # About 0.3 decimal digits per bit.
+        return x.value.bit_length() * 3 // 10 + 2
+    return 0
+
+
+@builtin("str", 1, result_size=_str_size)
+def _str(x):
+    if isinstance(x, String):
+        return String(x.value), None
+    try:
+        return String(repr(x)), None
+    except ValueError:
+        # Python refuses to format integers beyond a set number of digits.
+        limit = sys.get_int_max_str_digits()
+        return None, f"str() cannot convert an integer of more than {limit} digits"
+
+
+@builtin("len", 1)
+def _len(x):
+    if isinstance(x, (String, Buffer, List, Range)):
+        return Number(x.length), None
+    return _type_error("len", "a string, list, range or buffer", x)
+
+
+def _string_method(name, arity, method, result=String, result_size=None):
+    def call(s, *args):
+        if not isinstance(s, String) or not all(isinstance(a, String) for a in args):
+            return _type_error(name, "strings", _types((s, *args)))
+        return result(method(s.value, *(arg.value for arg in args))), None
+
+    builtin(name, arity, result_size=result_size)(call)
+
+
+def _same_size(s):
+    return str_bytes(s.length, s) if isinstance(s, String) else 0
+
+
+def _replace_size(s, old, new):
+    if not all(isinstance(arg, String) for arg in (s, old, new)):
+        return 0
+    count = s.value.count(old.value)
+    return str_bytes(s.length + count * (new.length - old.length), s, new)
+
+
+_string_method("upper", 1, str.upper, result_size=_same_size)
+_string_method("lower", 1, str.lower, result_size=_same_size)
+_string_method("trim", 1, str.strip, result_size=_same_size)
+_string_method("replace", 3, str.replace, result_size=_replace_size)
+_string_method("find", 2, str.find, result=Number)
+_string_method("contains", 2, str.__contains__, result=Boolean)
+_string_method("starts_with", 2, str.startswith, result=Boolean)
+_string_method("ends_with", 2, str.endswith, result=Boolean)
+
+
+def _substr_size(s, start, end=None):
+    bounds = [start] if end is None else [start, end]
+    if not isinstance(s, String) or not all(
+        isinstance(b, Number) and isinstance(b.value, int) for b in bounds
+    ):
+        return 0
+    stop = None if end is None else end.value
+    return str_bytes(len(range(s.length)[start.value : stop]), s)
+
+
+@builtin("substr", (2, 3), result_size=_substr_size)
+def _substr(s, start, end=None):
+    if not isinstance(s, String):
+        return _type_error("substr", "a string", s)
+    bounds = [start] if end is None else [start, end]
+    if not all(isinstance(b, Number) and isinstance(b.value, int) for b in bounds):
+        return _type_error("substr", "integer positions", _types(bounds))
+    stop = None if end is None else end.value
+    return String(s.value[start.value : stop]), None
+
+
+"""Iteration"""
+
+
+def _callable_and_iterable(name, func, xs):
+    if not isinstance(func, (Function, BuiltinFunction)):
+        return _type_error(name, "a function", func)
+    if not hasattr(xs, "__iter__"):
+        return _type_error(name, "something iterable", xs)
+    return None, None
+
+
+@builtin("map", 2, calls_functions=True)
+def _map(call, func, xs):
+    _, message = _callable_and_iterable("map", func, xs)
+    if message:
+        return None, message
+
+    def frames():
+        for x in xs:
+            res = call(func, [x])
+            if res.error:
+                return res.error
+            yield res.value
+        return iteration_error(xs)
+
+    return Generator("map", frames()), None
+
+
+@builtin("filter", 2, calls_functions=True)
+def _filter(call, func, xs):
+    _, message = _callable_and_iterable("filter", func, xs)
+    if message:
+        return None, message
+
+    def frames():
+        for x in xs:
+            res = call(func, [x])
+            if res.error:
+                return res.error
+            if res.value is not None and res.value.is_true():
+                yield x
+        return iteration_error(xs)
+
+    return Generator("filter", frames()), None
+
+
+@builtin("take", 2)
+def _take(xs, count):
+    if not hasattr(xs, "__iter__"):
+        return _type_error("take", "something iterable", xs)
+    if not (isinstance(count, Number) and isinstance(count.value, int)):
+        return _type_error("take", "an integer count", count)
+
+    def frames():
+        if count.value <= 0:
+            return None
+        for taken, x in enumerate(xs, 1):
+            yield x
+            if taken == count.value:
+                # Stop without pulling another element from the source.
+                return None
+        return iteration_error(xs)
+
+    return Generator("take", frames()), None
+
+
+@builtin("pmap", 2, calls_functions=True)
+def _pmap(call, func, xs):
+    if not isinstance(func, Function):
+        return _type_error("pmap", "a Stanza function", func)
+    return parallel_map(call.interpreter, func, xs, call.node, call.context)
@@ -4,6 +4,12 @@ from enum import Enum, auto
 DIGITS = "0123456789"
 LETTERS = string.ascii_letters
 LETTERS_DIGITS = LETTERS + DIGITS
+IDENTIFIER_CHARS = LETTERS + "_"
+NUMBER_CHARS = DIGITS + "."
+
+# Same as CPython's default int/str conversion limit; longer literals are
+# rejected by the lexer instead of making int() quadratic (or raise).
+MAX_INT_DIGITS = 4300
 
 """TOKENS"""
 
@@ -32,6 +38,9 @@ class TT(Enum):
     COMMA = auto()
     ARROW = auto()
     STRING = auto()
+    LSQUARE = auto()
+    RSQUARE = auto()
+    COLON = auto()
 
 
 SIMPLE_TOKENS = {
@@ -47,6 +56,9 @@ SIMPLE_TOKENS = {
     ",": TT.COMMA,
     "<": TT.LT,
     ">": TT.GT,
+    "[": TT.LSQUARE,
+    "]": TT.RSQUARE,
+    ":": TT.COLON,
 }
 
 COMPLEX_TOKENS = {
@@ -67,12 +79,15 @@ KEYWORDS = [
     "else",
     "elif",
     "for",
+    "pfor",
     "step",
     "do",
     "to",
     "while",
     "in",
     "fn",
+    "yield",
+    "import",
 ]
 
 ESC_CHARS = {"n": "\n", "t": "\t", '"': '"'}
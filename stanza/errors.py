@@ -61,12 +61,25 @@ class ExpectedCharError(Error):
         super().__init__(pos_start, pos_end, "ExpectedCharError", details)
 
 
+class NumberTooLargeError(Error):
+    def __init__(self, pos_start, pos_end, details) -> None:
+        super().__init__(pos_start, pos_end, "NumberTooLargeError", details)
+
+
+class StaticTypeError(Error):
+    def __init__(self, pos_start, pos_end, details) -> None:
+        super().__init__(pos_start, pos_end, "TypeError", details)
+
+
 """POSITION"""
 
 
 class Position:
     """Keeps track of the position of the lexer."""
 
+    # Every token holds two of these, so they are kept small.
+    __slots__ = ("idx", "ln", "col", "fn", "ftxt")
+
     def __init__(self, idx, ln, col, fn, ftxt) -> None:
         self.idx = idx
         self.ln = ln
@@ -0,0 +1,189 @@
+import atexit
+import multiprocessing
+import os
+from array import array
+
+from . import errors
+from .constants import TT
+from .errors import Position
+from .lexer import Lexer, Token
+from .parser import Parser, ParseResult
+
+# Worker processes to use; None means os.cpu_count(). Set it before the first
+# parallel lex, since the pool is started once and then reused.
+WORKERS = None
+
+# Sources shorter than this are lexed and parsed in-process: shipping them to
+# the pool costs more than the front end itself.
+SERIAL_THRESHOLD = 256 * 1024
+
+# Each worker gets about this many chunks, so uneven chunks still balance.
+CHUNKS_PER_WORKER = 4
+
+
+"""Worker side"""
+
+
+def _lex_chunk(task):
+    """
+    Lexes one chunk of the source into flat data: token type codes, token
+    values, and six absolute position numbers per token (idx, ln, col of the
+    start, then of the end). Pickling Token and Position objects costs more
+    than lexing them, so objects are only built again in the parent. The
+    chunk's EOF token is dropped unless it is the last chunk. An error comes
+    back as (error class name, start, end, details) instead.
+    """
+    filename, chunk, offset, line, col, last = task
+    tokens, error = Lexer(filename, chunk).make_tokens()
+
+    def rebase(pos):
+        pos_col = pos.col + col if pos.ln == 0 else pos.col
+        return pos.idx + offset, pos.ln + line, pos_col
+
+    if error:
+        name = type(error).__name__
+        return name, rebase(error.pos_start), rebase(error.pos_end), error.details
+    if not last:
+        tokens.pop()
+    types = bytes(token.type.value for token in tokens)
+    values = [token.value for token in tokens]
+    positions = array("q")
+    for token in tokens:
+        positions.extend(rebase(token.pos_start))
+        positions.extend(rebase(token.pos_end))
+    return types, values, positions
+
+
+"""Parent side"""
+
+_pool = None
+
+
+def _workers():
+    return WORKERS or os.cpu_count() or 1
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = multiprocessing.Pool(_workers())
+        atexit.register(shutdown)
+    return _pool
+
+
+def shutdown():
+    """Stops the worker processes; the next parallel parse starts new ones."""
+    global _pool
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+        _pool = None
+
+
+def _string_end(text, start):
+    """Offset just past the string literal opening at `start`, as Lexer reads it."""
+    idx = start + 1
+    while True:
+        quote = text.find('"', idx)
+        if quote == -1:
+            return len(text)
+        backslash = text.find("\\", idx, quote)
+        if backslash == -1:
+            return quote + 1
+        idx = backslash + 2
+
+
+def _split_points(text, count):
+    """
+    Up to count - 1 offsets of spaces or tabs outside string literals, near
+    even fractions of the text. The lexer never reads a token across such a
+    space, so chunks cut there lex exactly as they do in one piece. (A
+    newline outside a string is an illegal character, so it is no boundary.)
+    """
+    points = []
+    size = len(text)
+    pos = 0
+    for n in range(1, count):
+        target = max(size * n // count, pos)
+        while target < size:
+            quote = text.find('"', pos)
+            if quote == -1:
+                quote = size
+            if quote > target:
+                space = _first_blank(text, target, quote)
+                if space != -1:
+                    points.append(space)
+                    pos = target = space + 1
+                    break
+            if quote == size:
+                return points
+            pos = _string_end(text, quote)
+            target = max(target, pos)
+    return points
+
+
+def _first_blank(text, start, end):
+    blanks = [text.find(blank, start, end) for blank in " \t"]
+    return min((idx for idx in blanks if idx != -1), default=-1)
+
+
+def lex(filename, text):
+    """
+    Same (tokens, error) as Lexer(filename, text).make_tokens(), with large
+    sources lexed in chunks on the worker pool. The error, if any, is the
+    one the serial lexer stops at: the first chunk that fails holds it, and
+    every chunk before it lexed cleanly.
+    """
+    workers = _workers()
+    if len(text) < SERIAL_THRESHOLD or workers == 1:
+        return Lexer(filename, text).make_tokens()
+
+    bounds = [0, *_split_points(text, workers * CHUNKS_PER_WORKER), len(text)]
+    tasks = []
+    for start, end in zip(bounds, bounds[1:]):
+        line = text.count("\n", 0, start)
+        col = start - (text.rfind("\n", 0, start) + 1)
+        tasks.append((filename, text[start:end], start, line, col, end == len(text)))
+
+    tokens = []
+    for result in _get_pool().imap(_lex_chunk, tasks):
+        if isinstance(result[0], str):
+            name, start, end, details = result
+            error_type = getattr(errors, name)
+            return [], error_type(
+                Position(*start, filename, text),
+                Position(*end, filename, text),
+                details,
+            )
+        tokens.extend(_tokens(filename, text, *result))
+    return tokens, None
+
+
+def _tokens(filename, text, types, values, positions):
+    """Builds the Tokens of one chunk back from _lex_chunk's flat data."""
+    tok_types = {tok_type.value: tok_type for tok_type in TT}
+    numbers = [iter(positions)] * 6
+    tokens = []
+    for tok_type, value, idx, ln, col, end_idx, end_ln, end_col in zip(
+        types, values, *numbers
+    ):
+        token = Token.__new__(Token)
+        token.type = tok_types[tok_type]
+        token.value = value
+        token.pos_start = Position(idx, ln, col, filename, text)
+        token.pos_end = Position(end_idx, end_ln, end_col, filename, text)
+        tokens.append(token)
+    return tokens
+
+
+def parse(filename, text):
+    """
+    Lexes and parses `text` like Lexer and Parser in sequence and returns the
+    ParseResult. Large sources are lexed on the worker pool (see lex); the
+    tokens are parsed in-process, because parsing costs a fraction of
+    lexing and a parsed tree is slower to send back than to build.
+    """
+    tokens, error = lex(filename, text)
+    if error:
+        return ParseResult().failure(error)
+    return Parser(tokens).parse()
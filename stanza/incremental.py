@@ -0,0 +1,375 @@
+from bisect import bisect_left
+
+from .analysis import iter_children, walk
+from .constants import TT
+from .errors import Position
+from .lexer import Lexer, Token
+from .nodes import FuncDefNode, PForNode, VarAssignmentNode, YieldNode
+from .parser import Parser
+
+# Tokens that can follow an expression but that no expression can consume:
+# whatever the expression in front of one of them turns into, the parser
+# still stops there and carries on exactly as before. An expression that
+# ends at one of these is re-parsed on its own after an edit.
+_DELIMITERS = (TT.COMMA, TT.RPAREN, TT.RSQUARE, TT.COLON)
+_DELIMITER_KEYWORDS = ("then", "do")
+
+
+def _is_delimiter(token):
+    if token.type in _DELIMITERS:
+        return True
+    return token.type == TT.KEYWORD and token.value in _DELIMITER_KEYWORDS
+
+
+class _RecordingParser(Parser):
+    """
+    A Parser that remembers, for every expression() it parses, the token just
+    before it, the token just after it and the node, so that the expression
+    can later be re-parsed on its own. It also collects the positions the
+    parser copies instead of sharing with a token (those of let and
+    reassignment nodes), which have to be shifted along with the tokens.
+    """
+
+    def __init__(self, tokens, in_function=False) -> None:
+        super().__init__(tokens)
+        if in_function:
+            self._yields = False
+        self.spans = []
+        self.copied_positions = []
+
+    def expression(self):
+        start = self.token_index
+        res = super().expression()
+        if not res.error:
+            if start > 0:
+                self.spans.append(
+                    (self.tokens[start - 1], self.current_token, res.node)
+                )
+            if isinstance(res.node, VarAssignmentNode):
+                self.copied_positions.append(res.node.pos_start)
+        return res
+
+
+"""Document"""
+
+
+class Document:
+    """
+    A source text kept lexed and parsed across edits, for editors that check
+    a script on every keystroke.
+
+    reparse((offset, deleted, inserted)) replaces `deleted` characters at
+    `offset` with the `inserted` text and returns (node, error) as Lexer and
+    Parser would for the new text. Lexing restarts at the first token the
+    edit can touch and stops as soon as a token starts where an old one did;
+    tokens after that are kept and their positions shifted. The parser then
+    re-parses only the innermost expression around the change that ends at
+    a delimiter (see _DELIMITERS), and splices the new subtree into the old
+    tree. Whenever that is not possible (the previous text did not parse,
+    the expression is inside a pfor body, a yield appears or disappears, or
+    the expression does not parse on its own) the whole token list is
+    parsed again, so results and errors are always those of a fresh parse.
+
+    Shifting positions still touches every token after the edit, but that
+    is cheap next to lexing and parsing them.
+    """
+
+    def __init__(self, text, filename="<editor>") -> None:
+        self.filename = filename
+        self.text = text
+        self.tokens = None
+        self.node = None
+        self.error = None
+        self._spans = {}
+        self._copied_positions = []
+        self._lex_all()
+        self._parse_all()
+
+    def reparse(self, edit):
+        offset, deleted, inserted = edit
+        if not 0 <= offset <= offset + deleted <= len(self.text):
+            raise ValueError(
+                f"Edit ({offset}, {deleted}) is outside of a {len(self.text)} "
+                "character text"
+            )
+        old_text = self.text
+        self.text = old_text[:offset] + inserted + old_text[offset + deleted :]
+
+        if self.tokens is None:
+            self._lex_all()
+            self._parse_all()
+            return self.node, self.error
+
+        old = self.tokens
+        changed = self._relex(offset, deleted, inserted)
+        if changed is None:
+            # Lexing failed; self.error says where.
+            return None, self.error
+        start, old_end, fresh, new_sync = changed
+        # Found before positions move, while the old tree is consistent.
+        slot = None
+        if self.node is not None and (start < old_end or fresh):
+            slot = self._slot(old, start, old_end)
+        self._shift(old, start, old_end, new_sync, len(inserted) - deleted)
+        self.tokens = old[:start] + fresh + old[old_end:]
+
+        if start == old_end and not fresh:
+            # Only blanks changed: the tree stands, with shifted positions.
+            return self.node, self.error
+        if slot is None or not self._reparse_slot(old, start, old_end, fresh, slot):
+            self._parse_all()
+        return self.node, self.error
+
+    """----------lexing----------"""
+
+    def _lex_all(self):
+        tokens, error = Lexer(self.filename, self.text).make_tokens()
+        self.tokens = tokens if not error else None
+        self.error = error
+        self.node = None
+
+    def _relex(self, offset, deleted, inserted):
+        """
+        Re-lexes the text around an edit. Returns (start, old_end, fresh,
+        new_sync): the old tokens[start:old_end] are to be replaced by
+        `fresh`, and old tokens[old_end], where the old and new tokens meet
+        again, now starts at new_sync. Returns None, and drops the tokens, if
+        the new text does not lex.
+        """
+        old = self.tokens
+        text = self.text
+        delta = len(inserted) - deleted
+        edit_end = offset + len(inserted)
+
+        # A token that ends where the edit starts may run into the new text.
+        start = bisect_left(old, offset, key=lambda token: token.pos_end.idx)
+        first = old[start].pos_start
+        idx, ln, col = first.idx, first.ln, first.col
+        if offset < idx:
+            # The edit starts in the blanks before that token.
+            col -= idx - offset
+            idx = offset
+        lexer = Lexer(self.filename, text, Position(idx, ln, col, self.filename, text))
+
+        fresh = []
+        while True:
+            token, error = lexer.next_token()
+            if error:
+                self.tokens = None
+                self.node = None
+                self.error = error
+                return None
+            idx = token.pos_start.idx
+            if idx >= edit_end:
+                # Same text from here on: an old token starting at the same
+                # place lexes the same, and so does the rest.
+                old_end = bisect_left(
+                    old, idx - delta, lo=start, key=lambda tok: tok.pos_start.idx
+                )
+                if old_end < len(old) and old[old_end].pos_start.idx == idx - delta:
+                    break
+            fresh.append(token)
+            if token.type == TT.EOF:
+                # No common tail (a string now runs to the end, or no longer
+                # does): every old token from `start` on is replaced.
+                old_end = len(old)
+                break
+
+        # Tokens at the front that came out the same are kept.
+        kept = 0
+        while (
+            kept < len(fresh)
+            and start + kept < old_end
+            and _same_token(fresh[kept], old[start + kept])
+        ):
+            kept += 1
+        start += kept
+        fresh = fresh[kept:]
+
+        return start, old_end, fresh, token.pos_start if old_end < len(old) else None
+
+    def _shift(self, old, start, old_end, new_sync, delta):
+        """
+        Moves the positions of old[old_end:] (and copied positions there) to
+        where they are in the new text, and points every kept position at
+        the new text.
+        """
+        text = self.text
+        for token in old[:start]:
+            token.pos_start.ftxt = token.pos_end.ftxt = text
+        for pos in self._copied_positions:
+            pos.ftxt = text
+        if new_sync is None:
+            return
+
+        sync = old[old_end].pos_start
+        sync_idx, sync_ln = sync.idx, sync.ln
+        col_delta = new_sync.col - sync.col
+        ln_delta = new_sync.ln - sync_ln
+        moved = [
+            pos for token in old[old_end:] for pos in (token.pos_start, token.pos_end)
+        ]
+        moved.extend(pos for pos in self._copied_positions if pos.idx >= sync_idx)
+        for pos in moved:
+            if pos.ln == sync_ln:
+                pos.col += col_delta
+            pos.ln += ln_delta
+            pos.idx += delta
+            pos.ftxt = text
+
+    """----------parsing----------"""
+
+    def _parse_all(self):
+        self._spans = {}
+        self._copied_positions = []
+        if self.tokens is None:
+            return
+        parser = _RecordingParser(self.tokens)
+        ast = parser.parse()
+        if ast.error:
+            self.node, self.error = None, ast.error
+        else:
+            self.node, self.error = ast.node, None
+            self._remember(parser)
+
+    def _remember(self, parser, after=None, eof=None):
+        for before, end, node in parser.spans:
+            if end is eof:
+                end = after
+            self._spans.setdefault(id(end), []).append((before, node))
+        self._copied_positions.extend(parser.copied_positions)
+
+    def _index(self, tokens, token):
+        """Index of `token` in `tokens`, or None if it is not there."""
+        idx = token.pos_start.idx
+        found = bisect_left(tokens, idx, key=lambda tok: tok.pos_start.idx)
+        if found < len(tokens) and tokens[found] is token:
+            return found
+        return None
+
+    def _slot(self, old, start, old_end):
+        """
+        The innermost recorded expression around old[start:old_end] that ends
+        at a delimiter, as (before index, after index, path from the root to
+        its node); None if there is none, or if it cannot be re-parsed on
+        its own.
+        """
+        for after in range(old_end, len(old)):
+            entries = self._spans.get(id(old[after]))
+            if not entries or not _is_delimiter(old[after]):
+                continue
+            best = None
+            for before, node in entries:
+                before_idx = self._index(old, before)
+                if before_idx is not None and before_idx < start:
+                    if best is None or before_idx > best[0]:
+                        best = (before_idx, node)
+            if best:
+                break
+        else:
+            return None
+
+        before_idx, node = best
+        path = _path(self.node, node)
+        if path is None or any(isinstance(sub, PForNode) for sub in path):
+            # pfor bodies are checked as a whole when they are parsed.
+            return None
+        if any(isinstance(sub, YieldNode) for sub in walk(node)):
+            # Whether a function is a generator depends on its whole body.
+            return None
+        return before_idx, after, path
+
+    def _reparse_slot(self, old, start, old_end, fresh, slot):
+        """
+        Re-parses the expression `slot` (see _slot) from the new tokens and
+        puts its node in place of the old one. Returns False if it does not
+        parse on its own, or turns out to yield.
+        """
+        before_idx, after_idx, path = slot
+        old_node = path[-1]
+        new_after = after_idx + len(fresh) - (old_end - start)
+        after = self.tokens[new_after]
+        eof = Token(TT.EOF, pos_start=after.pos_start)
+        in_function = any(isinstance(sub, FuncDefNode) for sub in path)
+        parser = _RecordingParser(
+            self.tokens[before_idx + 1 : new_after] + [eof], in_function
+        )
+        ast = parser.parse()
+        if ast.error or parser._yields:
+            return False
+        new_node = ast.node
+
+        self._forget(old, before_idx, after_idx, old_node)
+        if len(path) == 1:
+            self.node = new_node
+        else:
+            _replace_child(path[-2], old_node, new_node)
+            for node in path[:-1]:
+                if node.pos_start is old_node.pos_start:
+                    node.pos_start = new_node.pos_start
+                if node.pos_end is old_node.pos_end:
+                    node.pos_end = new_node.pos_end
+        self._spans.setdefault(id(after), []).append((old[before_idx], new_node))
+        self._remember(parser, after, eof)
+        self.error = None
+        return True
+
+    def _forget(self, old, before_idx, after_idx, old_node):
+        """Drops what was recorded about the expression being replaced."""
+        for token in old[before_idx + 1 : after_idx]:
+            self._spans.pop(id(token), None)
+        # Spans ending at the same delimiter but starting inside the slot,
+        # the slot itself included. (Positions have moved by now, so tokens
+        # are told apart by identity rather than found by offset.)
+        inside = set(map(id, old[before_idx:after_idx]))
+        entries = self._spans.get(id(old[after_idx]), [])
+        entries[:] = [
+            (before, node) for before, node in entries if id(before) not in inside
+        ]
+        replaced = {
+            id(node.pos_start)
+            for node in walk(old_node)
+            if isinstance(node, VarAssignmentNode)
+        }
+        self._copied_positions = [
+            pos for pos in self._copied_positions if id(pos) not in replaced
+        ]
+
+
+def _same_token(a, b):
+    return (
+        a.type == b.type
+        and a.value == b.value
+        and a.pos_start.idx == b.pos_start.idx
+        and a.pos_end.idx == b.pos_end.idx
+    )
+
+
+def _path(root, target):
+    """Nodes from `root` down to `target`, found by position; None if lost."""
+    path = [root]
+    node = root
+    start, end = target.pos_start.idx, target.pos_end.idx
+    while node is not target:
+        for child in iter_children(node):
+            if child is target or (
+                child.pos_start.idx <= start and end <= child.pos_end.idx
+            ):
+                break
+        else:
+            return None
+        path.append(child)
+        node = child
+    return path
+
+
+def _replace_child(parent, old, new):
+    for name, value in vars(parent).items():
+        if value is old:
+            setattr(parent, name, new)
+        elif isinstance(value, list):
+            for idx, item in enumerate(value):
+                if item is old:
+                    value[idx] = new
+                elif isinstance(item, tuple) and any(sub is old for sub in item):
+                    value[idx] = tuple(new if sub is old else sub for sub in item)
@@ -0,0 +1,375 @@
+import operator
+
+from .constants import TT
+from .errors import StaticTypeError
+from .interpreter import Boolean, Number
+from .nodes import RangeNode
+
+"""Types"""
+
+INT = "int"
+FLOAT = "float"
+NUMBER = "number"  # an int or a float, not known which
+STRING = "string"
+BOOL = "bool"
+FUNCTION = "function"
+LIST = "list"
+RANGE = "range"
+
+NUMERIC = frozenset((INT, FLOAT, NUMBER))
+
+ARITHMETIC = (TT.PLUS, TT.MINUS, TT.MUL, TT.DIVIDE, TT.MODULO)
+ORDERING = (TT.GT, TT.LT, TT.GTE, TT.LTE)
+
+
+def join(a, b):
+    """The most precise type both `a` and `b` belong to; None is unknown."""
+    if a == b:
+        return a
+    if a in NUMERIC and b in NUMERIC:
+        return NUMBER
+    return None
+
+
+def _a(kind):
+    return f"an {kind}" if kind == INT else f"a {kind}"
+
+
+def _join_envs(a, b):
+    joined = {}
+    for name, kind in a.items():
+        kind = join(kind, b.get(name))
+        if kind is not None:
+            joined[name] = kind
+    return joined
+
+
+"""Fast paths"""
+
+# Unchecked operations for BinOpNodes whose operands are proven numbers: the
+# raw operation on the two Python numbers and the value type to wrap it in,
+# skipping the isinstance dispatch in the Number operators. Division and
+# modulo keep their zero checks. Plain module functions, so ASTs still pickle.
+FAST_BINARY = {
+    TT.PLUS: (operator.add, Number),
+    TT.MINUS: (operator.sub, Number),
+    TT.MUL: (operator.mul, Number),
+    TT.EE: (operator.eq, Boolean),
+    TT.NE: (operator.ne, Boolean),
+    TT.GT: (operator.gt, Boolean),
+    TT.LT: (operator.lt, Boolean),
+    TT.GTE: (operator.ge, Boolean),
+    TT.LTE: (operator.le, Boolean),
+}
+
+
+"""Report"""
+
+
+class TypeReport:
+    """
+    What infer() proved: `types` maps id(node) to the node's type (None when
+    unknown), `errors` lists guaranteed type errors as StaticTypeErrors, and
+    `operations`/`proven` count the operators and those whose operand types
+    were all known.
+    """
+
+    def __init__(self, types, errors, operations, proven) -> None:
+        self.types = types
+        self.errors = errors
+        self.operations = operations
+        self.proven = proven
+
+    def type_of(self, node):
+        return self.types.get(id(node))
+
+    @property
+    def coverage(self):
+        """Fraction of operators whose operand types were proven."""
+        if not self.operations:
+            return 1.0
+        return self.proven / self.operations
+
+    def __repr__(self) -> str:
+        return (
+            f"TypeReport({self.proven}/{self.operations} operations proven, "
+            f"{len(self.errors)} errors)"
+        )
+
+
+"""Inference"""
+
+
+class _Inferrer:
+    """
+    Flow-sensitive: `env` maps the names assigned so far to their current
+    type and is updated in evaluation order. Branches are joined, and loop
+    bodies are re-inferred until the types at the loop head stop changing,
+    so labels inside a loop hold for every iteration. Function bodies start
+    from an empty env, since they run later with whatever values exist then.
+    """
+
+    def __init__(self) -> None:
+        self.types = {}
+        self.errors = {}
+        self.operators = {}
+
+    def visit(self, node, env):
+        method = getattr(self, f"visit_{type(node).__name__}")
+        kind = method(node, env)
+        self.types[id(node)] = kind
+        return kind
+
+    def _error(self, node, details):
+        self.errors[id(node)] = StaticTypeError(node.pos_start, node.pos_end, details)
+
+    def _operator(self, node, *operand_types):
+        # Re-visits (loops) overwrite earlier verdicts for the same node.
+        self.errors.pop(id(node), None)
+        self.operators[id(node)] = all(kind is not None for kind in operand_types)
+
+    def _fixpoint(self, env, run_body):
+        """Runs `run_body(trial_env)` until `env` is stable; returns it."""
+        while True:
+            trial = dict(env)
+            run_body(trial)
+            joined = _join_envs(env, trial)
+            if joined == env:
+                return env
+            env.clear()
+            env.update(joined)
+
+    def visit_NumberNode(self, node, env):
+        return INT if isinstance(node.token.value, int) else FLOAT
+
+    def visit_StringNode(self, node, env):
+        return STRING
+
+    def visit_VarAccessNode(self, node, env):
+        return env.get(node.var_access_tok.value)
+
+    def visit_VarAssignmentNode(self, node, env):
+        kind = self.visit(node.value, env)
+        if kind is None:
+            env.pop(node.var_name, None)
+        else:
+            env[node.var_name] = kind
+        return None
+
+    visit_VarReassignmentNode = visit_VarAssignmentNode
+
+    def visit_BinOpNode(self, node, env):
+        left = self.visit(node.left_node, env)
+        right = self.visit(node.right_node, env)
+        op = node.op.type
+        self._operator(node, left, right)
+
+        proven_numbers = left in NUMERIC and right in NUMERIC
+        node.fast_op = FAST_BINARY.get(op) if proven_numbers else None
+
+        if op in ARITHMETIC:
+            return self._arithmetic(node, op, left, right)
+        if op in (TT.EE, TT.NE):
+            if left in (BOOL, FUNCTION):
+                self._error(node, f"{_a(left).capitalize()} cannot be compared")
+            elif left == STRING and right not in (None, STRING):
+                self._error(node, f"Cannot compare a string with {_a(right)}")
+            return BOOL
+        if op in ORDERING:
+            if left in NUMERIC and right not in NUMERIC and right is not None:
+                self._error(node, f"Cannot order a number and {_a(right)}")
+            elif left is not None and left not in NUMERIC:
+                self._error(node, f"{_a(left).capitalize()} cannot be ordered")
+            return BOOL
+        return None
+
+    def _arithmetic(self, node, op, left, right):
+        if left in NUMERIC and right in NUMERIC:
+            if op == TT.DIVIDE:
+                return FLOAT
+            if left == right == INT:
+                return INT
+            if FLOAT in (left, right):
+                return FLOAT
+            return NUMBER
+        if LIST in (left, right) and (left in NUMERIC or right in NUMERIC):
+            return LIST
+        if left == STRING:
+            if op == TT.PLUS and right in (None, STRING):
+                return STRING
+            if op == TT.MUL and right in (None, INT, NUMBER):
+                return STRING
+            other = "" if right is None else f" and {_a(right)}"
+            self._error(node, f"Illegal operation on a string{other}")
+            return None
+        if left in (BOOL, FUNCTION, RANGE) or right in (BOOL, FUNCTION, RANGE):
+            if left is not None and right is not None:
+                self._error(node, f"Illegal operation on {_a(left)} and {_a(right)}")
+            elif left in (BOOL, FUNCTION, RANGE):
+                self._error(node, f"Illegal operation on {_a(left)}")
+            return None
+        if left in NUMERIC and right == STRING:
+            self._error(node, "Illegal operation on a number and a string")
+        return None
+
+    def visit_PowerOpNode(self, node, env):
+        base = self.visit(node.base, env)
+        exponent = self.visit(node.exponent, env)
+        self._operator(node, base, exponent)
+        if base in NUMERIC and exponent in NUMERIC:
+            # int ** negative int is a float; fractional powers may be complex
+            return NUMBER if base == exponent == INT else None
+        if base is not None and base not in NUMERIC:
+            self._error(node, f"Cannot raise {_a(base)} to a power")
+        elif base in NUMERIC and exponent is not None:
+            self._error(node, f"Cannot raise a number to {_a(exponent)}")
+        return None
+
+    def visit_UnaryOpNode(self, node, env):
+        operand = self.visit(node.node, env)
+        self._operator(node, operand)
+        if node.op.type == TT.MINUS:
+            if operand in NUMERIC or operand == LIST:
+                return operand
+            if operand is not None:
+                self._error(node, f"Cannot negate {_a(operand)}")
+            return None
+        if node.op.matches(TT.KEYWORD, "not") and operand == BOOL:
+            return BOOL
+        return operand
+
+    def visit_IfNode(self, node, env):
+        outcomes = []
+        kinds = []
+        for condition, expr in node.cases:
+            self.visit(condition, env)
+            branch = dict(env)
+            kinds.append(self.visit(expr, branch))
+            outcomes.append(branch)
+        if node.else_expr:
+            branch = dict(env)
+            kinds.append(self.visit(node.else_expr, branch))
+            outcomes.append(branch)
+        else:
+            kinds.append(None)
+            outcomes.append(dict(env))
+
+        joined = outcomes[0]
+        for outcome in outcomes[1:]:
+            joined = _join_envs(joined, outcome)
+        env.clear()
+        env.update(joined)
+
+        kind = kinds[0]
+        for other in kinds[1:]:
+            kind = join(kind, other)
+        return kind
+
+    def _element_type(self, node, iterable):
+        if iterable == STRING:
+            return STRING
+        if isinstance(node, RangeNode) and iterable == RANGE:
+            start = self.types.get(id(node.start_node))
+            step = self.types.get(id(node.step_node)) if node.step_node else INT
+            if start == step == INT:
+                return INT
+            if FLOAT in (start, step):
+                return FLOAT
+            if start in NUMERIC and step in NUMERIC:
+                return NUMBER
+        return None
+
+    def visit_ForNode(self, node, env):
+        iterable = self.visit(node.iterable_node, env)
+        element = self._element_type(node.iterable_node, iterable)
+        name = node.var_name_tok.value
+
+        def run_body(trial):
+            if element is None:
+                trial.pop(name, None)
+            else:
+                trial[name] = element
+            self.visit(node.body, trial)
+
+        self._fixpoint(env, run_body)
+        return None
+
+    def visit_WhileNode(self, node, env):
+        def run_body(trial):
+            self.visit(node.condition_node, trial)
+            self.visit(node.body, trial)
+
+        self._fixpoint(env, run_body)
+        # The condition runs once more when the loop exits.
+        self.visit(node.condition_node, env)
+        return None
+
+    def visit_PForNode(self, node, env):
+        iterable = self.visit(node.iterable_node, env)
+        element = self._element_type(node.iterable_node, iterable)
+        body_env = {} if element is None else {node.var_name_tok.value: element}
+        self.visit(node.body, body_env)
+        return LIST
+
+    def visit_FuncDefNode(self, node, env):
+        self.visit(node.body_node, {})
+        if node.func_name_tok:
+            env[node.func_name_tok.value] = FUNCTION
+        return FUNCTION
+
+    def visit_CallNode(self, node, env):
+        self.visit(node.node_to_call, env)
+        for arg in node.arg_nodes:
+            self.visit(arg, env)
+        return None
+
+    def visit_ListNode(self, node, env):
+        for element in node.element_nodes:
+            self.visit(element, env)
+        return LIST
+
+    def visit_RangeNode(self, node, env):
+        for bound in (node.start_node, node.end_node, node.step_node):
+            if bound is not None:
+                self.errors.pop(id(bound), None)
+                kind = self.visit(bound, env)
+                if kind is not None and kind not in NUMERIC:
+                    self._error(bound, "Range bounds must be numbers")
+        return RANGE
+
+    def visit_IndexNode(self, node, env):
+        base = self.visit(node.node, env)
+        self.visit(node.index_node, env)
+        return STRING if base == STRING else None
+
+    def visit_SliceNode(self, node, env):
+        base = self.visit(node.node, env)
+        for bound in (node.start_node, node.end_node):
+            if bound is not None:
+                self.visit(bound, env)
+        return base if base in (STRING, LIST, RANGE) else None
+
+    def visit_YieldNode(self, node, env):
+        self.visit(node.value_node, env)
+        return None
+
+    def visit_ImportNode(self, node, env):
+        # Imported names are unknown until their module is evaluated.
+        return None
+
+
+def infer(node):
+    """
+    Infers the types of `node` and everything below it. Operators whose
+    operands are proven numbers get a `fast_op` the interpreter uses instead
+    of the checked Number operators. Returns a TypeReport.
+    """
+    inferrer = _Inferrer()
+    inferrer.visit(node, {})
+    operators = inferrer.operators
+    return TypeReport(
+        inferrer.types,
+        list(inferrer.errors.values()),
+        len(operators),
+        sum(operators.values()),
+    )
@@ -0,0 +1,50 @@
+from .interpreter import Boolean, Buffer, List, Number, Range, String, Value
+
+"""Host conversion"""
+
+
+def to_python(value):
+    """
+    Converts a runtime value into a plain Python object: Number -> int/float,
+    String -> str, Boolean -> bool, List -> list, Range -> range (or a list
+    for float ranges), Buffer -> its read-only memoryview. Values without a
+    Python equivalent (functions) are returned as their repr.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (Number, String, Boolean, Buffer)):
+        return value.value
+    if isinstance(value, List):
+        if value.is_typed:
+            return value.elements.tolist()
+        return [to_python(element) for element in value.elements]
+    if isinstance(value, Range):
+        if value.range is not None:
+            return value.range
+        return [to_python(element) for element in value]
+    return repr(value)
+
+
+def from_python(obj):
+    """
+    Converts a Python object into a runtime value. Values pass through
+    unchanged; bool, int, float and str map onto Boolean, Number and String,
+    lists and tuples onto List, and anything exposing the buffer protocol
+    (bytes, memoryview, array.array, NumPy arrays) is wrapped, without
+    copying, in a read-only Buffer.
+    """
+    if isinstance(obj, Value):
+        return obj
+    if isinstance(obj, bool):
+        return Boolean(obj)
+    if isinstance(obj, (int, float)):
+        return Number(obj)
+    if isinstance(obj, str):
+        return String(obj)
+    if isinstance(obj, (list, tuple)):
+        return List.from_values([from_python(item) for item in obj])
+    try:
+        return Buffer(obj)
+    except TypeError:
+        pass
+    raise TypeError(f"Cannot convert {type(obj).__name__} to a Stanza value")
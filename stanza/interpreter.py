@@ -1,3 +1,9 @@
+import math
+import operator
+from array import array
+from itertools import repeat
+
+from .budget import Budget
 from .constants import TT
 from .errors import RTError
 from .nodes import (
@@ -6,15 +12,23 @@ from .nodes import (
     ForNode,
     FuncDefNode,
     IfNode,
+    ImportNode,
+    IndexNode,
+    ListNode,
     NumberNode,
+    PForNode,
     PowerOpNode,
+    RangeNode,
+    SliceNode,
     StringNode,
     UnaryOpNode,
     VarAccessNode,
     VarAssignmentNode,
     VarReassignmentNode,
     WhileNode,
+    YieldNode,
 )
+from .output import NullSink, OutputSink
 
 """Context"""
 
@@ -37,7 +51,7 @@ class SymbolTable:
 
     def get(self, name):
         value = self.symbols.get(name, None)
-        if not value and self.parent:
+        if value is None and self.parent:
             return self.parent.get(name)
         return value
 
@@ -100,19 +114,39 @@ class Boolean(Value):
 
 
 class Function(Value):
-    def __init__(self, name, args_node, body_node, original_context) -> None:
+    def __init__(
+        self, name, args_node, body_node, original_context, is_generator=False
+    ) -> None:
         super().__init__()
         self.name = name.value if name else "|anonymous|"
         self.args_node = args_node
         self.body_node = body_node
+        self.is_generator = is_generator
         self.set_context(original_context)
 
+    def copy(self):
+        copy = Function(
+            None, self.args_node, self.body_node, self.context, self.is_generator
+        )
+        copy.name = self.name
+        return copy.set_pos(self.pos_start, self.pos_end)
+
     def execute(self, args, curr_interpreter):
         res = RTResult()
         new_context = Context(self.name, self.context, self.pos_start)
         new_context.symbol_table = SymbolTable(new_context.parent.symbol_table)
 
+        budget = curr_interpreter.budget
+        if budget:
+            message = budget.enter()
+            if message:
+                return res.failure(
+                    RTError(self.pos_start, self.pos_end, message, new_context)
+                )
+
         if len(args) != len(self.args_node):
+            if budget:
+                budget.leave()
             return res.failure(
                 RTError(
                     self.pos_start,
@@ -125,7 +159,16 @@ class Function(Value):
         for i, arg in enumerate(args):
             new_context.symbol_table.set(self.args_node[i].value, arg)
 
+        if self.is_generator:
+            # Nothing runs yet: the body starts on the first iteration.
+            if budget:
+                budget.leave()
+            frames = curr_interpreter.iter_visit(self.body_node, new_context)
+            return res.success(Generator(self.name, frames))
+
         out = res.register(curr_interpreter.visit(self.body_node, new_context))
+        if budget:
+            budget.leave()
         if res.error:
             return res
         return res.success(out)
@@ -134,6 +177,119 @@ class Function(Value):
         return f"function {self.name}"
 
 
+class BuiltinFunction(Value):
+    """
+    A function implemented in Python. `func` receives the evaluated argument
+    values and returns (value, error_message) like the Value operators do;
+    the error may also be an RTError raised by a function it called.
+    `arity` is an exact argument count, a (min, max) pair where max may be
+    None, or None for any number of arguments. With `calls_functions` the
+    first argument passed to `func` is a Caller for running function values.
+    `result_size`, when given, estimates from the same arguments how many
+    bytes the result will take, so a Budget can charge it beforehand (see
+    result_size below); it must return 0 for arguments `func` rejects.
+    """
+
+    def __init__(
+        self, name, func, arity=None, calls_functions=False, result_size=None
+    ) -> None:
+        super().__init__()
+        self.name = name
+        self.func = func
+        self.calls_functions = calls_functions
+        self.result_size = result_size
+        if isinstance(arity, int):
+            arity = (arity, arity)
+        self.min_args, self.max_args = arity or (0, None)
+
+    def check_arity(self, count):
+        if count < self.min_args:
+            if self.min_args == self.max_args:
+                return f"Expected {self.min_args} arguments, got {count}"
+            return f"Expected at least {self.min_args} arguments, got {count}"
+        if self.max_args is not None and count > self.max_args:
+            if self.min_args == self.max_args:
+                return f"Expected {self.max_args} arguments, got {count}"
+            return f"Expected at most {self.max_args} arguments, got {count}"
+        return None
+
+    def __repr__(self) -> str:
+        return f"builtin function {self.name}"
+
+
+class Caller:
+    """
+    Handed to builtins registered with calls_functions. `call(func, args)`
+    runs a function value and returns its RTResult; errors point at the
+    builtin's call site.
+    """
+
+    __slots__ = ("interpreter", "node", "context")
+
+    def __init__(self, interpreter, node, context) -> None:
+        self.interpreter = interpreter
+        self.node = node
+        self.context = context
+
+    def __call__(self, func, args):
+        return self.interpreter.call(func, args, self.node, self.context)
+
+
+class Pending(Value):
+    """
+    A name bound by `import` whose definition has not been evaluated yet.
+    Reading it evaluates the definition in its module (see stanza.modules)
+    the first time; force() returns (value, error).
+    """
+
+    def __init__(self, instance, name) -> None:
+        super().__init__()
+        self.instance = instance
+        self.name = name
+
+    def force(self, interpreter):
+        return self.instance.evaluate(self.name, interpreter)
+
+    def __repr__(self) -> str:
+        return f"<pending {self.name}>"
+
+
+class Generator(Value):
+    """
+    A suspended generator function call (or lazy builtin such as map).
+    Iterating it resumes the body up to its next `yield`, so a pipeline only
+    holds the element in flight. It can be iterated once. An error inside the
+    body ends the iteration and is kept in `error` for the consumer to report.
+    """
+
+    def __init__(self, name, frames) -> None:
+        super().__init__()
+        self.name = name
+        self.frames = frames
+        self.error = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.frames)
+        except StopIteration as stop:
+            if stop.value is not None:
+                self.error = stop.value
+            raise StopIteration from None
+
+    def __repr__(self) -> str:
+        return f"generator {self.name}"
+
+
+def iteration_error(iterable):
+    """The error that cut an iteration over `iterable` short, if any."""
+    if isinstance(iterable, Generator):
+        return iterable.error
+    return None
+
+
 class Number(Value):
     def __init__(self, value) -> None:
         super().__init__()
@@ -180,7 +336,15 @@ class Number(Value):
 
     def __pow__(self, other_number):
         if isinstance(other_number, Number):
-            return Number(self.value**other_number.value), None
+            try:
+                return Number(self.value**other_number.value), None
+            except OverflowError:
+                return None, RTError(
+                    other_number.pos_start,
+                    other_number.pos_end,
+                    "Result too large",
+                    self.context,
+                )
         return NotImplemented
 
     def stanza_eq(self, other):
@@ -215,32 +379,72 @@ class Number(Value):
 
 
 class String(Value):
+    """
+    Concatenation and repetition do not copy: once a result is at least
+    ROPE_THRESHOLD characters long it is kept as a rope node pointing at its
+    operands, and the rope is flattened into a single str the first time the
+    contents are read through `value`. Length and ASCII-ness are tracked
+    eagerly, so neither needs a flatten.
+    """
+
+    ROPE_THRESHOLD = 256
+
     def __init__(self, value) -> None:
         super().__init__()
-        self.value = value
+        self._value = value
+        self._rope = None
+        self.length = len(value)
+        self.is_ascii = value.isascii()
+
+    @classmethod
+    def _from_rope(cls, rope, length, is_ascii):
+        string = cls("")
+        string._value = None
+        string._rope = rope
+        string.length = length
+        string.is_ascii = is_ascii
+        return string
+
+    @property
+    def value(self):
+        if self._value is None:
+            self._value = _flatten(self._rope)
+            self._rope = None
+        return self._value
 
     def __add__(self, other):
         if isinstance(other, String):
-            return String(self.value + other.value), None
+            length = self.length + other.length
+            if length < String.ROPE_THRESHOLD:
+                return String(self.value + other.value), None
+            is_ascii = self.is_ascii and other.is_ascii
+            return String._from_rope((_CONCAT, self, other), length, is_ascii), None
         return None, RTError(
             self.pos_start, self.pos_end, "Illegal operation", self.context
         )
 
     def __mul__(self, other):
-        if isinstance(other, Number):
-            return String(self.value * other.value), None
+        if isinstance(other, Number) and isinstance(other.value, int):
+            count = max(other.value, 0)
+            length = self.length * count
+            if length < String.ROPE_THRESHOLD:
+                return String(self.value * count), None
+            rope = (_REPEAT, self, count)
+            return String._from_rope(rope, length, self.is_ascii), None
         return None, RTError(
             self.pos_start, self.pos_end, "Illegal operation", self.context
         )
 
     def __len__(self):
-        return Number(len(self.value)), None
+        return Number(self.length), None
 
     def __bool__(self):
-        return len(self.value) > 0
+        return self.length > 0
 
     def stanza_eq(self, other):
         if isinstance(other, String):
+            if self.length != other.length:
+                return Boolean(False), None
             return Boolean(self.value == other.value), None
         return None, RTError(
             other.pos_start, other.pos_end, "Expected a string", self.context
@@ -248,24 +452,425 @@ class String(Value):
 
     def stanza_ne(self, other):
         if isinstance(other, String):
+            if self.length != other.length:
+                return Boolean(True), None
             return Boolean(self.value != other.value), None
         return None, RTError(
             other.pos_start, other.pos_end, "Expected a string", self.context
         )
 
     def is_true(self):
-        return len(self.value) > 0
+        return self.length > 0
+
+    def item(self, index):
+        return String(self.value[index])
+
+    def slice(self, start, stop):
+        return String(self.value[start:stop])
+
+    def __iter__(self):
+        return map(String, self.value)
 
     def __repr__(self) -> str:
         return f'"{self.value}"'
 
 
+_CONCAT = 0
+_REPEAT = 1
+
+
+class Buffer(Value):
+    """
+    Read-only, zero-copy view of host memory: bytes, bytearray, memoryview,
+    array.array, NumPy arrays or anything else exposing the buffer protocol.
+
+    Indexing reads one element straight out of the buffer and slicing returns
+    another Buffer over the same memory, so nothing is copied and nothing is
+    charged to a Budget. Multi-dimensional C-contiguous buffers are seen as
+    their flattened 1-D form. `value` is the underlying read-only memoryview.
+    """
+
+    FORMATS = frozenset("bBhHiIlLqQnNfd?c")
+
+    def __init__(self, data) -> None:
+        super().__init__()
+        view = memoryview(data)
+        fmt = view.format.lstrip("@")
+        if fmt not in Buffer.FORMATS:
+            raise TypeError(f"Unsupported buffer format {view.format!r}")
+        if view.ndim != 1:
+            if not view.c_contiguous:
+                raise TypeError("Multi-dimensional buffers must be C-contiguous")
+            view = view.cast("B").cast(fmt)
+        self.value = view.toreadonly()
+        self.length = len(self.value)
+
+    def is_true(self):
+        return self.length > 0
+
+    def item(self, index):
+        element = self.value[index]
+        if isinstance(element, bool):
+            return Boolean(element)
+        if isinstance(element, bytes):
+            return String(element.decode("latin-1"))
+        return Number(element)
+
+    def slice(self, start, stop):
+        return Buffer(self.value[start:stop])
+
+    def __iter__(self):
+        return map(self.item, range(self.length))
+
+    def __repr__(self) -> str:
+        return f"<buffer {self.value.format}[{self.length}]>"
+
+
+def _flatten(rope):
+    """
+    Joins a rope into one str. Concatenation chains (`s = s + "x"` in a loop)
+    are walked with an explicit stack, so their depth is not limited by the
+    Python recursion limit.
+    """
+    chunks = []
+    stack = [rope]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, String):
+            if item._value is not None:
+                chunks.append(item._value)
+                continue
+            item = item._rope
+        kind, first, second = item
+        if kind == _CONCAT:
+            stack.append(second)
+            stack.append(first)
+        else:
+            chunks.append(first.value * second)
+    return "".join(chunks)
+
+
+class List(Value):
+    """
+    An ordered collection. Lists whose elements are all ints (fitting in 64
+    bits) or all floats keep the raw numbers in an array.array; anything else
+    is kept as a Python list of values.
+
+    `+ - * / %` between a numeric list and a number, or two numeric lists of
+    the same length, run as one bulk loop over the raw numbers instead of one
+    interpreted operation per element.
+    """
+
+    def __init__(self, elements) -> None:
+        super().__init__()
+        self.elements = elements
+        self.length = len(elements)
+
+    @classmethod
+    def from_values(cls, values):
+        if all(type(value) is Number for value in values):
+            storage = _pack([value.value for value in values])
+            if isinstance(storage, array):
+                return cls(storage)
+        return cls(list(values))
+
+    @classmethod
+    def from_numbers(cls, numbers):
+        return cls(_pack(numbers))
+
+    @property
+    def is_typed(self):
+        return isinstance(self.elements, array)
+
+    def numbers(self):
+        """The raw numbers of the list, or None if some element is not a Number."""
+        if self.is_typed:
+            return self.elements
+        if all(type(value) is Number for value in self.elements):
+            return [value.value for value in self.elements]
+        return None
+
+    def _illegal(self, details="Illegal operation"):
+        return None, RTError(self.pos_start, self.pos_end, details, self.context)
+
+    def _elementwise(self, other, op, reflected=False):
+        left = self.numbers()
+        if left is None:
+            return self._illegal("Elementwise operations need a list of numbers")
+
+        if isinstance(other, List):
+            right = other.numbers()
+            if right is None:
+                return self._illegal("Elementwise operations need a list of numbers")
+            if other.length != self.length:
+                return self._illegal(
+                    f"Lists have different lengths ({self.length} and {other.length})"
+                )
+        elif isinstance(other, Number):
+            right = repeat(other.value, self.length)
+        else:
+            return self._illegal()
+
+        if op in (operator.truediv, operator.mod):
+            if reflected:
+                zero = 0 in left
+            elif isinstance(other, Number):
+                zero = other.value == 0
+            else:
+                zero = 0 in right
+            if zero:
+                return self._illegal("Attempt to Divide by zero!")
+        if reflected:
+            left, right = right, left
+        return List.from_numbers(list(map(op, left, right))), None
+
+    def __add__(self, other):
+        return self._elementwise(other, operator.add)
+
+    def __radd__(self, other):
+        return self._elementwise(other, operator.add, reflected=True)
+
+    def __sub__(self, other):
+        return self._elementwise(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._elementwise(other, operator.sub, reflected=True)
+
+    def __mul__(self, other):
+        return self._elementwise(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self._elementwise(other, operator.mul, reflected=True)
+
+    def __truediv__(self, other):
+        return self._elementwise(other, operator.truediv)
+
+    def __rtruediv__(self, other):
+        return self._elementwise(other, operator.truediv, reflected=True)
+
+    def __mod__(self, other):
+        return self._elementwise(other, operator.mod)
+
+    def __rmod__(self, other):
+        return self._elementwise(other, operator.mod, reflected=True)
+
+    def __pow__(self, other):
+        return self._illegal()
+
+    def __rpow__(self, other):
+        return self._illegal()
+
+    def equals(self, other):
+        if not isinstance(other, List) or self.length != other.length:
+            return False
+        mine, theirs = self.numbers(), other.numbers()
+        if mine is not None and theirs is not None:
+            return list(mine) == list(theirs)
+        for a, b in zip(self.elements, other.elements):
+            if type(a) is not type(b):
+                return False
+            if isinstance(a, List):
+                if not a.equals(b):
+                    return False
+            elif getattr(a, "value", a) != getattr(b, "value", b):
+                return False
+        return True
+
+    def stanza_eq(self, other):
+        return Boolean(self.equals(other)), None
+
+    def stanza_ne(self, other):
+        return Boolean(not self.equals(other)), None
+
+    def compare(self, other, tok_type, context):
+        return None, RTError(
+            self.pos_start, self.pos_end, "Lists cannot be ordered", context
+        )
+
+    def is_true(self):
+        return self.length > 0
+
+    def item(self, index):
+        element = self.elements[index]
+        return Number(element) if self.is_typed else element
+
+    def slice(self, start, stop):
+        return List(self.elements[start:stop])
+
+    def __iter__(self):
+        if self.is_typed:
+            return map(Number, self.elements)
+        return iter(self.elements)
+
+    def __repr__(self) -> str:
+        return f"[{', '.join(map(repr, self))}]"
+
+
+class Range(Value):
+    """
+    `start to end step k`: the numbers from start up to, but not including,
+    end. Nothing is materialized. Integer ranges wrap a Python range; float
+    ranges compute their elements as start + i * step, so length, indexing,
+    slicing and iteration all take O(1) memory.
+    """
+
+    def __init__(self, start, end, step=1) -> None:
+        super().__init__()
+        self.start = start
+        self.end = end
+        self.step = step
+        if all(isinstance(bound, int) for bound in (start, end, step)):
+            self.range = range(start, end, step)
+            self.length = len(self.range)
+        else:
+            self.range = None
+            self.length = max(0, math.ceil((end - start) / step))
+
+    def is_true(self):
+        return self.length > 0
+
+    def item(self, index):
+        if self.range is not None:
+            return Number(self.range[index])
+        if index < 0:
+            index += self.length
+        return Number(self.start + index * self.step)
+
+    def slice(self, start, stop):
+        indices = range(self.length)[start:stop]
+        if self.range is not None:
+            part = self.range[start:stop]
+            return Range(part.start, part.stop, part.step)
+        part = Range(
+            self.start + indices.start * self.step,
+            self.start + indices.stop * self.step,
+            self.step,
+        )
+        part.length = len(indices)
+        return part
+
+    def __iter__(self):
+        if self.range is not None:
+            return map(Number, self.range)
+        return (Number(self.start + i * self.step) for i in range(self.length))
+
+    def _key(self):
+        # Like Python ranges, two ranges are equal when they yield the same
+        # numbers, whatever bounds they were written with.
+        if self.length == 0:
+            return ()
+        if self.length == 1:
+            return (self.start,)
+        return (self.start, self.step, self.length)
+
+    def equals(self, other):
+        return isinstance(other, Range) and self._key() == other._key()
+
+    def stanza_eq(self, other):
+        return Boolean(self.equals(other)), None
+
+    def stanza_ne(self, other):
+        return Boolean(not self.equals(other)), None
+
+    def compare(self, other, tok_type, context):
+        return None, RTError(
+            self.pos_start, self.pos_end, "Ranges cannot be ordered", context
+        )
+
+    def __repr__(self) -> str:
+        if self.step == 1:
+            return f"{self.start} to {self.end}"
+        return f"{self.start} to {self.end} step {self.step}"
+
+
+def _pack(numbers):
+    """array.array storage for all-int or all-float numbers, else Numbers."""
+    kinds = set(map(type, numbers))
+    typecode = "q" if kinds <= {int} else "d" if kinds == {float} else None
+    if typecode:
+        try:
+            return array(typecode, numbers)
+        except OverflowError:
+            pass
+    return [Number(number) for number in numbers]
+
+
+"""Size estimates"""
+
+
+def _int_bytes(bits):
+    return (max(bits, 0) + 7) // 8
+
+
+def str_bytes(length, *strings):
+    # CPython stores a str with 1, 2 or 4 bytes per character; assume the
+    # widest unless every operand is ASCII.
+    width = 1 if all(string.is_ascii for string in strings) else 4
+    return length * width
+
+
+def result_size(op_type, left, right):
+    """
+    Estimates, without computing it, how many bytes the payload of
+    `left <op> right` will take. Only string and big integer results can grow
+    large, so everything else is reported as 0.
+    """
+    if isinstance(left, List) or isinstance(right, List):
+        # Bulk results are at most one 8-byte slot (or Number) per element.
+        length = left.length if isinstance(left, List) else right.length
+        return length * 8
+
+    if isinstance(left, String):
+        if op_type == TT.PLUS and isinstance(right, String):
+            length = left.length + right.length
+            if length < String.ROPE_THRESHOLD:
+                return str_bytes(length, left, right)
+            # A rope keeps both operands alive, and the larger one was charged
+            # when it was made; only the smaller one is new. Charging the whole
+            # length would charge an append loop quadratically, since every
+            # intermediate stays reachable from the final rope.
+            smaller = min(left, right, key=lambda string: string.length)
+            return str_bytes(smaller.length, smaller)
+        if op_type == TT.MUL and isinstance(right, Number):
+            if not isinstance(right.value, int):
+                # String * can only repeat by an integer; the operator
+                # reports anything else (inf or nan included) itself.
+                return 0
+            # A repetition rope is one node; it is charged at the size it
+            # takes once flattened.
+            return str_bytes(left.length * max(right.value, 0), left)
+        return 0
+
+    if not (isinstance(left, Number) and isinstance(right, Number)):
+        return 0
+    a, b = left.value, right.value
+    if not (isinstance(a, int) and isinstance(b, int)):
+        return 0
+    if op_type in (TT.PLUS, TT.MINUS):
+        return _int_bytes(max(a.bit_length(), b.bit_length()) + 1)
+    if op_type == TT.MUL:
+        return _int_bytes(a.bit_length() + b.bit_length())
+    if op_type == TT.EXPO:
+        if b < 0 or a in (-1, 0, 1):
+            return 0
+        return _int_bytes(b * a.bit_length())
+    return 0
+
+
 """Interpreter"""
 
 
 class Interpreter:
-    def __init__(self, symbol_table: SymbolTable) -> None:
+    def __init__(
+        self,
+        symbol_table: SymbolTable,
+        budget: Budget | None = None,
+        output: OutputSink | None = None,
+    ) -> None:
         self.symbol_table = symbol_table
+        self.budget = budget
+        # Receives the value of every `let`; the caller flushes it after the run.
+        self.output = output if output is not None else NullSink()
 
     def visit(self, node, context):
         method_name = f"visit_{type(node).__name__}"
@@ -275,6 +880,20 @@ class Interpreter:
     def no_visit_method(self, node, context):
         raise Exception(f"No visit_{type(node).__name__} method defined")
 
+    def _reserve(self, node, context, size):
+        """Charges an estimated allocation to the budget before it happens."""
+        message = self.budget.reserve(size)
+        if message:
+            return RTError(node.pos_start, node.pos_end, message, context)
+        return None
+
+    def _tick(self, node, context):
+        """Charges one loop iteration to the budget, if there is one."""
+        message = self.budget.tick()
+        if message:
+            return RTError(node.pos_start, node.pos_end, message, context)
+        return None
+
     def visit_BinOpNode(self, node: BinOpNode, context):
         res = RTResult()
         left = res.register(self.visit(node.left_node, context))
@@ -283,8 +902,26 @@ class Interpreter:
         right = res.register(self.visit(node.right_node, context))
         if res.error:
             return res
+        fast_op = node.fast_op
+        if fast_op is not None and not self.budget:
+            operation, kind = fast_op
+            result = kind(operation(left.value, right.value)).set_context(context)
+            return res.success(result.set_pos(node.pos_start, node.pos_end))
         op = node.op
-        if op.type == TT.PLUS:
+        size = 0
+        if self.budget:
+            size = result_size(op.type, left, right)
+            if size >= Budget.TRACK_THRESHOLD:
+                error = self._reserve(node, context, size)
+                if error:
+                    return res.failure(error)
+            else:
+                size = 0
+        if fast_op is not None:
+            operation, kind = fast_op
+            result = kind(operation(left.value, right.value)).set_context(context)
+            error = None
+        elif op.type == TT.PLUS:
             result, error = left + right
         elif op.type == TT.MINUS:
             result, error = left - right
@@ -300,6 +937,11 @@ class Interpreter:
             result, error = left.stanza_ne(right)
         elif op.type in (TT.GT, TT.GTE, TT.LTE, TT.LT):
             result, error = left.compare(right, op.type, context)
+        if size:
+            if error:
+                self.budget.release(size)
+            else:
+                self.budget.track(result, size)
         if error:
             return res.failure(error)
         else:
@@ -321,6 +963,19 @@ class Interpreter:
             .set_pos(node.pos_start, node.pos_end)
         )
 
+    def visit_ListNode(self, node: ListNode, context):
+        res = RTResult()
+        elements = []
+        for element_node in node.element_nodes:
+            elements.append(res.register(self.visit(element_node, context)))
+            if res.error:
+                return res
+        return res.success(
+            List.from_values(elements)
+            .set_context(context)
+            .set_pos(node.pos_start, node.pos_end)
+        )
+
     def visit_UnaryOpNode(self, node: UnaryOpNode, context):
         res = RTResult()
         number = res.register(self.visit(node.node, context))
@@ -328,7 +983,14 @@ class Interpreter:
             return res
         error = None
         if node.op.type == TT.MINUS:
-            number, error = number * Number(-1)
+            if isinstance(number, Number):
+                number = Number(-number.value)
+            elif isinstance(number, List):
+                number, error = number * Number(-1)
+            else:
+                error = RTError(
+                    node.pos_start, node.pos_end, f"Cannot negate {number}", context
+                )
 
         if node.op.matches(TT.KEYWORD, "not"):
             if isinstance(number, Boolean):
@@ -349,7 +1011,21 @@ class Interpreter:
         power = res.register(self.visit(node.exponent, context))
         if res.error:
             return res
+        size = 0
+        if self.budget:
+            size = result_size(TT.EXPO, base, power)
+            if size >= Budget.TRACK_THRESHOLD:
+                error = self._reserve(node, context, size)
+                if error:
+                    return res.failure(error)
+            else:
+                size = 0
         result, error = base**power
+        if size:
+            if error:
+                self.budget.release(size)
+            else:
+                self.budget.track(result, size)
         if error:
             return res.failure(error)
         return res.success(result.set_pos(node.pos_start, node.pos_end))
@@ -358,11 +1034,10 @@ class Interpreter:
         res = RTResult()
         var_name = node.var_name
         value = res.register(self.visit(node.value, context))
-        print(value)
         if res.error:
             return res
         check = context.symbol_table.get(var_name)
-        if check:
+        if check is not None:
             return res.failure(
                 RTError(
                     node.pos_start,
@@ -372,14 +1047,17 @@ class Interpreter:
                 )
             )
         context.symbol_table.set(var_name, value)
+        self.output.write(f"{value}\n")
         return res.success(None)
 
     def visit_VarReassignmentNode(self, node: VarReassignmentNode, context):
         res = RTResult()
         var_name = node.var_name
         check = context.symbol_table.get(var_name)
-        if check:
+        if check is not None:
             value = res.register(self.visit(node.value, context))
+            if res.error:
+                return res
             context.symbol_table.set(var_name, value)
             return res.success(None)
         return res.failure(
@@ -396,12 +1074,16 @@ class Interpreter:
         var_name = node.var_access_tok.value
         value = context.symbol_table.get(var_name)
         # print(value)
-        if not value:
+        if value is None:
             return res.failure(
                 RTError(
                     node.pos_start, node.pos_end, f"{var_name} not defined.", context
                 )
             )
+        if type(value) is Pending:
+            value, error = value.force(self)
+            if error:
+                return res.failure(error)
 
         return res.success(value)
 
@@ -424,46 +1106,118 @@ class Interpreter:
             return res.success(else_value)
         return res.success(None)
 
-    def visit_ForNode(self, node: ForNode, context):
+    def visit_RangeNode(self, node: RangeNode, context):
         res = RTResult()
+        bounds = []
+        for bound_node in (node.start_node, node.end_node, node.step_node):
+            if bound_node is None:
+                bounds.append(1)
+                continue
+            bound = res.register(self.visit(bound_node, context))
+            if res.error:
+                return res
+            if not isinstance(bound, Number):
+                return res.failure(
+                    RTError(
+                        bound_node.pos_start,
+                        bound_node.pos_end,
+                        "Range bounds must be numbers",
+                        context,
+                    )
+                )
+            bounds.append(bound.value)
 
-        start_value = res.register(self.visit(node.start_value_node, context))
-        if res.error:
-            return res
+        if bounds[2] == 0:
+            return res.failure(
+                RTError(
+                    node.step_node.pos_start,
+                    node.step_node.pos_end,
+                    "Range step cannot be zero",
+                    context,
+                )
+            )
+        return res.success(
+            Range(*bounds).set_context(context).set_pos(node.pos_start, node.pos_end)
+        )
 
-        end_value = res.register(self.visit(node.end_value_node, context))
+    def _loop_elements(self, node, context):
+        """Evaluates a for loop's iterable into (iterable, iterator, error)."""
+        res = self.visit(node.iterable_node, context)
         if res.error:
-            return res
+            return None, None, res.error
+        iterable = res.value
+
+        if isinstance(iterable, Range) and iterable.range is not None:
+            # Fast path: integer ranges step through a Python range directly.
+            return iterable, map(Number, iterable.range), None
+        if hasattr(iterable, "__iter__"):
+            return iterable, iter(iterable), None
+        return (
+            None,
+            None,
+            RTError(
+                node.iterable_node.pos_start,
+                node.iterable_node.pos_end,
+                f"{iterable} is not iterable",
+                context,
+            ),
+        )
+
+    def visit_ForNode(self, node: ForNode, context):
+        res = RTResult()
 
-        if node.step_value_node:
-            step_value = res.register(self.visit(node.step_value_node, context))
+        iterable, elements, error = self._loop_elements(node, context)
+        if error:
+            return res.failure(error)
+
+        # Everything that is the same on every iteration is looked up once.
+        symbols = context.symbol_table.symbols
+        var_name = node.var_name_tok.value
+        body = node.body
+        visit_body = getattr(
+            self, f"visit_{type(body).__name__}", self.no_visit_method
+        )
+        for element in elements:
+            if self.budget:
+                error = self._tick(node, context)
+                if error:
+                    return res.failure(error)
+            symbols[var_name] = element
+            res.register(visit_body(body, context))
             if res.error:
                 return res
-        else:
-            step_value = Number(1)
 
-        i = start_value.value
+        error = iteration_error(iterable)
+        if error:
+            return res.failure(error)
+        return res.success(None)
 
-        def condition() -> (
-            bool
-        ):  # because assignment of lambda function to a variable is explicitly discouraged by PEP 8.
-            if step_value.value >= 0:
-                return i < end_value.value
-            return i > end_value.value
+    def visit_PForNode(self, node: PForNode, context):
+        from .parallel import parallel_map
 
-        while condition():
-            context.symbol_table.set(node.var_name_tok.value, Number(i))
-            i += step_value.value
+        res = RTResult()
+        iterable = res.register(self.visit(node.iterable_node, context))
+        if res.error:
+            return res
 
-            res.register(self.visit(node.body, context))
-            if res.error:
-                return res
-        return res.success(None)
+        # The body becomes a one-parameter function, so pfor shares pmap's path.
+        body = Function(None, [node.var_name_tok], node.body, context)
+        body.name = "<pfor>"
+        result, error = parallel_map(self, body, iterable, node, context)
+        if error:
+            return res.failure(error)
+        return res.success(
+            result.set_context(context).set_pos(node.pos_start, node.pos_end)
+        )
 
     def visit_WhileNode(self, node: WhileNode, context):
         res = RTResult()
 
         while True:
+            if self.budget:
+                error = self._tick(node, context)
+                if error:
+                    return res.failure(error)
             condition = res.register(self.visit(node.condition_node, context))
             if res.error:
                 return res
@@ -476,9 +1230,158 @@ class Interpreter:
                 return res
         return res.success(None)
 
+    def iter_visit(self, node, context):
+        """
+        Runs `node` as a generator body. This is a Python generator that
+        yields each value reached by a `yield` and returns an RTError, or None
+        once the body is done. For, while and if get resumable versions here
+        so the body can pause inside them; any other node runs through visit().
+        """
+        if isinstance(node, YieldNode):
+            res = self.visit(node.value_node, context)
+            if res.error:
+                return res.error
+            yield res.value
+
+        elif isinstance(node, ForNode):
+            iterable, elements, error = self._loop_elements(node, context)
+            if error:
+                return error
+            for element in elements:
+                if self.budget:
+                    error = self._tick(node, context)
+                    if error:
+                        return error
+                context.symbol_table.set(node.var_name_tok.value, element)
+                error = yield from self.iter_visit(node.body, context)
+                if error:
+                    return error
+            return iteration_error(iterable)
+
+        elif isinstance(node, WhileNode):
+            while True:
+                if self.budget:
+                    error = self._tick(node, context)
+                    if error:
+                        return error
+                res = self.visit(node.condition_node, context)
+                if res.error:
+                    return res.error
+                if not res.value.is_true():
+                    break
+                error = yield from self.iter_visit(node.body, context)
+                if error:
+                    return error
+
+        elif isinstance(node, IfNode):
+            for condition, expr in node.cases:
+                res = self.visit(condition, context)
+                if res.error:
+                    return res.error
+                if res.value.is_true():
+                    return (yield from self.iter_visit(expr, context))
+            if node.else_expr:
+                return (yield from self.iter_visit(node.else_expr, context))
+
+        else:
+            return self.visit(node, context).error
+        return None
+
+    def visit_ImportNode(self, node: ImportNode, context):
+        from .modules import import_module
+
+        error = import_module(self, node, context)
+        if error:
+            return RTResult().failure(error)
+        return RTResult().success(None)
+
+    def visit_YieldNode(self, node: YieldNode, context):
+        # Reached only when the yield is not somewhere iter_visit can pause.
+        return RTResult().failure(
+            RTError(
+                node.pos_start,
+                node.pos_end,
+                "yield can only be a function body, a loop body or an if branch",
+                context,
+            )
+        )
+
+    def _subscriptable(self, node, context, value):
+        if not hasattr(value, "item"):
+            return RTError(
+                node.pos_start, node.pos_end, f"{value} cannot be indexed", context
+            )
+        return None
+
+    def _position(self, node, context):
+        """Evaluates an index or slice bound into (int, error)."""
+        res = RTResult()
+        value = res.register(self.visit(node, context))
+        if res.error:
+            return None, res.error
+        if not (isinstance(value, Number) and isinstance(value.value, int)):
+            return None, RTError(
+                node.pos_start, node.pos_end, "Index must be an integer", context
+            )
+        return value.value, None
+
+    def visit_IndexNode(self, node: IndexNode, context):
+        res = RTResult()
+        base = res.register(self.visit(node.node, context))
+        if res.error:
+            return res
+        error = self._subscriptable(node.node, context, base)
+        if error:
+            return res.failure(error)
+        index, error = self._position(node.index_node, context)
+        if error:
+            return res.failure(error)
+
+        if not -base.length <= index < base.length:
+            return res.failure(
+                RTError(
+                    node.index_node.pos_start,
+                    node.index_node.pos_end,
+                    f"Index {index} out of range for length {base.length}",
+                    context,
+                )
+            )
+        return res.success(
+            base.item(index).set_context(context).set_pos(node.pos_start, node.pos_end)
+        )
+
+    def visit_SliceNode(self, node: SliceNode, context):
+        res = RTResult()
+        base = res.register(self.visit(node.node, context))
+        if res.error:
+            return res
+        error = self._subscriptable(node.node, context, base)
+        if error:
+            return res.failure(error)
+
+        bounds = []
+        for bound in (node.start_node, node.end_node):
+            position = None
+            if bound is not None:
+                position, error = self._position(bound, context)
+                if error:
+                    return res.failure(error)
+            bounds.append(position)
+        return res.success(
+            base.slice(*bounds)
+            .set_context(context)
+            .set_pos(node.pos_start, node.pos_end)
+        )
+
     def visit_FuncDefNode(self, node: FuncDefNode, context):
         res = RTResult()
-        func = Function(node.func_name_tok, node.arg_name_toks, node.body_node, context)
+        func = Function(
+            node.func_name_tok,
+            node.arg_name_toks,
+            node.body_node,
+            context,
+            node.is_generator,
+        )
         if func.name == "|anonymous|":
             return res.success(func)
         context.symbol_table.set(func.name, func)
@@ -491,7 +1394,7 @@ class Interpreter:
         func = res.register(self.visit(name, context))
         if res.error:
             return res
-        if not isinstance(func, Function):
+        if not isinstance(func, (Function, BuiltinFunction)):
             return res.failure(
                 RTError(
                     node.pos_start, node.pos_end, f"{func} is not a function", context
@@ -500,8 +1403,51 @@ class Interpreter:
         evaluated_args = []
         for arg in args:
             evaluated_arg = res.register(self.visit(arg, context))
+            if res.error:
+                return res
             evaluated_args.append(evaluated_arg)
-        output = res.register(func.execute(evaluated_args, self))
+        return self.call(func, evaluated_args, node, context)
+
+    def call(self, func, args, node, context):
+        """Calls a function value with evaluated `args`; errors point at `node`."""
+        res = RTResult()
+
+        # Fast path: native functions run directly, with no Context,
+        # SymbolTable or copy of the function value per call.
+        if isinstance(func, BuiltinFunction):
+            message = func.check_arity(len(args))
+            size = 0
+            if not message and self.budget and func.result_size is not None:
+                size = func.result_size(*args)
+                if size >= Budget.TRACK_THRESHOLD:
+                    error = self._reserve(node, context, size)
+                    if error:
+                        return res.failure(error)
+                else:
+                    size = 0
+            if not message:
+                if func.calls_functions:
+                    caller = Caller(self, node, context)
+                    output, message = func.func(caller, *args)
+                else:
+                    output, message = func.func(*args)
+            if size:
+                if message:
+                    self.budget.release(size)
+                else:
+                    self.budget.track(output, size)
+            if isinstance(message, RTError):
+                return res.failure(message)
+            if message:
+                return res.failure(
+                    RTError(node.pos_start, node.pos_end, message, context)
+                )
+            return res.success(
+                output.set_context(context).set_pos(node.pos_start, node.pos_end)
+            )
+
+        func = func.copy().set_pos(node.pos_start, node.pos_end)
+        output = res.register(func.execute(args, self))
         if res.error:
             return res
         return res.success(output)
@@ -1,23 +1,34 @@
+import re
+
 from .constants import (
     COMPLEX_TOKENS,
     DIGITS,
     ESC_CHARS,
+    IDENTIFIER_CHARS,
     KEYWORDS,
-    LETTERS,
+    MAX_INT_DIGITS,
+    NUMBER_CHARS,
     SIMPLE_TOKENS,
     TT,
 )
-from .errors import ExpectedCharError, IllegalCharacterError, Position
+from .errors import (
+    ExpectedCharError,
+    IllegalCharacterError,
+    NumberTooLargeError,
+    Position,
+)
 
 
 class Token:
+    __slots__ = ("type", "value", "pos_start", "pos_end")
+
     def __init__(self, type, value=None, pos_start=None, pos_end=None) -> None:
         self.type = type
         self.value = value
         if pos_start:
             self.pos_start = pos_start.copy()
-            self.pos_end = pos_start.copy()
-            self.pos_end.advance()
+            if not pos_end:
+                self.pos_end = pos_start.copy().advance()
         if pos_end:
             self.pos_end = pos_end
 
@@ -34,12 +45,18 @@ class Token:
 
 
 class Lexer:
-    def __init__(self, filename, text) -> None:
+    def __init__(self, filename, text, pos=None) -> None:
         self.fn = filename
         self.text = text
-        self.pos = Position(-1, 0, -1, self.fn, text)
-        self.current_char = None
-        self._advance()
+        if pos is None:
+            self.pos = Position(-1, 0, -1, self.fn, text)
+            self.current_char = None
+            self._advance()
+        else:
+            # Resume at `pos`, which must be the start of a token or blank
+            # (see stanza.incremental).
+            self.pos = pos.copy()
+            self.current_char = text[pos.idx] if pos.idx < len(text) else None
 
     def _advance(self):
         self.pos.advance(self.current_char)
@@ -53,106 +70,317 @@ class Lexer:
 
     def make_tokens(self):
         tokens = []
+        while True:
+            token, error = self.next_token()
+            if error:
+                return [], error
+            tokens.append(token)
+            if token.type == TT.EOF:
+                return tokens, None
 
-        while self.current_char:
-            char = self.current_char
+    def next_token(self):
+        """
+        Lexes the token at the current position. Returns (token, None), with
+        an EOF token once the text is used up, or (None, error).
+        """
+        while self.current_char and self.current_char in " \t":
+            self._advance()
 
-            if char in " \t":
-                self._advance()
-                continue
+        char = self.current_char
+        if not char:
+            return Token(TT.EOF, pos_start=self.pos), None
 
-            if char in DIGITS:
-                tokens.append(self._make_number())
-                continue
+        if char in DIGITS:
+            return self._make_number()
 
-            if char.isalpha() or char == "_":
-                tokens.append(self._make_identifier())
-                continue
+        if char.isalpha() or char == "_":
+            return self._make_identifier(), None
 
-            if char == '"':
-                tokens.append(self._make_string())
-                continue
+        if char == '"':
+            return self._make_string(), None
 
-            next_char = self._peek()
-            if next_char:
-                two_chars = self.current_char + next_char
-                if two_chars in COMPLEX_TOKENS:
-                    tokens.append(
-                        Token(COMPLEX_TOKENS[two_chars], pos_start=self.pos.copy())
-                    )
-                    self._advance()
-                    self._advance()
-                    continue
-
-            if char == "!" and next_char != "=":
-                pos_start = self.pos.copy()
+        next_char = self._peek()
+        if next_char:
+            two_chars = self.current_char + next_char
+            if two_chars in COMPLEX_TOKENS:
+                token = Token(COMPLEX_TOKENS[two_chars], pos_start=self.pos)
                 self._advance()
-                return [], ExpectedCharError(
-                    pos_start, self.pos, "Expected '=' after '!'"
-                )
-
-            if char in SIMPLE_TOKENS:
-                tokens.append(Token(SIMPLE_TOKENS[char], pos_start=self.pos.copy()))
                 self._advance()
-                continue
+                return token, None
 
+        if char == "!" and next_char != "=":
             pos_start = self.pos.copy()
-            bad_char = char
             self._advance()
-            return [], IllegalCharacterError(pos_start, self.pos, f"' {bad_char} '")
-        tokens.append(Token(TT.EOF, pos_start=self.pos))
-        return tokens, None
+            return None, ExpectedCharError(
+                pos_start, self.pos, "Expected '=' after '!'"
+            )
+
+        if char in SIMPLE_TOKENS:
+            token = Token(SIMPLE_TOKENS[char], pos_start=self.pos)
+            self._advance()
+            return token, None
+
+        pos_start = self.pos.copy()
+        self._advance()
+        return None, IllegalCharacterError(pos_start, self.pos, f"' {char} '")
 
     """----------helper funcs----------"""
 
+    # The helpers below slice the lexeme out of the source (or join a list of
+    # chunks) instead of growing a str one character at a time, so the cost of
+    # a token stays linear in its length.
+
     def _make_number(self):
-        num_str = ""
         dot_count = 0
         pos_start = self.pos.copy()
-        while self.current_char and self.current_char in DIGITS + ".":
+        while self.current_char and self.current_char in NUMBER_CHARS:
             if self.current_char == ".":
                 if dot_count == 1:
                     break
                 dot_count += 1
-                num_str += "."
-            else:
-                num_str += self.current_char
             self._advance()
+        num_str = self.text[pos_start.idx : self.pos.idx]
         if dot_count == 0:
-            return Token(TT.INT, int(num_str), pos_start=pos_start, pos_end=self.pos)
+            if len(num_str) > MAX_INT_DIGITS:
+                return None, NumberTooLargeError(
+                    pos_start,
+                    self.pos.copy(),
+                    f"{len(num_str)} digits, the limit is {MAX_INT_DIGITS}",
+                )
+            return (
+                Token(TT.INT, int(num_str), pos_start, pos_end=self.pos.copy()),
+                None,
+            )
         else:
-            return Token(
-                TT.FLOAT, float(num_str), pos_start=pos_start, pos_end=self.pos
+            return (
+                Token(TT.FLOAT, float(num_str), pos_start, pos_end=self.pos.copy()),
+                None,
             )
 
     def _make_identifier(self):
-        id_str = ""
         pos_start = self.pos.copy()
-        while self.current_char and self.current_char in LETTERS + "_":
-            id_str += self.current_char
+        while self.current_char and self.current_char in IDENTIFIER_CHARS:
             self._advance()
+        id_str = self.text[pos_start.idx : self.pos.idx]
         token_type = TT.KEYWORD if id_str in KEYWORDS else TT.IDENTIFIER
-        return Token(token_type, id_str, pos_start, pos_end=self.pos)
+        return Token(token_type, id_str, pos_start, pos_end=self.pos.copy())
 
     def _make_string(self):
-        string_str = ""
+        chunks = []
         pos_start = self.pos.copy()
         self._advance()
+        chunk_start = self.pos.idx
         escape_char = False
 
         while self.current_char is not None and (
             self.current_char != '"' or escape_char
         ):
             if escape_char:
-                string_str += ESC_CHARS.get(self.current_char, self.current_char)
-            else:
-                if self.current_char == "\\":
-                    escape_char = True
-                else:
-                    string_str += self.current_char
+                chunks.append(ESC_CHARS.get(self.current_char, self.current_char))
+                escape_char = False
+                chunk_start = self.pos.idx + 1
+            elif self.current_char == "\\":
+                chunks.append(self.text[chunk_start : self.pos.idx])
+                escape_char = True
             self._advance()
 
-        escape_char = False
+        chunks.append(self.text[chunk_start : self.pos.idx])
         self._advance()
 
-        return Token(TT.STRING, string_str, pos_start, pos_end=self.pos)
+        return Token(TT.STRING, "".join(chunks), pos_start, pos_end=self.pos.copy())
+
+
+"""BYTE LEXER"""
+
+_SPACE = re.compile(rb"[ \t]+")
+_NUMBER = re.compile(rb"[0-9]+(\.[0-9]*)?")
+_IDENTIFIER_TAIL = re.compile(rb"[A-Za-z_]*")
+# `.?` so that a backslash at the very end of the source is dropped, as Lexer
+# drops it.
+_ESCAPE = re.compile(r"\\(.?)", re.DOTALL)
+# Long literals are unescaped this many characters at a time, so re.sub's
+# list of pieces (one small str per escape) stays small.
+_ESCAPE_CHUNK = 1 << 16
+
+_SIMPLE_BYTES = {ord(char): tok_type for char, tok_type in SIMPLE_TOKENS.items()}
+_COMPLEX_BYTES = {
+    chars.encode("ascii"): tok_type for chars, tok_type in COMPLEX_TOKENS.items()
+}
+_KEYWORD_SET = frozenset(KEYWORDS)
+
+
+def _escape_char(match):
+    return ESC_CHARS.get(match[1], match[1])
+
+
+def _unescape(text):
+    parts = []
+    start = 0
+    while start < len(text):
+        end = min(start + _ESCAPE_CHUNK, len(text))
+        run = end
+        while run > start and text[run - 1] == "\\":
+            run -= 1
+        if (end - run) % 2 and end < len(text):
+            # The chunk would end between a backslash and what it escapes.
+            end += 1
+        parts.append(_ESCAPE.sub(_escape_char, text[start:end]))
+        start = end
+    return "".join(parts)
+
+
+def _utf8_length(lead):
+    if lead >= 0xF0:
+        return 4
+    if lead >= 0xE0:
+        return 3
+    return 2 if lead >= 0xC0 else 1
+
+
+class ByteLexer:
+    """
+    Produces the same tokens as Lexer, but over a source.SourceText (bytes,
+    typically an mmap of the file) instead of a str. It scans with byte
+    regexes and decodes only identifiers and string literals, so a large file
+    is never decoded or copied as a whole. The tokens still take memory in
+    proportion to how many there are (each holds a value and two Positions),
+    usually many times the size of the file. Positions hold byte offsets, and
+    columns count bytes.
+    """
+
+    def __init__(self, filename, source) -> None:
+        self.fn = filename
+        self.source = source
+        self.data = source.data
+        self.line = 0
+        self.line_start = 0
+
+    def _position(self, idx):
+        return Position(idx, self.line, idx - self.line_start, self.fn, self.source)
+
+    def _newlines(self, start, end):
+        """Accounts for the line breaks in data[start:end]."""
+        newline = self.data.find(b"\n", start, end)
+        while newline != -1:
+            self.line += 1
+            self.line_start = newline + 1
+            newline = self.data.find(b"\n", newline + 1, end)
+
+    def make_tokens(self):
+        data = self.data
+        size = len(data)
+        tokens = []
+        pos = 0
+
+        while pos < size:
+            byte = data[pos]
+
+            if byte == 0x20 or byte == 0x09:
+                pos = _SPACE.match(data, pos).end()
+                continue
+
+            if 0x30 <= byte <= 0x39:
+                token, error = self._make_number(pos)
+                if error:
+                    return [], error
+                tokens.append(token)
+                pos = token.pos_end.idx
+                continue
+
+            if byte == 0x22:
+                token = self._make_string(pos)
+                tokens.append(token)
+                pos = token.pos_end.idx
+                continue
+
+            if byte >= 0x80 or chr(byte).isalpha() or byte == 0x5F:
+                token, error = self._make_identifier(pos)
+                if error:
+                    return [], error
+                tokens.append(token)
+                pos = token.pos_end.idx
+                continue
+
+            pair = data[pos : pos + 2]
+            if pair in _COMPLEX_BYTES:
+                start = self._position(pos)
+                tokens.append(Token(_COMPLEX_BYTES[pair], pos_start=start))
+                pos += 2
+                continue
+
+            if byte == 0x21:
+                return [], ExpectedCharError(
+                    self._position(pos),
+                    self._position(pos + 1),
+                    "Expected '=' after '!'",
+                )
+
+            if byte in _SIMPLE_BYTES:
+                start = self._position(pos)
+                tokens.append(Token(_SIMPLE_BYTES[byte], pos_start=start))
+                pos += 1
+                continue
+
+            return [], self._illegal(pos)
+        tokens.append(Token(TT.EOF, pos_start=self._position(pos)))
+        return tokens, None
+
+    def _illegal(self, pos):
+        end = pos + _utf8_length(self.data[pos])
+        char = bytes(self.data[pos:end]).decode("utf-8", "replace")
+        return IllegalCharacterError(
+            self._position(pos), self._position(end), f"' {char} '"
+        )
+
+    def _make_number(self, pos):
+        match = _NUMBER.match(self.data, pos)
+        num_str = match.group().decode("ascii")
+        start, end = self._position(pos), self._position(match.end())
+        if match.group(1) is not None:
+            return Token(TT.FLOAT, float(num_str), start, end), None
+        if len(num_str) > MAX_INT_DIGITS:
+            return None, NumberTooLargeError(
+                start, end, f"{len(num_str)} digits, the limit is {MAX_INT_DIGITS}"
+            )
+        return Token(TT.INT, int(num_str), start, end), None
+
+    def _make_identifier(self, pos):
+        head_end = pos + _utf8_length(self.data[pos])
+        head = bytes(self.data[pos:head_end]).decode("utf-8", "replace")
+        if not (head.isalpha() or head == "_"):
+            return None, self._illegal(pos)
+        match = _IDENTIFIER_TAIL.match(self.data, head_end)
+        id_str = head + match.group().decode("ascii")
+        token_type = TT.KEYWORD if id_str in _KEYWORD_SET else TT.IDENTIFIER
+        start, end = self._position(pos), self._position(match.end())
+        return Token(token_type, id_str, start, end), None
+
+    def _string_end(self, pos):
+        """
+        Offset of the quote closing the string that starts at `pos`, or the
+        end of the source. Found with find() rather than a regex, whose
+        backtracking state grows with the length of the literal.
+        """
+        data = self.data
+        idx = pos + 1
+        while True:
+            quote = data.find(b'"', idx)
+            if quote == -1:
+                return len(data)
+            backslash = data.find(b"\\", idx, quote)
+            if backslash == -1:
+                return quote
+            idx = backslash + 2
+
+    def _make_string(self, pos):
+        start = self._position(pos)
+        body_end = self._string_end(pos)
+        with memoryview(self.data) as view:
+            text = str(view[pos + 1 : body_end], "utf-8", "replace")
+        if "\\" in text:
+            text = _unescape(text)
+        # Step over the closing quote. An unterminated string ends one past
+        # the end of the source, as it does in Lexer.
+        end = body_end + 1
+        self._newlines(pos, end)
+        return Token(TT.STRING, text, start, self._position(end))
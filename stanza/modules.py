@@ -0,0 +1,263 @@
+import os
+import weakref
+
+from .analysis import walk
+from .builtins import new_global_table
+from .errors import InvalidSyntaxError, RTError
+from .inference import infer
+from .interpreter import Context, Number, Pending
+from .lexer import Lexer
+from .nodes import FuncDefNode, ImportNode, ListNode, VarAssignmentNode
+from .parser import Parser
+
+# Directories a relative import path is looked up in, in order, after the
+# directory of the importing file (when it is a file).
+SEARCH_PATH = [os.curdir]
+
+
+"""Compiled modules"""
+
+
+class Module:
+    """
+    A parsed module file, shared by every session in the process. A module
+    holds one `let` or named `fn` definition, or one `import`, per line;
+    blank lines are skipped. `definitions` maps each defined name to its
+    node and `imports` lists the ImportNodes.
+    """
+
+    def __init__(self, path, mtime, definitions, imports) -> None:
+        self.path = path
+        self.mtime = mtime
+        self.definitions = definitions
+        self.imports = imports
+
+
+# Parsed modules by absolute path, each used while its file's mtime holds.
+_cache = {}
+
+
+def _rebase(positions, offset, line, text):
+    """Moves positions lexed from one line to where the line is in `text`."""
+    for pos in {id(pos): pos for pos in positions}.values():
+        pos.idx += offset
+        pos.ln = line
+        pos.ftxt = text
+
+
+def _compile(path, mtime, text):
+    """Parses a module's source; returns (Module, None) or (None, error)."""
+    definitions = {}
+    imports = []
+    offset = 0
+    for line, source in enumerate(text.split("\n")):
+        start, offset = offset, offset + len(source) + 1
+        source = source.rstrip("\r")
+        if not source.strip(" \t"):
+            continue
+        # A newline is no blank to the lexer, so each line is lexed alone.
+        tokens, error = Lexer(path, source).make_tokens()
+        if error:
+            _rebase((error.pos_start, error.pos_end), start, line, text)
+            return None, error
+        positions = [pos for tok in tokens for pos in (tok.pos_start, tok.pos_end)]
+        _rebase(positions, start, line, text)
+        ast = Parser(tokens).parse()
+        if ast.error:
+            return None, ast.error
+        node = ast.node
+
+        if isinstance(node, ImportNode):
+            imports.append(node)
+            continue
+        if isinstance(node, VarAssignmentNode):
+            name = node.var_name
+        elif isinstance(node, FuncDefNode) and node.func_name_tok:
+            name = node.func_name_tok.value
+        else:
+            return None, InvalidSyntaxError(
+                node.pos_start,
+                node.pos_end,
+                "Expected a let or fn definition, or an import",
+            )
+        if name in definitions:
+            return None, InvalidSyntaxError(
+                node.pos_start, node.pos_end, f"{name} is defined twice in this module"
+            )
+        infer(node)
+        definitions[name] = node
+    return Module(path, mtime, definitions, imports), None
+
+
+def _find(path, importer):
+    """(absolute path, mtime) of the file `path` names, or None."""
+    if os.path.isabs(path):
+        candidates = [path]
+    else:
+        directories = list(SEARCH_PATH)
+        if importer and not importer.startswith("<"):
+            directories.insert(0, os.path.dirname(importer) or os.curdir)
+        candidates = [os.path.join(directory, path) for directory in directories]
+    for candidate in candidates:
+        try:
+            stat = os.stat(candidate)
+        except OSError:
+            continue
+        if not os.path.isdir(candidate):
+            return os.path.abspath(candidate), stat.st_mtime_ns
+    return None
+
+
+def load(path, importer=None):
+    """
+    The Module for the import path `path` in the file `importer`, parsed once
+    and then taken from the cache until the file's mtime changes. Returns
+    (module, None) or (None, error), where the error is a message if the
+    file cannot be found or read, or the module's lexing or syntax Error.
+    """
+    found = _find(path, importer)
+    if found is None:
+        return None, f'Module "{path}" not found'
+    full_path, mtime = found
+    module = _cache.get(full_path)
+    if module is not None and module.mtime == mtime:
+        return module, None
+    try:
+        with open(full_path, encoding="utf-8") as file:
+            text = file.read()
+    except (OSError, UnicodeDecodeError) as exc:
+        return None, f'Cannot read module "{path}": {exc}'
+    module, error = _compile(full_path, mtime, text)
+    if error:
+        return None, error
+    _cache[full_path] = module
+    return module, None
+
+
+def imported_names(node, filename):
+    """
+    Names bound by the imports in `node`, a program from `filename`, as (set,
+    None) or (None, error). Only top-level imports (the program itself, or an
+    element of its outer list) always run, so an import anywhere else, say in
+    an `if` branch, is an error rather than a name that may not be bound.
+    """
+    top = node.element_nodes if isinstance(node, ListNode) else [node]
+    top_level = {id(sub) for sub in top}
+    names = set()
+    for sub in walk(node):
+        if isinstance(sub, ImportNode):
+            if id(sub) not in top_level:
+                return None, RTError(
+                    sub.pos_start,
+                    sub.pos_end,
+                    "A compiled program can only import at its top level",
+                    Context("<program>"),
+                )
+            module, error = load(sub.path_tok.value, filename)
+            if isinstance(error, str):
+                error = RTError(sub.pos_start, sub.pos_end, error, Context("<program>"))
+            if error:
+                return None, error
+            names.update(module.definitions)
+    return names, None
+
+
+"""Sessions"""
+
+
+class _Instance:
+    """
+    A module evaluated in one session, into its own global table. Every
+    definition starts out as a Pending value and is evaluated the first time
+    its name is read, here or in a program that imported it.
+    """
+
+    def __init__(self, module) -> None:
+        self.module = module
+        self.table = new_global_table()
+        self.context = Context(f"<module {module.path}>")
+        self.context.symbol_table = self.table
+        self.exports = {name: Pending(self, name) for name in module.definitions}
+        for name, pending in self.exports.items():
+            self.table.set(name, pending)
+        self.values = {}
+        self._evaluating = set()
+
+    def evaluate(self, name, interpreter):
+        if name in self.values:
+            return self.values[name], None
+        node = self.module.definitions[name]
+        if name in self._evaluating:
+            return None, RTError(
+                node.pos_start,
+                node.pos_end,
+                f"{name} is defined in terms of itself",
+                self.context,
+            )
+        self._evaluating.add(name)
+        try:
+            if isinstance(node, FuncDefNode):
+                res = interpreter.visit(node, self.context)
+            else:
+                res = interpreter.visit(node.value, self.context)
+        finally:
+            self._evaluating.discard(name)
+        if res.error:
+            return None, res.error
+        value = res.value
+        if value is None:
+            # A definition with no value (a loop, say) reads as null; a None in
+            # the table would look undefined.
+            value = Number(0)
+        self.values[name] = value
+        self.table.set(name, value)
+        return value, None
+
+
+# Modules evaluated so far, by path, per session global table.
+_sessions = weakref.WeakKeyDictionary()
+
+
+def import_module(interpreter, node, context):
+    """
+    Runs an `import`: binds the module's names in context's table as Pending
+    values, evaluating nothing. A module is evaluated once per session (the
+    interpreter's global table); if its file changed since, the session's
+    next import starts it afresh. Returns an Error or None.
+    """
+    module, error = load(node.path_tok.value, node.pos_start.fn)
+    if isinstance(error, str):
+        error = RTError(node.pos_start, node.pos_end, error, context)
+    if error:
+        return error
+
+    instances = _sessions.setdefault(interpreter.symbol_table, {})
+    instance = instances.get(module.path)
+    if instance is None or instance.module is not module:
+        # Registered first, so modules that import each other terminate.
+        instance = instances[module.path] = _Instance(module)
+        for sub in module.imports:
+            error = import_module(interpreter, sub, instance.context)
+            if error:
+                del instances[module.path]
+                return error
+
+    table = context.symbol_table
+    for name, pending in instance.exports.items():
+        existing = table.get(name)
+        if existing is pending:
+            continue
+        if existing is not None and not _same_module(existing, module):
+            return RTError(
+                node.pos_start,
+                node.pos_end,
+                f"Import of {name} clashes with a variable already defined",
+                context,
+            )
+        table.set(name, pending)
+    return None
+
+
+def _same_module(value, module):
+    """Whether `value` was bound by an import of (an older copy of) `module`."""
+    return isinstance(value, Pending) and value.instance.module.path == module.path
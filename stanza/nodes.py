@@ -27,6 +27,10 @@ class BinOpNode:
         self.pos_start = self.left_node.pos_start
         self.pos_end = self.right_node.pos_end
 
+        # (operation, result type) when inference.infer proved both operands
+        # are numbers; the interpreter then skips the checked operators.
+        self.fast_op = None
+
     def __repr__(self) -> str:
         return f"({self.left_node}, {self.op}, {self.right_node})"
 
@@ -101,20 +105,42 @@ class IfNode:
 
 
 class ForNode:
-    def __init__(
-        self, var_name_tok, start_value_node, end_value_node, body, step_value_node=None
-    ) -> None:
+    def __init__(self, var_name_tok, iterable_node, body) -> None:
+        self.var_name_tok = var_name_tok
+        self.iterable_node = iterable_node
+        self.body = body
+
+        self.pos_start = self.var_name_tok.pos_start
+        self.pos_end = self.body.pos_end
+
+    def __repr__(self) -> str:
+        return f"ForNode(var_name={self.var_name_tok.value} in {self.iterable_node} do {self.body})"
+
+
+class PForNode:
+    def __init__(self, var_name_tok, iterable_node, body) -> None:
         self.var_name_tok = var_name_tok
-        self.start_value_node = start_value_node
-        self.end_value_node = end_value_node
+        self.iterable_node = iterable_node
         self.body = body
-        self.step_value_node = step_value_node
 
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.body.pos_end
 
     def __repr__(self) -> str:
-        return f"ForNode(var_name={self.var_name_tok.value} from {self.start_value_node} to {self.end_value_node} do {self.body} (step={self.step_value_node}))"
+        return f"PForNode(var_name={self.var_name_tok.value} in {self.iterable_node} do {self.body})"
+
+
+class RangeNode:
+    def __init__(self, start_node, end_node, step_node=None) -> None:
+        self.start_node = start_node
+        self.end_node = end_node
+        self.step_node = step_node
+
+        self.pos_start = self.start_node.pos_start
+        self.pos_end = (self.step_node or self.end_node).pos_end
+
+    def __repr__(self) -> str:
+        return f"({self.start_node} to {self.end_node} step {self.step_node})"
 
 
 class WhileNode:
@@ -130,10 +156,11 @@ class WhileNode:
 
 
 class FuncDefNode:
-    def __init__(self, func_name_tok, arg_name_toks, body_node):
+    def __init__(self, func_name_tok, arg_name_toks, body_node, is_generator=False):
         self.func_name_tok = func_name_tok
         self.arg_name_toks = arg_name_toks
         self.body_node = body_node
+        self.is_generator = is_generator
 
         if self.func_name_tok:
             self.pos_start = self.func_name_tok.pos_start
@@ -162,3 +189,63 @@ class CallNode:
 
     def __repr__(self) -> str:
         return f"(function_called: {self.node_to_call}, args: {self.arg_nodes})"
+
+
+class IndexNode:
+    def __init__(self, node, index_node, pos_end) -> None:
+        self.node = node
+        self.index_node = index_node
+
+        self.pos_start = self.node.pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self) -> str:
+        return f"({self.node}[{self.index_node}])"
+
+
+class SliceNode:
+    def __init__(self, node, start_node, end_node, pos_end) -> None:
+        self.node = node
+        self.start_node = start_node
+        self.end_node = end_node
+
+        self.pos_start = self.node.pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self) -> str:
+        start = self.start_node if self.start_node else ""
+        end = self.end_node if self.end_node else ""
+        return f"({self.node}[{start}:{end}])"
+
+
+class ListNode:
+    def __init__(self, element_nodes, pos_start, pos_end) -> None:
+        self.element_nodes = element_nodes
+
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self) -> str:
+        return f"[{', '.join(map(repr, self.element_nodes))}]"
+
+
+class ImportNode:
+    def __init__(self, path_tok, pos_start) -> None:
+        self.path_tok = path_tok
+
+        self.pos_start = pos_start
+        self.pos_end = path_tok.pos_end
+
+    def __repr__(self) -> str:
+        return f"(import {self.path_tok})"
+
+
+class YieldNode:
+    def __init__(self, value_node, pos_start) -> None:
+        self.value_node = value_node
+
+        self.pos_start = pos_start
+        self.pos_end = self.value_node.pos_end
+
+    def __repr__(self) -> str:
+        return f"(yield {self.value_node})"
@@ -0,0 +1,87 @@
+import sys
+import threading
+
+# One lock per process for everything written to real streams, so the flushes
+# of concurrent sessions land whole instead of mixing mid-line.
+_write_lock = threading.Lock()
+
+"""Sinks"""
+
+
+class OutputSink:
+    """
+    Where a run's output goes. The interpreter calls write(text) while the
+    program runs and flush() once it ends; sinks are free to hold text until
+    then.
+    """
+
+    def write(self, text):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def fork(self):
+        """A sink of the same kind for a forked session, sharing no buffer."""
+        return type(self)()
+
+
+class NullSink(OutputSink):
+    """Drops everything."""
+
+    def write(self, text):
+        pass
+
+    def fork(self):
+        return self
+
+
+class CaptureSink(OutputSink):
+    """Keeps everything in memory; getvalue() returns it."""
+
+    def __init__(self) -> None:
+        self._parts = []
+
+    def write(self, text):
+        self._parts.append(text)
+
+    def getvalue(self):
+        return "".join(self._parts)
+
+    def clear(self):
+        self._parts.clear()
+
+
+class StdoutSink(OutputSink):
+    """
+    Buffers text and writes it to `stream` (sys.stdout when None, looked up at
+    flush time) in one call once `threshold` characters have piled up or the
+    run ends. Each flush holds the process-wide write lock, so output from
+    concurrent sessions never interleaves within a flush.
+    """
+
+    def __init__(self, stream=None, threshold=8192) -> None:
+        self.stream = stream
+        self.threshold = threshold
+        self._parts = []
+        self._size = 0
+
+    def write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.threshold:
+            self.flush()
+
+    def flush(self):
+        if not self._parts:
+            return
+        text = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        stream = self.stream if self.stream is not None else sys.stdout
+        with _write_lock:
+            stream.write(text)
+            stream.flush()
+
+    def fork(self):
+        return StdoutSink(self.stream, self.threshold)
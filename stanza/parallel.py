@@ -0,0 +1,367 @@
+import atexit
+import multiprocessing
+import os
+import time
+
+from .analysis import free_names, outer_reassignments
+from .budget import Budget
+from .errors import RTError
+from .interpreter import (
+    Boolean,
+    Buffer,
+    BuiltinFunction,
+    Context,
+    Function,
+    Interpreter,
+    List,
+    Number,
+    Pending,
+    Range,
+    String,
+    SymbolTable,
+    iteration_error,
+    str_bytes,
+)
+from .output import CaptureSink
+
+# Worker processes to use; None means os.cpu_count(). Set it before the first
+# pfor/pmap, since the pool is started once and then reused.
+WORKERS = None
+
+# Fewer elements than this run in-process: starting work on the pool costs
+# more than evaluating a short loop directly.
+SERIAL_THRESHOLD = 64
+
+# Each worker gets about this many chunks, so uneven iterations still balance.
+CHUNKS_PER_WORKER = 4
+
+
+class _NotTransferable(Exception):
+    """A value that cannot be sent to (or back from) a worker process."""
+
+
+"""Transfer"""
+
+
+def _export(value):
+    """
+    Turns a runtime value into plain picklable data. Positions and contexts are
+    dropped, since they drag in the source text and the whole symbol table.
+    """
+    if value is None:
+        return ("none",)
+    if isinstance(value, Number):
+        return ("number", value.value)
+    if isinstance(value, String):
+        return ("string", value.value)
+    if isinstance(value, Boolean):
+        return ("bool", value.value)
+    if isinstance(value, List):
+        if value.is_typed:
+            return ("list", value.elements)
+        return ("list", [_export(element) for element in value.elements])
+    if isinstance(value, Range):
+        return ("range", value.start, value.end, value.step)
+    if isinstance(value, Buffer):
+        return ("buffer", value.value.tobytes(), value.value.format)
+    if isinstance(value, Function):
+        return (
+            "function",
+            value.name,
+            value.args_node,
+            value.body_node,
+            value.is_generator,
+        )
+    if isinstance(value, BuiltinFunction):
+        return ("builtin", value.name)
+    raise _NotTransferable(f"{value} cannot be sent to a worker process")
+
+
+def _import(data, context):
+    """Rebuilds a value made by _export; functions close over `context`."""
+    kind = data[0]
+    if kind == "none":
+        return None
+    if kind == "number":
+        return Number(data[1])
+    if kind == "string":
+        return String(data[1])
+    if kind == "bool":
+        return Boolean(data[1])
+    if kind == "list":
+        elements = data[1]
+        if isinstance(elements, list):
+            elements = [_import(element, context) for element in elements]
+        return List(elements)
+    if kind == "range":
+        return Range(*data[1:])
+    if kind == "buffer":
+        return Buffer(memoryview(data[1]).cast(data[2]))
+    if kind == "function":
+        _, name, args_node, body_node, is_generator = data
+        func = Function(None, args_node, body_node, context, is_generator)
+        func.name = name
+        return func
+    builtin = context.symbol_table.get(data[1])
+    if not isinstance(builtin, BuiltinFunction):
+        raise _NotTransferable(f"builtin {data[1]} is not available here")
+    return builtin
+
+
+def _captures(func, interpreter):
+    """
+    Snapshots every variable `func` reads from outside, following the
+    functions it calls, into one flat {name: exported value} dict. Imported
+    names not evaluated yet are evaluated first.
+    """
+    snapshot = {}
+    values = {}
+    pending = [func]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        params = {tok.value for tok in current.args_node}
+        table = current.context.symbol_table
+        for name in free_names(current.body_node):
+            value = table.get(name)
+            if name in params or value is None:
+                continue
+            if isinstance(value, Pending):
+                value, error = value.force(interpreter)
+                if error:
+                    raise _NotTransferable(error.details)
+            if name in values and values[name] is not value:
+                raise _NotTransferable(
+                    f"{name} refers to different values in different functions"
+                )
+            values[name] = value
+            if isinstance(value, Function):
+                pending.append(value)
+    for name, value in values.items():
+        snapshot[name] = _export(value)
+    return snapshot
+
+
+"""Worker side"""
+
+_worker_globals = None
+
+
+def _init_worker():
+    global _worker_globals
+    from .builtins import new_global_table
+
+    _worker_globals = new_global_table()
+
+
+def _chunk_elements(chunk, context):
+    if chunk[0] == "range":
+        return map(Number, range(*chunk[1:]))
+    return (_import(element, context) for element in chunk[1])
+
+
+def _run_chunk(task):
+    """
+    Applies the exported function to every element of one chunk. Returns
+    (exported results, error, steps, output); an error is (pos_start,
+    pos_end, details) and ends the chunk. Output is captured and returned so
+    the parent can write it to its own sink in iteration order.
+    """
+    exported_func, captures, chunk, limits = task
+    context = Context("<worker>")
+    context.symbol_table = SymbolTable(_worker_globals)
+    budget = Budget(**limits).start() if limits is not None else None
+    output = CaptureSink()
+    interpreter = Interpreter(context.symbol_table, budget, output)
+
+    results = []
+    error = None
+    try:
+        for name, data in captures.items():
+            context.symbol_table.set(name, _import(data, context))
+        func = _import(exported_func, context)
+        for element in _chunk_elements(chunk, context):
+            res = func.execute([element], interpreter)
+            if res.error:
+                error = (res.error.pos_start, res.error.pos_end, res.error.details)
+                break
+            results.append(_export(res.value))
+    except _NotTransferable as exc:
+        error = (None, None, str(exc))
+    except Exception as exc:
+        # Anything else is a bug, but it should reach the caller as an RTError
+        # rather than take the pool's result handling down with it.
+        error = (None, None, f"Worker failed: {exc!r}")
+    steps = budget.steps if budget else 0
+    if error:
+        return None, error, steps, output.getvalue()
+    return results, None, steps, output.getvalue()
+
+
+"""Parent side"""
+
+_pool = None
+
+
+def _workers():
+    if multiprocessing.current_process().daemon:
+        # Pool workers are daemonic and cannot start a pool of their own, so a
+        # pfor or pmap nested in a parallel iteration runs in the worker.
+        return 1
+    return WORKERS or os.cpu_count() or 1
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = multiprocessing.Pool(_workers(), initializer=_init_worker)
+        atexit.register(shutdown)
+    return _pool
+
+
+def shutdown():
+    """Stops the worker processes; the next pfor/pmap starts new ones."""
+    global _pool
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+        _pool = None
+
+
+def _limits(budget):
+    """The part of `budget` still left, as Budget arguments for a worker."""
+    if budget is None:
+        return None
+    limits = {}
+    if budget.max_steps is not None:
+        limits["max_steps"] = max(budget.max_steps - budget.steps, 0)
+    if budget.max_depth is not None:
+        limits["max_depth"] = max(budget.max_depth - budget.depth, 0)
+    if budget.deadline is not None:
+        limits["timeout"] = max(budget.deadline - time.monotonic(), 0)
+    if budget.max_memory is not None:
+        limits["max_memory"] = max(budget.max_memory - budget.memory, 0)
+    return limits
+
+
+def _payload_size(value):
+    """Bytes a result received from a worker takes, counted as the Budget does."""
+    if isinstance(value, String):
+        return str_bytes(value.length, value)
+    if isinstance(value, Number) and isinstance(value.value, int):
+        return (value.value.bit_length() + 7) // 8
+    if isinstance(value, List):
+        return value.length * 8
+    if isinstance(value, Buffer):
+        return value.value.nbytes
+    return 0
+
+
+def _chunks(elements, count):
+    size = -(-len(elements) // count)
+    for start in range(0, len(elements), size):
+        part = elements[start : start + size]
+        if isinstance(part, range):
+            yield ("range", part.start, part.stop, part.step)
+        else:
+            yield ("values", [_export(element) for element in part])
+
+
+def parallel_map(interpreter, func, iterable, node, context):
+    """
+    Calls `func` on every element of `iterable` on the worker pool and
+    returns (List of the results in order, error).
+
+    The function and a snapshot of the variables it reads are sent with
+    every chunk, so iterations cannot see each other's `let`s, and the
+    function may not reassign variables it does not bind itself. Short
+    inputs, a single worker, or a call made inside a worker run in-process
+    with the same semantics.
+    """
+    reassigned = outer_reassignments(
+        func.body_node, {tok.value for tok in func.args_node}
+    )
+    if reassigned:
+        sub = reassigned[0]
+        return None, RTError(
+            sub.pos_start,
+            sub.pos_end,
+            f"Parallel iterations cannot reassign outer variable {sub.var_name}",
+            context,
+        )
+
+    if isinstance(iterable, Range) and iterable.range is not None:
+        elements = iterable.range
+    elif hasattr(iterable, "__iter__"):
+        elements = list(iterable)
+        error = iteration_error(iterable)
+        if error:
+            return None, error
+    else:
+        return None, RTError(
+            node.pos_start, node.pos_end, f"{iterable} is not iterable", context
+        )
+
+    if len(elements) < SERIAL_THRESHOLD or _workers() == 1:
+        results = []
+        for element in elements:
+            if isinstance(element, int):
+                element = Number(element)
+            res = interpreter.call(func, [element], node, context)
+            if res.error:
+                return None, res.error
+            results.append(res.value)
+        return List.from_values(results), None
+
+    try:
+        exported_func = _export(func)
+        captures = _captures(func, interpreter)
+    except _NotTransferable as exc:
+        return None, RTError(node.pos_start, node.pos_end, str(exc), context)
+
+    limits = _limits(interpreter.budget)
+    tasks = [
+        (exported_func, captures, chunk, limits)
+        for chunk in _chunks(elements, _workers() * CHUNKS_PER_WORKER)
+    ]
+    try:
+        return _gather(interpreter, func, tasks, node, context)
+    except Exception as exc:
+        return None, RTError(
+            node.pos_start, node.pos_end, f"Worker failed: {exc!r}", context
+        )
+
+
+def _gather(interpreter, func, tasks, node, context):
+    budget = interpreter.budget
+    results = []
+    for exported, error, steps, output in _get_pool().imap(_run_chunk, tasks):
+        if output:
+            interpreter.output.write(output)
+        if error:
+            pos_start, pos_end, details = error
+            if pos_start is None:
+                return None, RTError(node.pos_start, node.pos_end, details, context)
+            # The frame the serial path gets from calling `func` at `node`.
+            frame = Context(func.name, context, node.pos_start)
+            return None, RTError(pos_start, pos_end, details, frame)
+        values = [_import(data, context) for data in exported]
+        if budget:
+            # Workers count against the caller's budget too, and so do the
+            # results they send back.
+            budget.steps += steps
+            error = interpreter._tick(node, context)
+            if error:
+                return None, error
+            for value in values:
+                size = _payload_size(value)
+                if size >= Budget.TRACK_THRESHOLD:
+                    error = interpreter._reserve(node, context, size)
+                    if error:
+                        return None, error
+                    budget.track(value, size)
+        results.extend(values)
+    return List.from_values(results), None
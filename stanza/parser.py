@@ -1,3 +1,4 @@
+from .analysis import outer_reassignments
 from .constants import TT
 from .errors import InvalidSyntaxError
 from .lexer import Token
@@ -7,14 +8,21 @@ from .nodes import (
     ForNode,
     FuncDefNode,
     IfNode,
+    ImportNode,
+    IndexNode,
+    ListNode,
     NumberNode,
+    PForNode,
     PowerOpNode,
+    RangeNode,
+    SliceNode,
     StringNode,
     UnaryOpNode,
     VarAccessNode,
     VarAssignmentNode,
     VarReassignmentNode,
     WhileNode,
+    YieldNode,
 )
 
 """----------ParseResult----------"""
@@ -53,6 +61,9 @@ class Parser:
     def __init__(self, tokens) -> None:
         self.tokens = tokens
         self.token_index = -1
+        # Whether the function body being parsed contains a `yield`; None
+        # outside of any function.
+        self._yields = None
         self._advance()
 
     def _peek(self) -> Token | None:
@@ -138,6 +149,12 @@ class Parser:
                     )
                 )
 
+        elif token.type == TT.LSQUARE:
+            list_expr = result.register(self.list_expr())
+            if result.error:
+                return result
+            return result.success(list_expr)
+
         elif token.matches(TT.KEYWORD, "if"):
             if_expr = result.register(self.if_expr())
             if result.error:
@@ -150,6 +167,12 @@ class Parser:
                 return result
             return result.success(for_expr)
 
+        elif token.matches(TT.KEYWORD, "pfor"):
+            pfor_expr = result.register(self.for_expr("pfor"))
+            if result.error:
+                return result
+            return result.success(pfor_expr)
+
         elif token.matches(TT.KEYWORD, "while"):
             while_expr = result.register(self.while_expr())
             if result.error:
@@ -168,14 +191,19 @@ class Parser:
 
     def call(self):
         """
-        Handles the function calls
+        Handles the function calls, indexing and slicing
         """
         res = ParseResult()
 
         base_node = res.register(self.factor())
         if res.error:
             return res
-        while self.current_token.type == TT.LPAREN:
+        while self.current_token.type in (TT.LPAREN, TT.LSQUARE):
+            if self.current_token.type == TT.LSQUARE:
+                base_node = res.register(self._subscript(base_node))
+                if res.error:
+                    return res
+                continue
             arg_nodes = []
             res.register(self._advance())
             if self.current_token.type == TT.RPAREN:
@@ -202,6 +230,73 @@ class Parser:
             base_node = CallNode(base_node, arg_nodes)
         return res.success(base_node)
 
+    def list_expr(self):
+        """
+        Handles list literals: `[a, b, c]`
+        """
+        res = ParseResult()
+        pos_start = self.current_token.pos_start
+        res.register(self._advance())
+
+        element_nodes = []
+        if self.current_token.type != TT.RSQUARE:
+            element_nodes.append(res.register(self.expression()))
+            if res.error:
+                return res
+            while self.current_token.type == TT.COMMA:
+                res.register(self._advance())
+                element_nodes.append(res.register(self.expression()))
+                if res.error:
+                    return res
+
+        if self.current_token.type != TT.RSQUARE:
+            return res.failure(
+                InvalidSyntaxError(
+                    self.current_token.pos_start,
+                    self.current_token.pos_end,
+                    "Expected ',' or ']'",
+                )
+            )
+        pos_end = self.current_token.pos_end
+        res.register(self._advance())
+        return res.success(ListNode(element_nodes, pos_start, pos_end))
+
+    def _subscript(self, base_node):
+        """
+        Parses `[index]` or `[start:end]` (either bound optional) after base_node
+        """
+        res = ParseResult()
+        res.register(self._advance())
+
+        start = end = None
+        is_slice = False
+        if self.current_token.type != TT.COLON:
+            start = res.register(self.expression())
+            if res.error:
+                return res
+        if self.current_token.type == TT.COLON:
+            is_slice = True
+            res.register(self._advance())
+            if self.current_token.type != TT.RSQUARE:
+                end = res.register(self.expression())
+                if res.error:
+                    return res
+
+        if self.current_token.type != TT.RSQUARE:
+            return res.failure(
+                InvalidSyntaxError(
+                    self.current_token.pos_start,
+                    self.current_token.pos_end,
+                    "Expected ']'",
+                )
+            )
+        pos_end = self.current_token.pos_end
+        res.register(self._advance())
+
+        if is_slice:
+            return res.success(SliceNode(base_node, start, end, pos_end))
+        return res.success(IndexNode(base_node, start, pos_end))
+
     def specialist(self):
         """
         Handles the power operator
@@ -309,10 +404,13 @@ class Parser:
 
         return res.success(IfNode(cases, else_case))
 
-    def for_expr(self):
+    def for_expr(self, keyword="for"):
+        """
+        Handles `for` loops, and `pfor` loops whose iterations run in parallel
+        """
         res = ParseResult()
 
-        res.register(self._expect_keyword("for"))
+        res.register(self._expect_keyword(keyword))
         if res.error:
             return res
 
@@ -331,37 +429,57 @@ class Parser:
         if res.error:
             return res
 
-        start_value_node = res.register(self.expression())
+        iterable_node = res.register(self.expression())
         if res.error:
             return res
 
-        res.register(self._expect_keyword("to"))
+        res.register(self._expect_keyword("do"))
         if res.error:
             return res
 
-        end_value_node = res.register(self.expression())
+        body = res.register(self.expression())
         if res.error:
             return res
 
-        if self.current_token.matches(TT.KEYWORD, "step"):
-            res.register(self._advance())
-            step = res.register(self.expression())
-            if res.error:
-                return res
-        else:
-            step = None
+        if keyword == "for":
+            return res.success(ForNode(var_name_tok, iterable_node, body))
 
-        res.register(self._expect_keyword("do"))
+        # Iterations run in separate processes, so writes to outer variables
+        # could never be seen; reject them up front.
+        reassigned = outer_reassignments(body, {var_name_tok.value})
+        if reassigned:
+            return res.failure(
+                InvalidSyntaxError(
+                    reassigned[0].pos_start,
+                    reassigned[0].pos_end,
+                    f"pfor iterations cannot reassign outer variable "
+                    f"{reassigned[0].var_name}",
+                )
+            )
+        return res.success(PForNode(var_name_tok, iterable_node, body))
+
+    def range_expr(self, start_node):
+        """
+        Handles the rest of `start to end (step k)?` once start is parsed
+        """
+        res = ParseResult()
+
+        res.register(self._expect_keyword("to"))
         if res.error:
             return res
 
-        body = res.register(self.expression())
+        end_node = res.register(self._arith())
         if res.error:
             return res
 
-        return res.success(
-            ForNode(var_name_tok, start_value_node, end_value_node, body, step)
-        )
+        step_node = None
+        if self.current_token.matches(TT.KEYWORD, "step"):
+            res.register(self._advance())
+            step_node = res.register(self._arith())
+            if res.error:
+                return res
+
+        return res.success(RangeNode(start_node, end_node, step_node))
 
     def while_expr(self):
         res = ParseResult()
@@ -384,6 +502,9 @@ class Parser:
 
         return res.success(WhileNode(condition, body))
 
+    def _arith(self):
+        return self._binary_operation(self.comp_expr, (TT.PLUS, TT.MINUS))
+
     def expression(self):
         """
         This is the top level boss function.
@@ -440,10 +561,46 @@ class Parser:
                     VarReassignmentNode(var_name, value, var_pos, value.pos_end)
                 )
 
-        # case 2: std binary operations like add, sub, mul, etc.
+        # case 2: a yield inside a generator function
+        elif self.current_token.matches(TT.KEYWORD, "yield"):
+            yield_tok = self.current_token
+            if self._yields is None:
+                return res.failure(
+                    InvalidSyntaxError(
+                        yield_tok.pos_start,
+                        yield_tok.pos_end,
+                        "'yield' outside of a function",
+                    )
+                )
+            res.register(self._advance())
+            value = res.register(self.expression())
+            if res.error:
+                return res
+            self._yields = True
+            return res.success(YieldNode(value, yield_tok.pos_start))
+
+        # case 3: an import of a module's definitions
+        elif self.current_token.matches(TT.KEYWORD, "import"):
+            import_tok = self.current_token
+            res.register(self._advance())
+            if self.current_token.type != TT.STRING:
+                return res.failure(
+                    InvalidSyntaxError(
+                        self.current_token.pos_start,
+                        self.current_token.pos_end,
+                        "Expected a module path string",
+                    )
+                )
+            path_tok = self.current_token
+            res.register(self._advance())
+            return res.success(ImportNode(path_tok, import_tok.pos_start))
+
+        # case 4: std binary operations like add, sub, mul, etc.
 
         start_index = self.token_index
-        node = res.register(self._binary_operation(self.comp_expr, (TT.PLUS, TT.MINUS)))
+        node = res.register(self._arith())
+        if not res.error and self.current_token.matches(TT.KEYWORD, "to"):
+            node = res.register(self.range_expr(node))
         if res.error:
             # If we haven't moved forward, show the general error
             if self.token_index == start_index:
@@ -539,11 +696,15 @@ class Parser:
 
         res.register(self._advance())
 
+        outer_yields, self._yields = self._yields, False
         node_to_return = res.register(self.expression())
+        is_generator, self._yields = self._yields, outer_yields
         if res.error:
             return res
 
-        return res.success(FuncDefNode(func_name_tok, arg_name_toks, node_to_return))
+        return res.success(
+            FuncDefNode(func_name_tok, arg_name_toks, node_to_return, is_generator)
+        )
 
     def _binary_operation(self, func, ops):
         """
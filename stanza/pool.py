@@ -0,0 +1,285 @@
+import multiprocessing
+import os
+import queue
+from collections import deque
+
+from . import snapshot
+from .budget import Budget
+from .interop import to_python
+from .output import NullSink
+from .session import InterpreterSession
+
+# Extra seconds a chunk may take beyond its cooperative per-task timeouts
+# before the pool is considered stuck and restarted.
+STALL_GRACE = 5.0
+
+
+"""Errors"""
+
+
+class RemoteError:
+    """
+    Picklable copy of an Error raised inside a worker process. Positions and
+    contexts do not survive pickling cheaply, so the rendered as_string() text
+    is kept instead, along with the fields callers usually branch on.
+    """
+
+    def __init__(self, error_name, details, text, filename=None, line=None) -> None:
+        self.error_name = error_name
+        self.details = details
+        self.text = text
+        self.filename = filename
+        self.line = line
+
+    @classmethod
+    def from_error(cls, error):
+        pos = error.pos_start
+        return cls(
+            error.error_name,
+            error.details,
+            error.as_string(),
+            pos.fn if pos else None,
+            pos.ln + 1 if pos else None,
+        )
+
+    def as_string(self):
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"RemoteError({self.error_name}: {self.details})"
+
+
+"""Worker side"""
+
+_worker_session = None
+
+# The RemoteError of a prelude that failed in this worker, or None. Raising
+# from a Pool initializer only makes the pool replace the worker forever, so
+# the error is kept and every script reports it instead.
+_prelude_error = None
+
+
+def _init_worker(prelude, snapshot_path=None):
+    """Builds the warm session every task in this worker is forked from."""
+    global _worker_session, _prelude_error
+    # Scripts return values; what they print has nowhere useful to go.
+    if snapshot_path is not None:
+        _worker_session = snapshot.load(snapshot_path, output=NullSink())
+    else:
+        _worker_session = InterpreterSession(output=NullSink())
+    for text in prelude:
+        _, error = _worker_session.run(text, "<prelude>")
+        if error:
+            _prelude_error = RemoteError.from_error(error)
+            break
+
+
+def _run_chunk(chunk, limits):
+    if _prelude_error is not None:
+        return [(index, None, _prelude_error) for index, _, _ in chunk]
+    results = []
+    for index, filename, text in chunk:
+        budget = Budget(**limits)
+        try:
+            value, error = _worker_session.fork().run(text, filename, budget)
+        except Exception as exc:
+            # A crash in one script must not take the rest of the chunk down.
+            details = f"{type(exc).__name__}: {exc}"
+            error = RemoteError("InternalError", details, f"InternalError: {details}")
+            results.append((index, None, error))
+            continue
+        if error:
+            error = RemoteError.from_error(error)
+        results.append((index, to_python(value), error))
+    return results
+
+
+"""Parent side"""
+
+
+def _chunks(sources, size):
+    chunk = []
+    for index, source in enumerate(sources):
+        if isinstance(source, str):
+            filename, text = "<stdin>", source
+        else:
+            filename, text = source
+        chunk.append((index, filename, text))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _reporter(done, chunk_id, failed):
+    if failed:
+        return lambda exc: done.put((chunk_id, None, exc))
+    return lambda results: done.put((chunk_id, results, None))
+
+
+def _failed(chunk, error_name, details):
+    error = RemoteError(error_name, details, f"{error_name}: {details}")
+    return [(index, None, error) for index, _, _ in chunk]
+
+
+class ScriptPool:
+    """
+    A warm pool of worker processes that evaluates independent scripts.
+
+    Every worker runs the `prelude` sources once at start-up into a session,
+    and each script then runs in a fork of it, so scripts never see each
+    other's variables. With `snapshot`, the path of a file written by
+    stanza.snapshot.save, workers start from that session instead of an
+    empty one, which is much cheaper than evaluating the same prelude each
+    time. Work is shipped in chunks of `chunksize` scripts. `timeout`,
+    `max_steps` and `max_memory` become a Budget for every script. A worker
+    is replaced after roughly `max_tasks_per_worker` scripts to contain
+    leaks. If a prelude source fails, every script's result is that error.
+    If no chunk completes within the chunk's timeouts plus STALL_GRACE, the
+    pool is torn down and restarted, and the oldest outstanding chunk fails
+    with a TimeoutError.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        chunksize=16,
+        timeout=None,
+        max_steps=None,
+        max_memory=None,
+        max_tasks_per_worker=None,
+        prelude=(),
+        snapshot=None,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.timeout = timeout
+        self.limits = {
+            "timeout": timeout,
+            "max_steps": max_steps,
+            "max_memory": max_memory,
+        }
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.prelude = tuple(prelude)
+        self.snapshot = snapshot
+        self._pool = None
+
+    def _start(self):
+        if self._pool is None:
+            maxtasksperchild = None
+            if self.max_tasks_per_worker:
+                maxtasksperchild = max(1, self.max_tasks_per_worker // self.chunksize)
+            self._pool = multiprocessing.Pool(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(self.prelude, self.snapshot),
+                maxtasksperchild=maxtasksperchild,
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def terminate(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        self._start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def run_many(self, sources, ordered=True):
+        """
+        Evaluates `sources` (texts or (filename, text) pairs) and streams the
+        results back. With ordered=True this yields (value, error) in input
+        order; otherwise it yields (index, value, error) as chunks complete.
+        Values come back as plain Python objects (see interop.to_python) and
+        errors as RemoteError.
+        """
+        stall_timeout = None
+        if self.timeout is not None:
+            stall_timeout = self.timeout * self.chunksize + STALL_GRACE
+
+        chunks = _chunks(sources, self.chunksize)
+        window = self.workers * 2
+        done = queue.SimpleQueue()
+        in_flight = {}
+        pending = deque()
+        next_chunk_id = 0
+
+        buffered = {}
+        next_index = 0
+
+        while True:
+            pool = self._start()
+            while len(in_flight) < window:
+                if pending:
+                    chunk = pending.popleft()
+                else:
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                chunk_id = next_chunk_id
+                next_chunk_id += 1
+                in_flight[chunk_id] = chunk
+                pool.apply_async(
+                    _run_chunk,
+                    (chunk, self.limits),
+                    callback=_reporter(done, chunk_id, failed=False),
+                    error_callback=_reporter(done, chunk_id, failed=True),
+                )
+            if not in_flight:
+                break
+
+            try:
+                chunk_id, results, exc = done.get(timeout=stall_timeout)
+            except queue.Empty:
+                # Something is stuck outside the cooperative checks (a single
+                # huge operation, a hung worker). The oldest outstanding chunk
+                # is the likeliest culprit: fail it, restart the workers and
+                # resubmit the others (scripts have no side effects).
+                self.terminate()
+                oldest = min(in_flight)
+                completed = _failed(
+                    in_flight.pop(oldest),
+                    "TimeoutError",
+                    f"No result within {stall_timeout}s; worker pool restarted",
+                )
+                pending.extendleft(reversed(list(in_flight.values())))
+                in_flight.clear()
+                done = queue.SimpleQueue()
+            else:
+                chunk = in_flight.pop(chunk_id, None)
+                if chunk is None:
+                    continue
+                if exc is not None:
+                    results = _failed(chunk, "WorkerError", repr(exc))
+                completed = results
+
+            if not ordered:
+                yield from completed
+                continue
+            for index, value, error in completed:
+                buffered[index] = (value, error)
+            while next_index in buffered:
+                yield buffered.pop(next_index)
+                next_index += 1
+
+
+def run_many(sources, workers=None, ordered=True, **options):
+    """
+    One-shot helper around ScriptPool: starts a pool, streams the results of
+    `sources` and shuts the pool down. Services that evaluate continuously
+    should keep a ScriptPool open instead, so its workers stay warm.
+    """
+    with ScriptPool(workers, **options) as pool:
+        yield from pool.run_many(sources, ordered)
@@ -0,0 +1,97 @@
+from .analysis import free_names
+from .builtins import new_global_table
+from .errors import RTError
+from .inference import infer
+from .interop import from_python
+from .interpreter import Context, Interpreter, SymbolTable
+from .lexer import Lexer
+from .modules import imported_names
+from .parser import Parser
+
+"""Program"""
+
+
+class Program:
+    """
+    A parsed program that can be evaluated many times.
+
+    Names are resolved once, at compile time: every name the program reads
+    without binding it must be one of the declared `inputs`, a global of the
+    base table or a definition of a top-level import. A run then only has to
+    drop the bindings into a fresh scope on top of that base; there is no
+    lexing or parsing left. Resolution does not follow evaluation order, so
+    reading an imported name before its import has run still fails then.
+    """
+
+    def __init__(self, node, inputs, globals_table, filename, types=None) -> None:
+        self.node = node
+        self.inputs = tuple(inputs)
+        self._input_names = frozenset(inputs)
+        self.globals_table = globals_table
+        self.filename = filename
+        self.types = types
+        self.interpreter = Interpreter(globals_table)
+
+    def run(self, bindings=None, budget=None, output=None):
+        """
+        Evaluates the program with `bindings` (input name -> host value or
+        runtime value) and returns (value, error) like shell.run. What the
+        program prints goes to `output`, an OutputSink, and is dropped when
+        none is given.
+        """
+        bindings = bindings or {}
+        if bindings.keys() != self._input_names:
+            missing = sorted(self._input_names - bindings.keys())
+            extra = sorted(bindings.keys() - self._input_names)
+            raise ValueError(f"Bad bindings: missing {missing}, unexpected {extra}")
+
+        table = SymbolTable(self.globals_table)
+        table.symbols = {name: from_python(value) for name, value in bindings.items()}
+        context = Context("<program>")
+        context.symbol_table = table
+
+        interpreter = self.interpreter
+        if budget or output:
+            if budget:
+                budget.start()
+            interpreter = Interpreter(self.globals_table, budget, output)
+        try:
+            result = interpreter.visit(self.node, context)
+        finally:
+            interpreter.output.flush()
+        return result.value, result.error
+
+
+def compile(text, inputs=(), filename="<program>", session=None):
+    """
+    Lexes, parses and resolves `text` once. Returns (program, error); the
+    error is a lexing or syntax error, an RTError naming the first variable
+    that is neither an input, bound by the program or its imports, nor a
+    global of `session` (or a module that cannot be loaded, or an import
+    that is not at the top level), or a StaticTypeError for an operation that can never succeed. The
+    program's `types` is the TypeReport from inference.infer.
+    """
+    tokens, error = Lexer(filename, text).make_tokens()
+    if error:
+        return None, error
+    ast = Parser(tokens).parse()
+    if ast.error:
+        return None, ast.error
+
+    imported, error = imported_names(ast.node, filename)
+    if error:
+        return None, error
+    globals_table = session.symbol_table if session else new_global_table()
+    for name, node in free_names(ast.node).items():
+        if name in imported:
+            continue
+        if name not in inputs and globals_table.get(name) is None:
+            context = Context("<program>")
+            return None, RTError(
+                node.pos_start, node.pos_end, f"{name} not defined.", context
+            )
+
+    report = infer(ast.node)
+    if report.errors:
+        return None, report.errors[0]
+    return Program(ast.node, inputs, globals_table, filename, report), None
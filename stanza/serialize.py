@@ -0,0 +1,205 @@
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+
+from .arena import KINDS, Arena, from_node
+
+MAGIC = b"STZ\x00"
+# Bumped whenever the layout (or arena.KINDS/OPS) changes incompatibly.
+VERSION = 1
+
+# Narrowest signed array type first; each column is packed at the first width
+# that holds all of its values.
+_WIDTHS = (("b", 2**7), ("h", 2**15), ("i", 2**31), ("q", 2**63))
+
+_INT, _FLOAT, _STRING = range(3)
+_DOUBLE = struct.Struct("<d")
+
+"""Encoding"""
+
+
+def _varint(out, n):
+    """Appends unsigned `n` as LEB128 (7 bits per byte, low bits first)."""
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _text(out, text):
+    data = text.encode("utf-8", "surrogatepass")
+    _varint(out, len(data))
+    out += data
+
+
+def _column(out, values):
+    low, high = (min(values), max(values)) if len(values) else (0, 0)
+    for typecode, limit in _WIDTHS:
+        if -limit <= low and high < limit:
+            break
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    out.append(ord(typecode))
+    _varint(out, len(packed))
+    out += packed.tobytes()
+
+
+def dumps_arena(arena, root=0):
+    """Encodes an Arena (see dumps) with `root` as the program's node."""
+    out = bytearray()
+    _text(out, arena.filename)
+    _text(out, arena.text)
+    _varint(out, root)
+
+    _varint(out, len(arena.values))
+    for value in arena.values:
+        if isinstance(value, str):
+            out.append(_STRING)
+            _text(out, value)
+        elif isinstance(value, int):
+            out.append(_INT)
+            _varint(out, _zigzag(value))
+        else:
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+
+    # Positions: starts as deltas from the previous node (mostly small, since
+    # nodes are in source order) and ends as lengths from the start.
+    starts = arena.starts
+    _column(out, arena.kinds)
+    _column(out, [start - prev for prev, start in zip((0, *starts), starts)])
+    _column(out, [end - start for start, end in zip(starts, arena.ends)])
+    for column in (arena.ops, arena.a, arena.b, arena.c, arena.extra):
+        _column(out, column)
+    return MAGIC + bytes([VERSION]) + zlib.compress(out, 1)
+
+
+def dumps(node):
+    """
+    Encodes a parsed program as bytes: MAGIC, a VERSION byte and then,
+    zlib-compressed,
+
+    - the filename and the source text, once, as varint-length UTF-8;
+    - the root handle, then the value table: a varint count and per value a
+      tag byte and a zigzag varint (int), 8-byte double (float) or string;
+    - the arena columns (kinds, start deltas, lengths, ops, a, b, c, extra),
+      each a type byte, a varint count and the values packed little-endian
+      at the narrowest of 1, 2, 4 or 8 bytes that holds them all.
+
+    Columns are fixed-width rather than per-value varints so loads() can
+    unpack each one in a single call; zlib then removes the padding that
+    costs.
+    """
+    arena, root = from_node(node)
+    return dumps_arena(arena, root)
+
+
+"""Decoding"""
+
+
+class _Reader:
+    def __init__(self, data) -> None:
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def byte(self):
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def take(self, size):
+        if self.pos + size > len(self.data):
+            raise ValueError("Truncated program data")
+        chunk = self.data[self.pos : self.pos + size]
+        self.pos += size
+        return chunk
+
+    def varint(self):
+        data = self.data
+        n = shift = 0
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            n |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return n
+            shift += 7
+
+    def text(self):
+        return str(self.take(self.varint()), "utf-8", "surrogatepass")
+
+    def column(self, typecode=None):
+        stored = chr(self.byte())
+        if stored not in "bhiq":
+            raise ValueError(f"Bad column type {stored!r}")
+        packed = array(stored)
+        packed.frombytes(self.take(self.varint() * packed.itemsize))
+        if sys.byteorder == "big":
+            packed.byteswap()
+        if typecode is None or typecode == stored:
+            return packed
+        return array(typecode, packed)
+
+
+def loads_arena(data):
+    """Decodes bytes from dumps/dumps_arena into (Arena, root handle)."""
+    if bytes(data[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a serialized Stanza program")
+    version = data[len(MAGIC)] if len(data) > len(MAGIC) else None
+    if version != VERSION:
+        raise ValueError(f"Unsupported program format version {version}")
+    try:
+        reader = _Reader(zlib.decompress(data[len(MAGIC) + 1 :]))
+    except zlib.error:
+        raise ValueError("Corrupt program data") from None
+
+    try:
+        filename = reader.text()
+        arena = Arena(reader.text(), filename)
+        root = reader.varint()
+        values = arena.values
+        for _ in range(reader.varint()):
+            tag = reader.byte()
+            if tag == _STRING:
+                values.append(reader.text())
+            elif tag == _INT:
+                n = reader.varint()
+                values.append(n >> 1 if not n & 1 else -(n >> 1) - 1)
+            elif tag == _FLOAT:
+                values.append(_DOUBLE.unpack(reader.take(_DOUBLE.size))[0])
+            else:
+                raise ValueError(f"Bad value tag {tag}")
+        arena._value_index = None
+
+        arena.kinds = reader.column("B")
+        arena.starts = array("q", accumulate(reader.column()))
+        arena.ends = array("q", map(int.__add__, arena.starts, reader.column()))
+        arena.ops = reader.column("i")
+        arena.a = reader.column("i")
+        arena.b = reader.column("i")
+        arena.c = reader.column("i")
+        arena.extra = reader.column("i")
+    except IndexError:
+        raise ValueError("Truncated program data") from None
+
+    columns = (arena.starts, arena.ends, arena.ops, arena.a, arena.b, arena.c)
+    if (
+        any(len(column) != len(arena) for column in columns)
+        or max(arena.kinds, default=0) >= len(KINDS)
+        or not 0 <= root < len(arena)
+    ):
+        raise ValueError("Corrupt program data")
+    return arena, root
+
+
+def loads(data):
+    """Decodes bytes from dumps() back into the program's AST."""
+    arena, root = loads_arena(data)
+    return arena.to_node(root)
@@ -0,0 +1,81 @@
+from . import shell
+from .budget import Budget
+from .builtins import new_global_table
+from .interop import from_python
+from .interpreter import BuiltinFunction, Interpreter, Pending, SymbolTable
+from .output import StdoutSink
+
+"""Session"""
+
+
+class InterpreterSession:
+    """
+    Owns one set of globals, so sessions never see each other's variables.
+
+    fork() is O(1): the child gets an empty SymbolTable whose parent is this
+    session's table. Reads fall through to the parent and writes (`let`,
+    reassignment) land in the child, so a prepared base session can serve any
+    number of short-lived request sessions without copying its dicts. Forks
+    see later changes to their base, so finish preparing a base before forking
+    it.
+
+    `output` is the OutputSink for what programs print (see stanza.output);
+    the default buffers stdout and flushes it once per run. A fork gets a
+    fresh sink of the same kind, so concurrent forks never share a buffer.
+    Likewise a fork gets its own Budget with the same limits, so one fork's
+    steps and memory are never counted against another.
+    """
+
+    def __init__(self, symbol_table=None, budget=None, output=None) -> None:
+        if symbol_table is None:
+            symbol_table = new_global_table()
+        self.symbol_table = symbol_table
+        self.budget = budget
+        self.output = output if output is not None else StdoutSink()
+
+    def fork(self):
+        budget = self.budget
+        if budget is not None:
+            budget = Budget(
+                budget.max_steps,
+                budget.max_depth,
+                budget.timeout,
+                budget.token,
+                budget.max_memory,
+            )
+        return InterpreterSession(
+            SymbolTable(self.symbol_table), budget, self.output.fork()
+        )
+
+    def run(self, text, filename="<program>", budget=None, stats=None):
+        if budget is None:
+            budget = self.budget
+        return shell.run(
+            filename,
+            text,
+            budget,
+            symbol_table=self.symbol_table,
+            output=self.output,
+            stats=stats,
+        )
+
+    def define(self, name, value):
+        """Binds a host value (converted with interop.from_python) as a global."""
+        self.symbol_table.set(name, from_python(value))
+        return self
+
+    def register(self, name, func, arity=None):
+        """Adds a native function to this session only; see builtins.builtin."""
+        self.symbol_table.set(name, BuiltinFunction(name, func, arity))
+        return self
+
+    def get(self, name):
+        """
+        A global's value. Imported names are evaluated on first read, and are
+        None if that fails.
+        """
+        value = self.symbol_table.get(name)
+        if isinstance(value, Pending):
+            interpreter = Interpreter(self.symbol_table, self.budget, self.output)
+            value, _ = value.force(interpreter)
+        return value
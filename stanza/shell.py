@@ -1,26 +1,82 @@
-from stanza import Interpreter, Lexer, Parser, SymbolTable
+import time
+
+from stanza import Interpreter, Lexer, Parser
+from stanza.builtins import new_global_table
+from stanza.inference import infer
 from stanza.interpreter import Context
+from stanza.lexer import ByteLexer
+from stanza.output import StdoutSink
+from stanza.source import open_source
+from stanza.stats import StatsInterpreter
 
-global_table = SymbolTable()
-global_table.set("null", 0)
+# Shared by every run() that is not given its own table. Hosts that serve
+# independent requests should use stanza.session.InterpreterSession instead.
+global_table = new_global_table()
 
 
-def run(filename, text):
+def run(filename, text, budget=None, symbol_table=None, output=None, stats=None):
+    """
+    Evaluates `text` and returns (value, error). With `stats`, a
+    stanza.stats.RunStats, what the run cost is recorded into it.
+    """
     # Generate tokens
     lexer = Lexer(filename, text)
+    return _run(lexer, budget, symbol_table, output, stats)
+
+
+def run_file(path, budget=None, symbol_table=None, output=None, stats=None):
+    """
+    Like run, but lexes the file at `path` through a read-only mmap instead of
+    reading it into a str first (see stanza.source). That saves the decoded
+    copy of the file; the tokens and the AST cost what they cost either way.
+    """
+    lexer = ByteLexer(path, open_source(path))
+    return _run(lexer, budget, symbol_table, output, stats)
+
+
+def _run(lexer, budget, symbol_table, output, stats=None):
+    start = time.perf_counter()
     tokens, error = lexer.make_tokens()
+    lexed = time.perf_counter()
+    if stats is not None:
+        stats.lex_time = lexed - start
+        stats.tokens = len(tokens)
     if error:
         return None, error
     # Generate AST
     # print(tokens)
     parser = Parser(tokens)
     ast = parser.parse()
+    parsed = time.perf_counter()
+    if stats is not None:
+        stats.parse_time = parsed - lexed
     # print(ast.node)
     if ast.error:
         return None, ast.error
+    # Only for the fast paths: type errors are still reported when they run.
+    report = infer(ast.node)
+    if stats is not None:
+        stats.infer_time = time.perf_counter() - parsed
+        # Inference gives every node a type entry, so this counts them all.
+        stats.nodes = len(report.types)
 
+    if symbol_table is None:
+        symbol_table = global_table
     context = Context("<program>")
-    context.symbol_table = global_table
-    interpreter = Interpreter(global_table)
-    result = interpreter.visit(ast.node, context)
+    context.symbol_table = symbol_table
+    if budget:
+        budget.start()
+    if output is None:
+        output = StdoutSink()
+    if stats is None:
+        interpreter = Interpreter(symbol_table, budget, output)
+    else:
+        interpreter = StatsInterpreter(symbol_table, budget, output, stats)
+    start = time.perf_counter()
+    try:
+        result = interpreter.visit(ast.node, context)
+    finally:
+        output.flush()
+        if stats is not None:
+            stats.eval_time = time.perf_counter() - start
     return result.value, result.error
@@ -0,0 +1,257 @@
+import copyreg
+import io
+import pickle
+
+from . import serialize
+from .arena import Arena, from_node
+from .builtins import BUILTINS
+from .constants import TT
+from .errors import Position
+from .inference import infer
+from .interpreter import Buffer, BuiltinFunction, Function, Generator
+from .lexer import Token
+from .session import InterpreterSession
+
+MAGIC = b"STZS"
+# Bumped whenever the pickled layout of runtime values changes incompatibly.
+# The function bodies inside are checked against serialize.VERSION as well.
+VERSION = 1
+
+_PROTOCOL = 5
+
+# What a snapshot may ask the unpickler for: classes from these modules, and
+# the few functions and library types dumps() itself emits. Anything else
+# means the file was not written by dumps(), and loading it could run code.
+_CLASS_MODULES = frozenset(
+    {
+        "stanza.arena",
+        "stanza.errors",
+        "stanza.interpreter",
+        "stanza.lexer",
+        "stanza.nodes",
+        "stanza.source",
+    }
+)
+_GLOBALS = frozenset(
+    {
+        ("stanza.snapshot", "_function"),
+        ("stanza.snapshot", "_buffer"),
+        ("array", "array"),
+        ("array", "_array_reconstructor"),
+        ("builtins", "range"),
+    }
+)
+
+
+class _RestoredFunction(Function):
+    """
+    A Function loaded from a snapshot. Its body stays in the arena until the
+    first call (or anything else that reads body_node), so restoring a
+    prelude costs nothing for the functions a worker never uses.
+    """
+
+    @property
+    def body_node(self):
+        body = self._body
+        if isinstance(body, tuple):
+            arena, handle = body
+            body = self._body = arena.to_node(handle)
+            # Arenas do not keep the inferred fast paths.
+            infer(body)
+        return body
+
+    @body_node.setter
+    def body_node(self, node):
+        self._body = node
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        span = (self.pos_start, self.pos_end)
+        self.args_node = [
+            Token(TT.IDENTIFIER, name, *span) for name in state["args_node"]
+        ]
+
+
+"""Saving"""
+
+
+class _Pickler(pickle.Pickler):
+    """
+    Pickles a symbol table graph. Function bodies go into one Arena per
+    source text instead of being pickled node by node, positions become
+    (source, offset) references, and builtins are stored by name.
+    """
+
+    def __init__(self, file) -> None:
+        super().__init__(file, _PROTOCOL)
+        self.dispatch_table = copyreg.dispatch_table.copy()
+        self.dispatch_table.update(
+            {
+                Function: self._reduce_function,
+                _RestoredFunction: self._reduce_function,
+                Buffer: _reduce_buffer,
+                Generator: _reduce_generator,
+            }
+        )
+        self.arenas = []
+        self._sources = {}
+        self._bodies = {}
+
+    def _source(self, pos):
+        """Index of the arena holding pos's source; None if it is not a str."""
+        text = pos.ftxt
+        if not isinstance(text, str):
+            # Byte-offset sources (see stanza.source) pickle as they are.
+            return None
+        key = (pos.fn, id(text))
+        index = self._sources.get(key)
+        if index is None:
+            index = self._sources[key] = len(self.arenas)
+            self.arenas.append(Arena(text, pos.fn))
+        return index
+
+    def persistent_id(self, obj):
+        kind = type(obj)
+        if kind is Position:
+            source = self._source(obj)
+            return None if source is None else ("pos", source, obj.idx)
+        if kind is BuiltinFunction and BUILTINS.get(obj.name) is obj:
+            return ("builtin", obj.name)
+        if kind is _Body:
+            return ("body", obj.source, obj.handle)
+        return None
+
+    def _reduce_function(self, func):
+        body = func.body_node
+        source = self._source(body.pos_start)
+        if source is not None:
+            handle = self._bodies.get(id(body))
+            if handle is None:
+                _, handle = from_node(body, self.arenas[source])
+                self._bodies[id(body)] = handle
+            body = _Body(source, handle)
+        state = {
+            "name": func.name,
+            "args_node": [token.value for token in func.args_node],
+            "_body": body,
+            "is_generator": func.is_generator,
+            "context": func.context,
+            "pos_start": func.pos_start,
+            "pos_end": func.pos_end,
+        }
+        return _function, (), state
+
+
+def _function():
+    return _RestoredFunction.__new__(_RestoredFunction)
+
+
+class _Body:
+    def __init__(self, source, handle) -> None:
+        self.source = source
+        self.handle = handle
+
+
+def _reduce_buffer(buffer):
+    return _buffer, (buffer.value.tobytes(), buffer.value.format)
+
+
+def _buffer(data, fmt):
+    return Buffer(memoryview(data).cast(fmt))
+
+
+def _reduce_generator(generator):
+    raise ValueError(f"Cannot snapshot {generator}: generators hold a running call")
+
+
+def dumps(session):
+    """
+    Encodes a session's globals (its symbol table and every table it falls
+    through to) as bytes: MAGIC, a VERSION byte, a serialize.VERSION byte
+    (arena layouts follow it), then a pickle of (arenas, values pickle). There
+    is one Arena per source text, holding the function bodies read from it.
+
+    Arenas are pickled as their flat columns rather than with dumps_arena:
+    the file is about twice as large, but restoring is the part that has to
+    be fast. Budgets and output sinks are not part of a snapshot.
+    """
+    values = io.BytesIO()
+    pickler = _Pickler(values)
+    try:
+        pickler.dump(session.symbol_table)
+    except (pickle.PicklingError, TypeError, AttributeError) as exc:
+        raise ValueError(f"Cannot snapshot session: {exc}") from None
+    payload = pickle.dumps((pickler.arenas, values.getvalue()), _PROTOCOL)
+    return MAGIC + bytes([VERSION, serialize.VERSION]) + payload
+
+
+def save(session, path):
+    with open(path, "wb") as file:
+        file.write(dumps(session))
+
+
+"""Loading"""
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, arenas=None) -> None:
+        super().__init__(file)
+        self.arenas = arenas
+
+    def find_class(self, module, name):
+        if (module, name) in _GLOBALS:
+            return super().find_class(module, name)
+        if module in _CLASS_MODULES:
+            found = super().find_class(module, name)
+            if isinstance(found, type):
+                return found
+        raise ValueError(f"Snapshot refers to {module}.{name}, which it may not load")
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == "pos":
+            return self.arenas[pid[1]].position(pid[2])
+        if kind == "body":
+            return (self.arenas[pid[1]], pid[2])
+        if kind == "builtin":
+            builtin = BUILTINS.get(pid[1])
+            if builtin is None:
+                raise ValueError(f"Snapshot needs builtin {pid[1]}, which is missing")
+            return builtin
+        raise ValueError(f"Bad snapshot reference {kind!r}")
+
+
+def loads(data, budget=None, output=None):
+    """
+    Rebuilds an InterpreterSession from dumps() bytes. Only Stanza classes and
+    the helpers dumps() writes can be named by the data, so a tampered file
+    cannot call arbitrary Python. Its functions still run as your code the
+    moment you call them: load only snapshots you trust.
+    """
+    header = len(MAGIC) + 2
+    if bytes(data[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a Stanza session snapshot")
+    version, arena_version = (tuple(data[len(MAGIC) : header]) + (None, None))[:2]
+    if version != VERSION or arena_version != serialize.VERSION:
+        raise ValueError(
+            f"Unsupported snapshot version {version} (program format "
+            f"{arena_version}); take the snapshot again with this version"
+        )
+    try:
+        arenas, values = _Unpickler(io.BytesIO(data[header:])).load()
+    except ValueError:
+        raise
+    except Exception:
+        raise ValueError("Corrupt snapshot data") from None
+    try:
+        table = _Unpickler(io.BytesIO(values), arenas).load()
+    except ValueError:
+        raise
+    except Exception as exc:
+        raise ValueError(f"Corrupt snapshot data: {exc}") from None
+    return InterpreterSession(table, budget, output)
+
+
+def load(path, budget=None, output=None):
+    with open(path, "rb") as file:
+        return loads(file.read(), budget, output)
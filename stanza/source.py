@@ -0,0 +1,67 @@
+import mmap
+
+"""Source text"""
+
+
+class SourceText:
+    """
+    Program source kept as bytes (usually a read-only mmap of the file) and
+    decoded only where it is looked at. It stands in for the `str` source
+    held by Positions: error rendering only needs len(), find/rfind and
+    slices, which decode just the lines involved. Offsets are byte offsets.
+    """
+
+    def __init__(self, data) -> None:
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return bytes(self.data[index]).decode("utf-8", "replace")
+        return self[index : index + 1]
+
+    def _encode(self, sub):
+        return sub.encode("utf-8") if isinstance(sub, str) else sub
+
+    def find(self, sub, start=0, end=None):
+        return self.data.find(
+            self._encode(sub), start, len(self) if end is None else end
+        )
+
+    def rfind(self, sub, start=0, end=None):
+        return self.data.rfind(
+            self._encode(sub), start, len(self) if end is None else end
+        )
+
+    def tobytes(self):
+        return bytes(self.data)
+
+    def encode(self, encoding="utf-8", errors="strict"):
+        # The mapping already holds UTF-8, so writers that encode their text
+        # (stanza.serialize) can take a SourceText as is.
+        return self.tobytes()
+
+    def __reduce__(self):
+        # An mmap cannot be pickled; worker processes get a bytes copy.
+        return SourceText, (self.tobytes(),)
+
+    def __str__(self) -> str:
+        return self[:]
+
+    def __repr__(self) -> str:
+        return f"SourceText({len(self)} bytes)"
+
+
+def open_source(path):
+    """
+    Maps the file at `path` read-only. The mapping lives as long as the
+    returned SourceText (and every Position that refers to it).
+    """
+    with open(path, "rb") as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be mapped
+            data = b""
+    return SourceText(data)
@@ -0,0 +1,288 @@
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for this backend
+    np = None
+
+from .constants import TT
+from .errors import RTError
+from .interop import to_python
+from .interpreter import Context, Number
+from .nodes import (
+    BinOpNode,
+    IfNode,
+    NumberNode,
+    PowerOpNode,
+    UnaryOpNode,
+    VarAccessNode,
+)
+
+# Integers are computed in int64. Above 2**53 int64 results and their float
+# conversions stop matching Python's exact ints, so such rows fall back.
+EXACT_INT_LIMIT = 2**53
+
+DIVIDE_BY_ZERO = "Attempt to Divide by zero!"
+MODULO_BY_ZERO = "Attempt to divide by zero!"
+RESULT_TOO_LARGE = "Result too large"
+
+
+class _Fallback(Exception):
+    """The expression (or these inputs) cannot be vectorized faithfully."""
+
+
+class _Column:
+    """A vectorized intermediate: an array plus its Stanza kind."""
+
+    __slots__ = ("data", "kind")
+
+    def __init__(self, data, kind) -> None:
+        self.data = data
+        self.kind = kind  # "number" or "bool"
+
+
+"""Vectorized evaluation"""
+
+
+class _Vectorizer:
+    """
+    Evaluates a branch-free numeric AST once over whole columns.
+
+    Every visit receives the `active` mask of rows that would actually
+    evaluate the node, so a division by zero in an `if` branch a row did not
+    take is not reported for that row, just like the interpreter.
+    """
+
+    def __init__(self, program, columns, size) -> None:
+        self.program = program
+        self.columns = columns
+        self.size = size
+        self.error_rows = np.zeros(size, dtype=bool)
+        self.first_error = None
+
+    def visit(self, node, active):
+        method = getattr(self, f"visit_{type(node).__name__}", None)
+        if method is None:
+            raise _Fallback(type(node).__name__)
+        return method(node, active)
+
+    def _fail(self, node, message, rows):
+        rows = rows & ~self.error_rows
+        if not rows.any():
+            return
+        self.error_rows |= rows
+        if self.first_error is None:
+            self.first_error = (node, message)
+
+    def _check_exact(self, column):
+        if column.data.dtype.kind in "iu" and column.data.size:
+            if np.abs(column.data).max() > EXACT_INT_LIMIT:
+                raise _Fallback("integer out of exact range")
+        return column
+
+    def _constant(self, value):
+        if isinstance(value, int) and abs(value) > EXACT_INT_LIMIT:
+            raise _Fallback("integer constant out of exact range")
+        return _Column(np.full(self.size, value), "number")
+
+    def visit_NumberNode(self, node: NumberNode, active):
+        return self._constant(node.token.value)
+
+    def visit_VarAccessNode(self, node: VarAccessNode, active):
+        name = node.var_access_tok.value
+        if name in self.columns:
+            return self.columns[name]
+        value = self.program.globals_table.get(name)
+        if isinstance(value, Number):
+            return self._constant(value.value)
+        raise _Fallback(f"{name} is not a numeric column or constant")
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode, active):
+        operand = self.visit(node.node, active)
+        if node.op.type == TT.MINUS:
+            if operand.kind != "number":
+                raise _Fallback("negating a boolean")
+            return _Column(-operand.data, "number")
+        if node.op.matches(TT.KEYWORD, "not") and operand.kind == "bool":
+            return _Column(~operand.data, "bool")
+        # '+' and 'not' on a number leave the value unchanged
+        return operand
+
+    def visit_BinOpNode(self, node: BinOpNode, active):
+        left = self.visit(node.left_node, active)
+        right = self.visit(node.right_node, active)
+        if left.kind != "number" or right.kind != "number":
+            raise _Fallback("operator on a boolean")
+        a, b = left.data, right.data
+        op = node.op.type
+
+        if op in (TT.EE, TT.NE, TT.GT, TT.LT, TT.GTE, TT.LTE):
+            compare = {
+                TT.EE: np.equal,
+                TT.NE: np.not_equal,
+                TT.GT: np.greater,
+                TT.LT: np.less,
+                TT.GTE: np.greater_equal,
+                TT.LTE: np.less_equal,
+            }[op]
+            return _Column(compare(a, b), "bool")
+
+        if op in (TT.DIVIDE, TT.MODULO):
+            zero = b == 0
+            self._fail(
+                node.right_node,
+                DIVIDE_BY_ZERO if op == TT.DIVIDE else MODULO_BY_ZERO,
+                zero & active,
+            )
+            safe = np.where(zero, 1, b)
+            if op == TT.DIVIDE:
+                return _Column(np.true_divide(a, safe), "number")
+            return self._check_exact(_Column(np.mod(a, safe), "number"))
+
+        if op == TT.MUL and a.dtype.kind in "iu" and b.dtype.kind in "iu":
+            estimate = np.abs(a.astype(float) * b.astype(float))
+            if estimate.size and estimate.max() > EXACT_INT_LIMIT:
+                raise _Fallback("integer product out of exact range")
+        operation = {TT.PLUS: np.add, TT.MINUS: np.subtract, TT.MUL: np.multiply}
+        return self._check_exact(_Column(operation[op](a, b), "number"))
+
+    def visit_PowerOpNode(self, node: PowerOpNode, active):
+        base = self.visit(node.base, active)
+        exponent = self.visit(node.exponent, active)
+        if base.kind != "number" or exponent.kind != "number":
+            raise _Fallback("power of a boolean")
+        a, b = base.data, exponent.data
+
+        if a.dtype.kind in "iu" and b.dtype.kind in "iu":
+            # Python gives a float for negative int exponents (and raises for
+            # 0 ** -n); leave those mixed-type results to the interpreter.
+            if (b[active] < 0).any():
+                raise _Fallback("negative integer exponent")
+            magnitude = np.abs(a.astype(float)) ** b.astype(float)
+            if magnitude.size and magnitude[active].max(initial=0) > EXACT_INT_LIMIT:
+                raise _Fallback("integer power out of exact range")
+            return _Column(np.power(a, b), "number")
+
+        a, b = a.astype(float), b.astype(float)
+        if ((a < 0) & (b != np.floor(b)) & active).any():
+            raise _Fallback("fractional power of a negative number is complex")
+        if ((a == 0) & (b < 0) & active).any():
+            raise _Fallback("zero to a negative power")
+        with np.errstate(over="ignore"):
+            result = np.power(a, b)
+        overflow = np.isinf(result) & np.isfinite(a) & np.isfinite(b)
+        self._fail(node.exponent, RESULT_TOO_LARGE, overflow & active)
+        return _Column(result, "number")
+
+    def visit_IfNode(self, node: IfNode, active):
+        if node.else_expr is None:
+            raise _Fallback("if without else has no value for some rows")
+        remaining = active.copy()
+        branches = []
+        for condition, expr in node.cases:
+            cond = self.visit(condition, remaining)
+            taken = remaining & (cond.data if cond.kind == "bool" else cond.data != 0)
+            branches.append((taken, self.visit(expr, taken)))
+            remaining &= ~taken
+        branches.append((remaining, self.visit(node.else_expr, remaining)))
+
+        kinds = {column.kind for _, column in branches}
+        if len(kinds) != 1:
+            raise _Fallback("branches return different types")
+        result = branches[-1][1].data
+        for taken, column in reversed(branches[:-1]):
+            result = np.where(taken, column.data, result)
+        return _Column(result, kinds.pop())
+
+
+"""Entry point"""
+
+
+def _columns_for(program, columns):
+    missing = [name for name in program.inputs if name not in columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    arrays = {name: np.asarray(columns[name]) for name in program.inputs}
+    sizes = {array.shape for array in arrays.values()}
+    if len(sizes) > 1 or any(len(shape) != 1 for shape in sizes):
+        raise ValueError("Columns must be one-dimensional and of equal length")
+    size = sizes.pop()[0] if sizes else 1
+    return arrays, size
+
+
+def _with_rows(error, rows):
+    shown = ", ".join(str(row) for row in rows[:20])
+    if len(rows) > 20:
+        shown += f", ... ({len(rows)} rows)"
+    return RTError(
+        error.pos_start, error.pos_end, f"{error.details} (rows {shown})", error.context
+    )
+
+
+def _per_row(program, arrays, size, on_error):
+    """Fallback: runs the interpreter once per row."""
+    rows = {name: array.tolist() for name, array in arrays.items()}
+    results = [None] * size
+    error_rows = []
+    first_error = None
+    for i in range(size):
+        value, error = program.run({name: column[i] for name, column in rows.items()})
+        if error:
+            error_rows.append(i)
+            first_error = first_error or error
+        else:
+            results[i] = to_python(value)
+
+    if first_error and on_error == "error":
+        return None, _with_rows(first_error, error_rows)
+    result = np.array(results)
+    if on_error == "mask":
+        mask = np.zeros(size, dtype=bool)
+        mask[error_rows] = True
+        result = np.ma.masked_array(result, mask=mask)
+    return result, None
+
+
+def evaluate_columns(program, columns, on_error="error"):
+    """
+    Evaluates a compiled Program over whole columns at once.
+
+    `columns` maps every input of the program to a 1-D array (anything
+    numpy.asarray accepts). Numeric expressions built from arithmetic, powers,
+    unary operators, comparisons and `if ... else` (lowered to numpy.where)
+    are computed with array operations; anything else falls back to running
+    the interpreter row by row. Returns (result, error):
+
+    - on_error="error": a failing row (division by zero, overflowing power)
+      makes the result None and the error an RTError listing the row indices.
+    - on_error="mask": failing rows are masked in a numpy.ma.MaskedArray and
+      the error is None.
+    """
+    if np is None:
+        raise ImportError("evaluate_columns needs numpy installed")
+    if on_error not in ("error", "mask"):
+        raise ValueError("on_error must be 'error' or 'mask'")
+
+    arrays, size = _columns_for(program, columns)
+    bindings = {}
+    for name, array in arrays.items():
+        if array.dtype.kind not in "iuf":
+            return _per_row(program, arrays, size, on_error)
+        bindings[name] = _Column(array, "number")
+
+    vectorizer = _Vectorizer(program, bindings, size)
+    try:
+        for column in bindings.values():
+            vectorizer._check_exact(column)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = vectorizer.visit(program.node, np.ones(size, dtype=bool))
+    except _Fallback:
+        return _per_row(program, arrays, size, on_error)
+
+    rows = np.flatnonzero(vectorizer.error_rows)
+    if len(rows) and on_error == "error":
+        node, message = vectorizer.first_error
+        error = RTError(node.pos_start, node.pos_end, message, Context("<program>"))
+        return None, _with_rows(error, rows.tolist())
+    data = result.data
+    if on_error == "mask":
+        data = np.ma.masked_array(data, mask=vectorizer.error_rows)
+    return data, None